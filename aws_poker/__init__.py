@@ -4,11 +4,34 @@ AWS Poker - AWSアイコンを使ったポーカーゲーム
 
 __version__ = "0.1.0"
 
-from .card import Card, Deck
-from .hand_evaluator import HandEvaluator
-from .poker_game import PokerGame
-from .sound_manager import SoundManager
-from .clipboard_utils import ClipboardManager
+import importlib
+
+# 公開クラスと定義モジュール（初回アクセス時に読み込む）
+# pygameを使うモジュールはここで読み込まないため、
+# `from aws_poker.hand_evaluator import HandEvaluator` はpygameなしで動く
+_LAZY_ATTRIBUTES = {
+    "Card": ".card",
+    "Deck": ".card",
+    "HandEvaluator": ".hand_evaluator",
+    "PokerGame": ".poker_game",
+    "SoundManager": ".sound_manager",
+    "ClipboardManager": ".clipboard_utils",
+    "ClipboardService": ".clipboard_utils",
+}
+
+__all__ = sorted(_LAZY_ATTRIBUTES) + ["hello", "list_s3_buckets", "run_poker"]
+
+def __getattr__(name):
+    """公開クラスを遅延読み込み"""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
 def hello():
     """Simple hello function"""
@@ -20,5 +43,6 @@ def list_s3_buckets():
 
 def run_poker():
     """ポーカーゲームを起動"""
+    from .poker_game import PokerGame
     game = PokerGame()
     game.run()
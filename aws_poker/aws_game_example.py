@@ -2,9 +2,9 @@
 
 import pygame
 import boto3
-import json
 import os
-from datetime import datetime
+
+from .state_uploader import StateUploader
 
 
 class AwsGameExample:
@@ -33,6 +33,7 @@ class AwsGameExample:
         self.buckets = []
         self.aws_data_loaded = False
         self.loading_message = "Loading AWS data..."
+        self.state_uploader = None  # Background uploader for save_game_state
         
     def load_aws_data(self):
         """Load data from AWS services."""
@@ -45,29 +46,23 @@ class AwsGameExample:
             self.loading_message = f"Error loading AWS data: {str(e)}"
             
     def save_game_state(self, bucket_name, game_state):
-        """Save game state to S3.
+        """Queue game state for upload to S3.
+        
+        Snapshots are batched, gzip-compressed and uploaded by a background
+        thread, so this never blocks the render loop on the network.
         
         Args:
             bucket_name (str): S3 bucket name
             game_state (dict): Game state to save
-        """
-        try:
-            # Add timestamp to game state
-            game_state['timestamp'] = datetime.now().isoformat()
-            
-            # Convert game state to JSON
-            game_state_json = json.dumps(game_state)
             
-            # Save to S3
-            self.s3_client.put_object(
-                Bucket=bucket_name,
-                Key=f"game_states/save_{datetime.now().strftime('%Y%m%d%H%M%S')}.json",
-                Body=game_state_json
-            )
-            return True
-        except Exception as e:
-            print(f"Error saving game state: {str(e)}")
-            return False
+        Returns:
+            bool: False if the upload queue is full and the snapshot was dropped
+        """
+        if self.state_uploader is None or self.state_uploader.bucket != bucket_name:
+            if self.state_uploader is not None:
+                self.state_uploader.close()
+            self.state_uploader = StateUploader(self.s3_client, bucket_name).start()
+        return self.state_uploader.submit(game_state)
             
     def handle_events(self):
         """Handle pygame events."""
@@ -133,7 +128,10 @@ class AwsGameExample:
             self.update()
             self.render()
             self.clock.tick(self.fps)
-            
+        
+        # Flush queued game states before exiting
+        if self.state_uploader is not None:
+            self.state_uploader.close()
         pygame.quit()
         
 
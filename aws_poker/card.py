@@ -3,12 +3,16 @@ AWSポーカーのカードクラス
 """
 
 import pygame
-import csv
 import os
 from pathlib import Path
 from typing import List, Tuple, Optional
 import random
 
+from .catalog import load_catalog
+from .font_manager import get_font
+from .snapshot import splitmix64
+from .surface_manager import SurfaceManager, default_manager
+
 class Card:
     """AWSアイコンを使ったポーカーカード"""
     
@@ -27,6 +31,9 @@ class Card:
         'Gray': (108, 117, 125)
     }
     
+    # アイコン・カード面のサーフェス（表示形式への変換・共有・メモリ予算）
+    surfaces: SurfaceManager = default_manager
+    
     def __init__(self, path: str, filename: str, rank: str, suit: str):
         self.path = path
         self.filename = filename
@@ -34,25 +41,16 @@ class Card:
         self.suit = suit
         self.service_name = ""  # サービス名
         self.category = ""      # カテゴリ
+        self.card_id = -1       # カタログの行番号（スナップショット用）
         self.image = None
-        self.card_surface = None
-        self.back_surface = None
         self.is_face_up = True
         
     def load_image(self, base_path: str = None):
         """アイコン画像を読み込む"""
         if base_path is None:
             base_path = os.path.dirname(os.path.dirname(__file__))
-        try:
-            full_path = Path(base_path) / self.path
-            self.image = pygame.image.load(str(full_path))
-            # アイコンサイズを調整（48x48 -> 80x80）
-            self.image = pygame.transform.scale(self.image, (80, 80))
-        except pygame.error as e:
-            print(f"画像読み込みエラー: {self.path} - {e}")
-            # デフォルト画像を作成
-            self.image = pygame.Surface((80, 80))
-            self.image.fill((200, 200, 200))
+        # 同じアイコンは全カード・全デッキで1枚を共有する（読めなければ灰色の代替画像）
+        self.image = self.surfaces.load_icon(str(Path(base_path) / self.path))
     
     def get_service_name(self) -> str:
         """サービス名を取得"""
@@ -103,10 +101,12 @@ class Card:
         return self.suit
     
     def create_card_surface(self, font: pygame.font.Font, small_font: pygame.font.Font) -> pygame.Surface:
-        """カード表面を作成"""
-        if self.card_surface is not None:
-            return self.card_surface
-            
+        """カード表面を取得（予算を超えると破棄されるので、なければ作り直す）"""
+        key = (self.path, self.rank, self.suit, self.service_name, self.category, font, small_font)
+        return self.surfaces.face(key, lambda: self._render_face(font, small_font))
+    
+    def _render_face(self, font: pygame.font.Font, small_font: pygame.font.Font) -> pygame.Surface:
+        """カード表面を描画"""
         # カード背景
         surface = pygame.Surface((self.CARD_WIDTH, self.CARD_HEIGHT))
         surface.fill((255, 255, 255))
@@ -168,17 +168,14 @@ class Card:
         category_x = (self.CARD_WIDTH - category_surface.get_width()) // 2
         surface.blit(category_surface, (category_x, self.CARD_HEIGHT - 25))
         
-        self.card_surface = surface
-        return surface
-        
-        self.card_surface = surface
         return surface
     
     def create_back_surface(self) -> pygame.Surface:
-        """カード裏面を作成"""
-        if self.back_surface is not None:
-            return self.back_surface
-            
+        """カード裏面を取得（全カードで1枚を共有）"""
+        return self.surfaces.shared(('back', self.CARD_WIDTH, self.CARD_HEIGHT), self._render_back)
+    
+    def _render_back(self) -> pygame.Surface:
+        """カード裏面を描画"""
         surface = pygame.Surface((self.CARD_WIDTH, self.CARD_HEIGHT))
         surface.fill((255, 165, 0))  # AWS オレンジ
         
@@ -186,13 +183,12 @@ class Card:
         pygame.draw.rect(surface, (35, 47, 62), (10, 10, self.CARD_WIDTH-20, self.CARD_HEIGHT-20), 3)
         
         # 中央に "AWS" テキスト
-        font = pygame.font.Font(None, 48)
+        font = get_font(None, 48)
         aws_text = font.render("AWS", True, (35, 47, 62))
         text_x = (self.CARD_WIDTH - aws_text.get_width()) // 2
         text_y = (self.CARD_HEIGHT - aws_text.get_height()) // 2
         surface.blit(aws_text, (text_x, text_y))
         
-        self.back_surface = surface
         return surface
     
     def draw(self, screen: pygame.Surface, x: int, y: int, font: pygame.font.Font, small_font: pygame.font.Font):
@@ -218,31 +214,41 @@ class Card:
 class Deck:
     """カードデッキ"""
     
-    def __init__(self, csv_path: str = None):
+    def __init__(self, csv_path: str = None, rng_state: Optional[int] = None):
         self.cards: List[Card] = []
+        # デッキ専用の乱数（splitmix64の状態、スナップショットに保存して再開後も同じ順に引ける）
+        self.rng_state = random.getrandbits(64) if rng_state is None else rng_state
         if csv_path is None:
             csv_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cards.csv")
         self.load_cards(csv_path)
         self.shuffle()
     
     def load_cards(self, csv_path: str):
-        """CSVファイルからカードを読み込み"""
-        with open(csv_path, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                card = Card(row['icon_path'], row['filename'], row['rank'], row['suit'])
+        """カードカタログを読み込み（cards.binがあれば優先し、なければCSV）"""
+        with load_catalog(csv_path) as catalog:
+            # 行ごとに辞書を作らずタプルで受け取る
+            for service_name, category, suit, rank, icon_path, filename in catalog.records():
+                card = Card(icon_path, filename, rank, suit)
                 # サービス名も保存
-                card.service_name = row['service_name']
-                card.category = row['category']
+                card.service_name = service_name
+                card.category = category
+                card.card_id = len(self.cards)
                 self.cards.append(card)
         
+        self.total_cards = len(self.cards)
+        
         # 画像を読み込み
         for card in self.cards:
             card.load_image()
     
+    def next_random(self) -> int:
+        """デッキの乱数を1つ進めて64ビットの乱数を返す"""
+        self.rng_state, value = splitmix64(self.rng_state)
+        return value
+    
     def shuffle(self):
-        """デッキをシャッフル"""
-        random.shuffle(self.cards)
+        """デッキをシャッフル（毎回デッキの乱数から作ったシードを使う）"""
+        random.Random(self.next_random()).shuffle(self.cards)
     
     def deal(self, num_cards: int) -> List[Card]:
         """指定枚数のカードを配る"""
@@ -0,0 +1,304 @@
+"""
+カードカタログのバイナリ形式（cards.bin）の読み書き
+
+cards.csv と同じ内容を、固定長レコード（ランク/スート/カテゴリID）と
+文字列テーブル（サービス名・パス）に分けて保存する。mmapで読み込めるため、
+起動時にCSVをパースする必要がない。
+
+レイアウト（リトルエンディアン）:
+    ヘッダー (64バイト) ソースCSVのSHA-1・サイズ・更新時刻（ns）を含む
+    レコード n_cards × 16バイト
+        rank_id u8, suit_id u8, category_id u16,
+        service_name u32, icon_path u32, filename u32 （文字列ID）
+    語彙 (n_ranks + n_suits + n_categories) × u32 （文字列ID）
+    文字列インデックス n_strings × (offset u32, length u32)
+    文字列データ (UTF-8)
+"""
+
+import csv
+import hashlib
+import mmap
+import os
+import struct
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# ランクの順序（HandEvaluator.RANK_ORDER と同じ）
+RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+
+# CSVの列（records() のタプルの順序）
+COLUMNS = ('service_name', 'category', 'suit', 'rank', 'icon_path', 'filename')
+
+MAGIC = b'AWPC'
+VERSION = 2
+
+HEADER = struct.Struct('<4sHHIHHHHI20sQq4x')
+RECORD = struct.Struct('<BBHIII')
+U32 = struct.Struct('<I')
+STRING_ENTRY = struct.Struct('<II')
+
+
+def catalog_path_for(csv_path: str) -> str:
+    """CSVに対応するバイナリカタログのパス（cards.csv -> cards.bin）"""
+    return os.path.splitext(csv_path)[0] + '.bin'
+
+
+def file_digest(path: str) -> bytes:
+    """ソースCSVのSHA-1（カタログの鮮度チェック用）"""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).digest()
+
+
+def read_csv_rows(csv_path: str) -> List[Dict[str, str]]:
+    """cards.csv の全行を読み込む"""
+    with open(csv_path, 'r', encoding='utf-8') as csvfile:
+        return list(csv.DictReader(csvfile))
+
+
+def write_catalog(rows: List[Dict[str, str]], output_path: str, source_csv: Optional[str] = None):
+    """カード行のリストからバイナリカタログを書き出す"""
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    suits = sorted({row['suit'] for row in rows})
+    categories = sorted({row['category'] for row in rows})
+    suit_ids = {suit: i for i, suit in enumerate(suits)}
+    category_ids = {category: i for i, category in enumerate(categories)}
+    rank_ids = {rank: i for i, rank in enumerate(RANKS)}
+
+    records = bytearray()
+    for row in rows:
+        records += RECORD.pack(
+            rank_ids[row['rank']], suit_ids[row['suit']], category_ids[row['category']],
+            intern(row['service_name']), intern(row['icon_path']), intern(row['filename'])
+        )
+
+    vocab = bytearray()
+    for value in RANKS + suits + categories:
+        vocab += U32.pack(intern(value))
+
+    index = bytearray()
+    data = bytearray()
+    for value in strings:
+        encoded = value.encode('utf-8')
+        index += STRING_ENTRY.pack(len(data), len(encoded))
+        data += encoded
+
+    digest, size, mtime_ns = b'\0' * 20, 0, 0
+    if source_csv:
+        stat = os.stat(source_csv)
+        digest, size, mtime_ns = file_digest(source_csv), stat.st_size, stat.st_mtime_ns
+    header = HEADER.pack(MAGIC, VERSION, RECORD.size, len(rows), len(RANKS), len(suits), len(categories), 0,
+                         len(strings), digest, size, mtime_ns)
+
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"  # 複数プロセスが同時に生成しても混ざらないように
+    with open(tmp_path, 'wb') as f:
+        f.write(header + records + vocab + index + data)
+    os.replace(tmp_path, output_path)
+
+
+class CardCatalog:
+    """カードカタログ（バイナリまたはCSVから読み込んだ共通ビュー）"""
+
+    def __init__(self, rank_ids: List[int], suit_ids: List[int], category_ids: List[int],
+                 suits: List[str], categories: List[str], rows: Optional[List[Dict[str, str]]] = None,
+                 source: str = 'csv'):
+        self.rank_ids = rank_ids
+        self.suit_ids = suit_ids
+        self.category_ids = category_ids
+        self.ranks = RANKS
+        self.suits = suits
+        self.categories = categories
+        self.source = source
+        self.source_digest = None
+        self.source_size = 0
+        self.source_mtime_ns = 0
+        self._rows = rows
+        self._buffer = None
+        self._mmap = None
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, str]]) -> 'CardCatalog':
+        """CSV行からカタログを作成"""
+        suits = sorted({row['suit'] for row in rows})
+        categories = sorted({row['category'] for row in rows})
+        suit_ids = {suit: i for i, suit in enumerate(suits)}
+        category_ids = {category: i for i, category in enumerate(categories)}
+        return cls(
+            [RANKS.index(row['rank']) for row in rows],
+            [suit_ids[row['suit']] for row in rows],
+            [category_ids[row['category']] for row in rows],
+            suits, categories, rows=rows, source='csv'
+        )
+
+    @classmethod
+    def open_binary(cls, path: str) -> 'CardCatalog':
+        """バイナリカタログをmmapで開く"""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            catalog = cls._from_buffer(memoryview(mapped))
+        except Exception:
+            mapped.close()
+            raise
+        catalog._mmap = mapped
+        catalog.source = 'binary'
+        return catalog
+
+    @classmethod
+    def _from_buffer(cls, buffer: memoryview) -> 'CardCatalog':
+        """バッファ上のカタログを解釈する"""
+        (magic, version, record_size, n_cards, n_ranks, n_suits, n_categories,
+         _, n_strings, source_digest, source_size, source_mtime_ns) = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError("カードカタログの形式が不正です")
+
+        records_offset = HEADER.size
+        vocab_offset = records_offset + n_cards * RECORD.size
+        index_offset = vocab_offset + (n_ranks + n_suits + n_categories) * U32.size
+        data_offset = index_offset + n_strings * STRING_ENTRY.size
+
+        # ランク・スート・カテゴリIDはレコード先頭4バイトから取り出す
+        rank_ids, suit_ids, category_ids = [], [], []
+        records = buffer[records_offset:vocab_offset]
+        for rank_id, suit_id, category_id, _, _, _ in RECORD.iter_unpack(records):
+            rank_ids.append(rank_id)
+            suit_ids.append(suit_id)
+            category_ids.append(category_id)
+        records.release()
+
+        catalog = cls(rank_ids, suit_ids, category_ids, [], [], source='binary')
+        catalog.source_digest = source_digest
+        catalog.source_size = source_size
+        catalog.source_mtime_ns = source_mtime_ns
+        catalog._buffer = buffer
+        catalog._records_offset = records_offset
+        catalog._index_offset = index_offset
+        catalog._data_offset = data_offset
+
+        vocab = [catalog.string(U32.unpack_from(buffer, vocab_offset + i * U32.size)[0])
+                 for i in range(n_ranks + n_suits + n_categories)]
+        if vocab[:n_ranks] != RANKS:
+            raise ValueError("カードカタログのランク定義が一致しません")
+        catalog.suits = vocab[n_ranks:n_ranks + n_suits]
+        catalog.categories = vocab[n_ranks + n_suits:]
+        return catalog
+
+    def is_fresh(self, csv_path: str) -> bool:
+        """ソースCSVから生成したままか（サイズと更新時刻が一致すれば読まず、時刻だけ違えばハッシュで確認）"""
+        stat = os.stat(csv_path)
+        if stat.st_size != self.source_size:
+            return False
+        if stat.st_mtime_ns == self.source_mtime_ns:
+            return True
+        return self.source_digest == file_digest(csv_path)
+
+    def string(self, string_id: int) -> str:
+        """文字列テーブルから文字列を取得"""
+        offset, length = STRING_ENTRY.unpack_from(self._buffer, self._index_offset + string_id * STRING_ENTRY.size)
+        start = self._data_offset + offset
+        return bytes(self._buffer[start:start + length]).decode('utf-8')
+
+    def row(self, index: int) -> Dict[str, str]:
+        """指定したカードの行をCSVと同じ形式で取得"""
+        if self._rows is not None:
+            return self._rows[index]
+        rank_id, suit_id, category_id, name_id, path_id, filename_id = RECORD.unpack_from(
+            self._buffer, self._records_offset + index * RECORD.size)
+        return {
+            'service_name': self.string(name_id),
+            'category': self.categories[category_id],
+            'suit': self.suits[suit_id],
+            'rank': RANKS[rank_id],
+            'icon_path': self.string(path_id),
+            'filename': self.string(filename_id),
+        }
+
+    def rows(self) -> Iterator[Dict[str, str]]:
+        """全カードの行を順に返す"""
+        if self._rows is not None:
+            yield from self._rows
+            return
+        for record in self.records():
+            yield dict(zip(COLUMNS, record))
+
+    def records(self) -> Iterator[Tuple[str, str, str, str, str, str]]:
+        """全カードを COLUMNS 順のタプルで返す（行ごとに辞書を作らない）"""
+        if self._rows is not None:
+            for row in self._rows:
+                yield tuple(row[column] for column in COLUMNS)
+            return
+        # 文字列テーブルを一括でデコードしてからレコードを走査する
+        data = bytes(self._buffer[self._data_offset:])
+        index = self._buffer[self._index_offset:self._data_offset]
+        strings = [data[offset:offset + length].decode('utf-8')
+                   for offset, length in STRING_ENTRY.iter_unpack(index)]
+        index.release()
+        suits, categories = self.suits, self.categories
+        records = self._buffer[self._records_offset:self._records_offset + len(self) * RECORD.size]
+        for rank_id, suit_id, category_id, name_id, path_id, filename_id in RECORD.iter_unpack(records):
+            yield (strings[name_id], categories[category_id], suits[suit_id], RANKS[rank_id],
+                   strings[path_id], strings[filename_id])
+        records.release()
+
+    def close(self):
+        """mmapを解放"""
+        if self._mmap is not None:
+            self._buffer.release()
+            self._buffer = None
+            self._mmap.close()
+            self._mmap = None
+
+    def __len__(self):
+        return len(self.rank_ids)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_catalog(csv_path: str) -> CardCatalog:
+    """カードカタログを読み込む（最新のcards.binがあれば優先し、なければCSVから読んでcards.binを作る）
+
+    cards.bin はリポジトリに含めず（.gitignore）、初回の読み込みやCSVの更新後に生成する。
+    """
+    binary_path = catalog_path_for(csv_path)
+    if os.path.exists(binary_path):
+        try:
+            catalog = CardCatalog.open_binary(binary_path)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"カードカタログ読み込みエラー: {binary_path} - {e}")
+        else:
+            # CSVが更新されていればバイナリは古いのでCSVを使う
+            if not os.path.exists(csv_path) or catalog.is_fresh(csv_path):
+                return catalog
+            catalog.close()
+    rows = read_csv_rows(csv_path)
+    try:
+        write_catalog(rows, binary_path, source_csv=csv_path)
+    except OSError as e:
+        print(f"カードカタログを生成できませんでした: {binary_path} - {e}")
+    return CardCatalog.from_rows(rows)
+
+
+def main():
+    """cards.csv からバイナリカタログを生成"""
+    import sys
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), "cards.csv")
+    output_path = catalog_path_for(csv_path)
+    rows = read_csv_rows(csv_path)
+    write_catalog(rows, output_path, source_csv=csv_path)
+    print(f"カードカタログを生成しました: {output_path} ({len(rows)}枚)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,81 +2,180 @@
 クリップボード操作のユーティリティ
 """
 
+import queue
+import shutil
 import subprocess
 import sys
-from typing import Optional
+import threading
+from typing import List, Optional, Tuple
+
+import pygame
+
+# クリップボード操作の完了を通知するイベント
+# (action: 'copy' | 'paste', success: bool, text: Optional[str])
+CLIPBOARD_EVENT = pygame.USEREVENT + 3
+
+# プラットフォームごとの外部コマンド（コピー用, 取得用）
+_BACKEND_COMMANDS = {
+    "darwin": [(['pbcopy'], ['pbpaste'])],
+    "win32": [(['clip'], ['powershell', '-command', 'Get-Clipboard'])],
+    "linux": [
+        (['xclip', '-selection', 'clipboard'], ['xclip', '-selection', 'clipboard', '-o']),
+        (['xsel', '--clipboard', '--input'], ['xsel', '--clipboard', '--output']),
+    ],
+}
+
+# 未判定を表す番兵
+_UNDETECTED = object()
+
 
 class ClipboardManager:
     """クリップボード管理クラス"""
-    
-    @staticmethod
-    def copy_to_clipboard(text: str) -> bool:
+
+    # 利用可能な外部コマンド（プロセスごとに一度だけ判定）
+    _backend = _UNDETECTED
+
+    @classmethod
+    def get_backend(cls) -> Optional[Tuple[List[str], List[str]]]:
+        """利用可能な外部コマンドを取得（判定結果はキャッシュ）"""
+        if cls._backend is _UNDETECTED:
+            platform = "linux" if sys.platform.startswith("linux") else sys.platform
+            cls._backend = None
+            for copy_command, paste_command in _BACKEND_COMMANDS.get(platform, []):
+                if shutil.which(copy_command[0]):
+                    cls._backend = (copy_command, paste_command)
+                    break
+        return cls._backend
+
+    @classmethod
+    def copy_to_clipboard(cls, text: str) -> bool:
         """テキストをクリップボードにコピー"""
-        try:
-            if sys.platform == "darwin":  # macOS
-                process = subprocess.Popen(['pbcopy'], stdin=subprocess.PIPE)
-                process.communicate(text.encode('utf-8'))
-                return process.returncode == 0
-            
-            elif sys.platform == "win32":  # Windows
-                process = subprocess.Popen(['clip'], stdin=subprocess.PIPE, shell=True)
-                process.communicate(text.encode('utf-8'))
-                return process.returncode == 0
-            
-            elif sys.platform.startswith("linux"):  # Linux
-                # xclipを試す
-                try:
-                    process = subprocess.Popen(['xclip', '-selection', 'clipboard'], 
-                                             stdin=subprocess.PIPE)
-                    process.communicate(text.encode('utf-8'))
-                    return process.returncode == 0
-                except FileNotFoundError:
-                    # xselを試す
-                    try:
-                        process = subprocess.Popen(['xsel', '--clipboard', '--input'], 
-                                                 stdin=subprocess.PIPE)
-                        process.communicate(text.encode('utf-8'))
-                        return process.returncode == 0
-                    except FileNotFoundError:
-                        return False
-            
+        backend = cls.get_backend()
+        if backend is None:
             return False
-            
+
+        try:
+            process = subprocess.Popen(backend[0], stdin=subprocess.PIPE,
+                                       shell=sys.platform == "win32")
+            process.communicate(text.encode('utf-8'))
+            return process.returncode == 0
         except Exception as e:
             print(f"クリップボードコピーエラー: {e}")
             return False
-    
-    @staticmethod
-    def get_from_clipboard() -> Optional[str]:
+
+    @classmethod
+    def get_from_clipboard(cls) -> Optional[str]:
         """クリップボードからテキストを取得"""
-        try:
-            if sys.platform == "darwin":  # macOS
-                result = subprocess.run(['pbpaste'], capture_output=True, text=True)
-                return result.stdout if result.returncode == 0 else None
-            
-            elif sys.platform == "win32":  # Windows
-                # PowerShellを使用
-                result = subprocess.run(['powershell', '-command', 'Get-Clipboard'], 
-                                      capture_output=True, text=True)
-                return result.stdout.strip() if result.returncode == 0 else None
-            
-            elif sys.platform.startswith("linux"):  # Linux
-                # xclipを試す
-                try:
-                    result = subprocess.run(['xclip', '-selection', 'clipboard', '-o'], 
-                                          capture_output=True, text=True)
-                    return result.stdout if result.returncode == 0 else None
-                except FileNotFoundError:
-                    # xselを試す
-                    try:
-                        result = subprocess.run(['xsel', '--clipboard', '--output'], 
-                                              capture_output=True, text=True)
-                        return result.stdout if result.returncode == 0 else None
-                    except FileNotFoundError:
-                        return None
-            
+        backend = cls.get_backend()
+        if backend is None:
             return None
-            
+
+        try:
+            result = subprocess.run(backend[1], capture_output=True, text=True)
+            if result.returncode != 0:
+                return None
+            # PowerShellは末尾に改行を付ける
+            return result.stdout.strip() if sys.platform == "win32" else result.stdout
         except Exception as e:
             print(f"クリップボード取得エラー: {e}")
             return None
+
+
+class ClipboardService:
+    """描画ループを止めないクリップボードサービス
+
+    pygame.scrap（SDLのクリップボード）が使えればプロセス内で即座に処理し、
+    使えない場合は外部コマンドをワーカースレッドで実行する。
+    結果はどちらの場合も CLIPBOARD_EVENT としてイベントキューに届く。
+    pygame.scrap はウィンドウと同じスレッドから呼ぶ必要があるため、呼び出し元で扱う。
+    """
+
+    def __init__(self):
+        self._requests: "queue.Queue[Optional[Tuple[str, Optional[str]]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def copy_async(self, text: str):
+        """テキストのコピーを開始（完了は CLIPBOARD_EVENT で通知）"""
+        if self._scrap_put(text):
+            self._notify('copy', True, text)
+        else:
+            self._submit('copy', text)
+
+    def paste_async(self):
+        """クリップボードの取得を開始（完了は CLIPBOARD_EVENT で通知）"""
+        text = self._scrap_get()
+        if text is not None:
+            self._notify('paste', True, text)
+        else:
+            self._submit('paste', None)
+
+    def shutdown(self):
+        """ワーカースレッドを終了"""
+        if self._worker is not None:
+            self._requests.put(None)
+            self._worker.join(timeout=1.0)
+            self._worker = None
+
+    def _submit(self, action: str, text: Optional[str]):
+        """外部コマンドによる処理をワーカースレッドに依頼"""
+        if ClipboardManager.get_backend() is None:
+            self._notify(action, False, None)
+            return
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="clipboard", daemon=True)
+            self._worker.start()
+        self._requests.put((action, text))
+
+    def _run(self):
+        """ワーカースレッドの処理ループ"""
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            action, text = request
+            if action == 'copy':
+                self._notify('copy', ClipboardManager.copy_to_clipboard(text), text)
+            else:
+                text = ClipboardManager.get_from_clipboard()
+                self._notify('paste', text is not None, text)
+
+    @staticmethod
+    def _scrap_ready() -> bool:
+        """pygame.scrapが使えるか（ウィンドウが必要）"""
+        if not pygame.display.get_init() or pygame.display.get_surface() is None:
+            return False
+        try:
+            if not pygame.scrap.get_init():
+                pygame.scrap.init()
+            return pygame.scrap.get_init()
+        except pygame.error:
+            return False
+
+    def _scrap_put(self, text: str) -> bool:
+        """pygame.scrapでコピー"""
+        if not self._scrap_ready():
+            return False
+        try:
+            pygame.scrap.put(pygame.SCRAP_TEXT, text.encode('utf-8'))
+            return True
+        except pygame.error:
+            return False
+
+    def _scrap_get(self) -> Optional[str]:
+        """pygame.scrapで取得"""
+        if not self._scrap_ready():
+            return None
+        try:
+            data = pygame.scrap.get(pygame.SCRAP_TEXT)
+        except pygame.error:
+            return None
+        if data is None:
+            return None
+        return data.decode('utf-8', errors='ignore').rstrip('\0')
+
+    @staticmethod
+    def _notify(action: str, success: bool, text: Optional[str]):
+        """完了イベントをpygameのイベントキューに送る"""
+        if pygame.display.get_init():
+            pygame.event.post(pygame.event.Event(CLIPBOARD_EVENT, action=action,
+                                                 success=success, text=text))
@@ -0,0 +1,221 @@
+"""
+ドロー戦略の学習用バッチ環境（NumPy）
+
+PokerGame と同じルール（5ラウンド、ラウンドごとに2回までドロー、ドローを使い切ると
+自動スタンド）で N 個のゲームを同時に進める。pygameは使わない。
+
+    env = PokerBatchEnv(4096, seed=0)
+    obs, info = env.reset()
+    obs, reward, terminated, truncated, info = env.step(hold_masks)
+
+観測: cards (N, 5) カードID、draws_remaining (N,)、round (N,)
+行動: (N,) のホールドマスク（ビットi = i枚目を残す、31 = スタンド）
+報酬: スタンドしたゲームはそのハンドのスコア、それ以外は0
+終了したゲームは自動的にリセットされる（info["final_score"] に合計スコア）。
+"""
+
+import os
+from collections import Counter
+from itertools import combinations_with_replacement
+from typing import Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .catalog import load_catalog
+from .hand_evaluator import HandEvaluator
+from .hand_state import HAND_SIZE, ROYAL_MASK, STRAIGHT_MASKS
+
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cards.csv")
+
+ALL_HELD = (1 << HAND_SIZE) - 1
+N_RANKS = len(HandEvaluator.RANK_ORDER)
+
+
+class HandScorer:
+    """カードIDの配列 (N, 5) からスコアをまとめて計算する
+
+    HandEvaluator.evaluate_hand と同じ判定順で、役名の代わりにスコアだけを返す。
+    ランクの組み合わせとスペシャル役のカテゴリ区分の組み合わせは事前に表にしておき、
+    実行時は並べ替えと表引きだけで計算する。
+    """
+
+    # 事前計算する表（共有メモリで公開してワーカーから参照できる）
+    TABLES = ('standard_score', 'beats_flush', 'straight', 'royal', 'special_score')
+
+    def __init__(self, catalog, tables: Optional[Mapping] = None):
+        evaluator = HandEvaluator()
+        table = evaluator.SPECIAL_HANDS
+
+        self.rank_ids = np.asarray(catalog.rank_ids, dtype=np.int64)
+        self.suit_ids = np.asarray(catalog.suit_ids, dtype=np.int64)
+        # スペシャル役で参照しないカテゴリは「その他」区分にまとめる
+        n_classes = len(table.categories) + 1
+        class_of_category = [table.category_index.get(category, n_classes - 1) for category in catalog.categories]
+        self.category_classes = np.asarray(class_of_category, dtype=np.int64)[np.asarray(catalog.category_ids)]
+
+        suits = catalog.suits
+        self.flush_bonus = np.array([evaluator._get_flush_bonus(suit) for suit in suits], dtype=np.int64)
+        self.master_score = np.array([int(15000 * evaluator._get_suit_bonus_multiplier(suit)) for suit in suits],
+                                     dtype=np.int64)
+        self.green = suits.index('Green') if 'Green' in suits else -1
+
+        # ランクの組み合わせは昇順の5ランクを13進数、カテゴリ区分の組み合わせは同様に区分数進数で添字にする
+        self.rank_weights = N_RANKS ** np.arange(HAND_SIZE - 1, -1, -1)
+        self.class_weights = n_classes ** np.arange(HAND_SIZE - 1, -1, -1)
+        if tables is not None:
+            # 公開済みの表はコピーせずに使う
+            for name in self.TABLES:
+                setattr(self, name, np.asarray(tables[name]))
+        else:
+            self._build_tables(evaluator, n_classes)
+
+    def _build_tables(self, evaluator: HandEvaluator, n_classes: int):
+        """ランクの組み合わせ（6188通り）とカテゴリ区分の組み合わせごとの表を作る"""
+        size = N_RANKS ** HAND_SIZE
+        self.standard_score = np.zeros(size, dtype=np.int64)  # フラッシュでない場合のスコア
+        self.beats_flush = np.zeros(size, dtype=bool)         # フォーカード・フルハウス
+        self.straight = np.zeros(size, dtype=bool)
+        self.royal = np.zeros(size, dtype=bool)
+        mixed_suits = ['a', 'b', 'a', 'a', 'a']
+        for combo in combinations_with_replacement(range(N_RANKS), HAND_SIZE):
+            key = int(np.dot(combo, self.rank_weights))
+            ranks = [HandEvaluator.RANK_ORDER[value] for value in combo]
+            name, score, _ = evaluator._check_standard_hands(None, ranks, mixed_suits, Counter(ranks),
+                                                              Counter(mixed_suits))
+            mask = sum(1 << value for value in combo)
+            self.standard_score[key] = score
+            self.beats_flush[key] = name in ("Four of a Kind", "Full House")
+            self.straight[key] = len(set(combo)) == HAND_SIZE and mask in STRAIGHT_MASKS
+            self.royal[key] = mask == ROYAL_MASK
+
+        # 異なるスート数ごとのスペシャル役のスコア
+        table = evaluator.SPECIAL_HANDS
+        rule_scores = [rule["score"] for rule in table.rules]
+        self.special_score = np.zeros((HAND_SIZE + 1, n_classes ** HAND_SIZE), dtype=np.int64)
+        for combo in combinations_with_replacement(range(n_classes), HAND_SIZE):
+            key = int(np.dot(combo, self.class_weights))
+            histogram = tuple(combo.count(i) for i in range(n_classes - 1))
+            for distinct_suits in range(1, HAND_SIZE + 1):
+                rule = table.match(histogram, distinct_suits)
+                if rule >= 0:
+                    self.special_score[distinct_suits, key] = rule_scores[rule]
+
+    def tables(self) -> Dict[str, np.ndarray]:
+        """事前計算した表（publish_catalog に渡して共有する）"""
+        return {name: getattr(self, name) for name in self.TABLES}
+
+    def score(self, cards: np.ndarray) -> np.ndarray:
+        """(N, 5) のカードIDからスコア (N,) を計算"""
+        rank_key = np.sort(self.rank_ids[cards], axis=1) @ self.rank_weights
+        class_key = np.sort(self.category_classes[cards], axis=1) @ self.class_weights
+        suits = self.suit_ids[cards]
+        sorted_suits = np.sort(suits, axis=1)
+        distinct_suits = 1 + (sorted_suits[:, 1:] != sorted_suits[:, :-1]).sum(axis=1)
+        first_suit = suits[:, 0]
+
+        flush = distinct_suits == 1
+        straight = self.straight[rank_key]
+        standard = self.standard_score[rank_key]
+        special = self.special_score[distinct_suits, class_key]
+
+        # 判定順: AWSマスター > レジェンダリーフラッシュ > スペシャル役 > ストレートフラッシュ > 通常の役
+        flush_score = np.where(straight, 5000 + self.flush_bonus[first_suit],
+                               np.where(self.beats_flush[rank_key], standard, self.flush_bonus[first_suit]))
+        score = np.where(special > 0, special, np.where(flush, flush_score, standard))
+        score = np.where(flush & straight & (first_suit == self.green), 10000, score)
+        return np.where(flush & self.royal[rank_key], self.master_score[first_suit], score)
+
+
+class PokerBatchEnv:
+    """N個のゲームを同時に進めるGym風の環境"""
+
+    def __init__(self, num_envs: int, csv_path: str = DEFAULT_CSV, seed: Optional[int] = None,
+                 max_rounds: int = 5, draws_per_round: int = 2):
+        with load_catalog(csv_path) as catalog:
+            self.scorer = HandScorer(catalog)
+            self.num_cards = len(catalog)
+        self.num_envs = num_envs
+        self.max_rounds = max_rounds
+        self.draws_per_round = draws_per_round
+        self.rng = np.random.default_rng(seed)
+
+        self.cards = np.zeros((num_envs, HAND_SIZE), dtype=np.int64)
+        self.out_of_deck = np.zeros((num_envs, self.num_cards), dtype=bool)  # 手札と過去ラウンドのカード
+        self.draws_remaining = np.zeros(num_envs, dtype=np.int64)
+        self.round = np.zeros(num_envs, dtype=np.int64)
+        self.total_score = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[Dict[str, np.ndarray], Dict]:
+        """全ゲームを最初のラウンドから始める"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_games(np.ones(self.num_envs, dtype=bool))
+        return self._observation(), {}
+
+    def _reset_games(self, done: np.ndarray):
+        """指定したゲームを新しいデッキでやり直す"""
+        self.out_of_deck[done] = False
+        self.round[done] = 1
+        self.total_score[done] = 0
+        self._new_hand(done)
+
+    def _new_hand(self, envs: np.ndarray):
+        """新しいラウンドの手札を配る（前のラウンドのカードはデッキに戻らない）"""
+        self._deal(envs, np.zeros(self.num_envs, dtype=np.int64), return_discards=False)
+        self.draws_remaining[envs] = self.draws_per_round
+
+    def _deal(self, envs: np.ndarray, hold_masks: np.ndarray, return_discards: bool = True):
+        """残さないカードをデッキから配り直す"""
+        slots = envs[:, None] & ((hold_masks[:, None] >> np.arange(HAND_SIZE)) & 1 == 0)
+        pending_env, pending_slot = np.nonzero(slots)
+        if return_discards:
+            # 捨てたカードはデッキに戻してから引く（PokerGame.draw_cards と同じ）
+            self.out_of_deck[pending_env, self.cards[pending_env, pending_slot]] = False
+
+        # 1枚ずつ位置ごとに引けば同じゲームで同時に引くのは1枚なので、
+        # デッキにないカードを引き直すだけで重複しない
+        for slot in range(HAND_SIZE):
+            pending = np.flatnonzero(slots[:, slot])
+            while len(pending):
+                drawn = self.rng.integers(0, self.num_cards, size=len(pending))
+                accepted = ~self.out_of_deck[pending, drawn]
+                self.cards[pending[accepted], slot] = drawn[accepted]
+                self.out_of_deck[pending[accepted], drawn[accepted]] = True
+                pending = pending[~accepted]
+
+    def _observation(self) -> Dict[str, np.ndarray]:
+        """現在の観測"""
+        return {
+            "cards": self.cards.copy(),
+            "draws_remaining": self.draws_remaining.copy(),
+            "round": self.round.copy(),
+        }
+
+    def step(self, hold_masks) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray, Dict]:
+        """ホールドマスクで1ステップ進める"""
+        hold_masks = np.asarray(hold_masks, dtype=np.int64) & ALL_HELD
+        draw = (hold_masks != ALL_HELD) & (self.draws_remaining > 0)
+        if draw.any():
+            self._deal(draw, hold_masks)
+            self.draws_remaining[draw] -= 1
+
+        # スタンド（明示、またはドローを使い切った場合の自動スタンド）
+        stand = ~draw | (self.draws_remaining == 0)
+        rewards = np.zeros(self.num_envs, dtype=np.int64)
+        if stand.any():
+            rewards[stand] = self.scorer.score(self.cards[stand])
+            self.total_score += rewards
+            self.round[stand] += 1
+
+        terminated = self.round > self.max_rounds
+        info: Dict = {}
+        if terminated.any():
+            info["final_score"] = np.where(terminated, self.total_score, 0)
+            self._reset_games(terminated)
+
+        # 次のラウンドの手札を配る
+        next_round = stand & ~terminated
+        if next_round.any():
+            self._new_hand(next_round)
+
+        return self._observation(), rewards, terminated, np.zeros(self.num_envs, dtype=bool), info
@@ -0,0 +1,157 @@
+"""
+フォント管理（(パス, サイズ) ごとに1度だけ読み込んで共有）とフォントのサブセット化
+
+M+ Rounded 1c は日本語の全グリフを含み3MB以上あるため、UIとカード名で実際に使う文字だけに
+絞ったサブセット（fonts/MPLUSRounded1c-Regular-subset.ttf）を事前に作っておくと、
+起動時の読み込み時間とメモリを減らせる。サブセットがあればそちらを優先して使う。
+
+    python -m aws_poker.font_manager subset   # fonttools が必要（pip install -e .[fonts]）
+
+UIの文字列やカードを追加したら作り直すこと。
+"""
+
+import argparse
+import ast
+import os
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import pygame
+
+from .catalog import read_csv_rows
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+FONT_DIR = os.path.join(ROOT_DIR, "fonts")
+FONT_FILE = os.path.join(FONT_DIR, "MPLUSRounded1c-Regular.ttf")
+SUBSET_FILE = os.path.join(FONT_DIR, "MPLUSRounded1c-Regular-subset.ttf")
+
+# フォントが読めないときのpygame既定フォントの拡大率（既定フォントは小さく見えるため）
+FALLBACK_SCALE = 1.5
+
+# サブセットに常に含める文字（ゲームコード入力などの英数字記号、かな、全角記号）
+BASE_CHARACTERS = ''.join(chr(c) for c in range(0x20, 0x7F))
+BASE_RANGES = ((0x3000, 0x30FF), (0xFF01, 0xFF5E))
+
+# プロセス内で共有する読み込み済みフォント（(パス, サイズ) -> Font）
+_font_cache: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+
+
+def clear_fonts():
+    """読み込み済みのフォントを手放す（pygame.quit で呼ばれる）"""
+    _font_cache.clear()
+
+
+def get_font(path: Optional[str], size: int) -> pygame.font.Font:
+    """フォントを取得（同じパスとサイズは1度だけ読み込む。Noneはpygameの既定フォント）"""
+    key = (os.path.abspath(path) if path else None, size)
+    font = _font_cache.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.Font(key[0], size)
+        if not _font_cache:
+            # pygame.quit 後のフォントは使えないので破棄する（登録は1回の quit で消えるため毎回登録）
+            pygame.register_quit(clear_fonts)
+        _font_cache[key] = font
+    return font
+
+
+def default_font_path() -> str:
+    """ゲームで使うフォント（サブセットがあれば優先）"""
+    return SUBSET_FILE if os.path.exists(SUBSET_FILE) else FONT_FILE
+
+
+def game_font(size: int) -> pygame.font.Font:
+    """ゲームのフォント（読めなければpygameの既定フォント）"""
+    try:
+        return get_font(default_font_path(), size)
+    except (OSError, pygame.error):
+        return get_font(None, round(size * FALLBACK_SCALE))
+
+
+def font_stats() -> Dict[str, object]:
+    """監視用の統計"""
+    return {'fonts': len(_font_cache), 'path': default_font_path()}
+
+
+def _source_strings(source_dir: str) -> Iterable[str]:
+    """パッケージのソースにある文字列リテラル（f文字列の固定部分を含む）"""
+    for name in sorted(os.listdir(source_dir)):
+        if not name.endswith('.py'):
+            continue
+        with open(os.path.join(source_dir, name), encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=name)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                yield node.value
+
+
+def collect_text(csv_path: Optional[str] = None, source_dir: Optional[str] = None) -> str:
+    """UIとカード名で使う文字の集合"""
+    if csv_path is None:
+        csv_path = os.path.join(ROOT_DIR, "cards.csv")
+    if source_dir is None:
+        source_dir = os.path.dirname(__file__)
+
+    characters = set(BASE_CHARACTERS)
+    for start, end in BASE_RANGES:
+        characters.update(chr(c) for c in range(start, end + 1))
+    for value in _source_strings(source_dir):
+        characters.update(value)
+    for row in read_csv_rows(csv_path):
+        for column in ('service_name', 'category', 'suit', 'rank'):
+            characters.update(row[column])
+    return ''.join(sorted(c for c in characters if c.isprintable()))
+
+
+def subset_font(source: str, output: str, text: str) -> int:
+    """text の文字だけを含むフォントを書き出し、グリフ数を返す（fonttools が必要）"""
+    try:
+        from fontTools import subset
+    except ImportError:
+        raise RuntimeError("フォントのサブセット化には fonttools が必要です: pip install -e .[fonts]")
+
+    options = subset.Options()
+    options.layout_features = ['*']  # かなの字形切り替えなどを残す
+    options.name_IDs = ['*']  # ライセンス表記を残す
+    options.notdef_outline = True
+    font = subset.load_font(source, options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(text=text)
+    subsetter.subset(font)
+    glyphs = len(font.getGlyphOrder())
+    subset.save_font(font, output, options)
+    return glyphs
+
+
+def _load_time(path: str, sizes: Tuple[int, ...] = (16, 24, 32, 48)) -> float:
+    """ゲームで使う4サイズを読み込む時間（ミリ秒）"""
+    started = time.perf_counter()
+    for size in sizes:
+        pygame.font.Font(path, size)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    """コマンドライン"""
+    parser = argparse.ArgumentParser(description="フォント管理")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subset_parser = subparsers.add_parser("subset", help="UIとカード名で使う文字だけのフォントを作る")
+    subset_parser.add_argument("--source", default=FONT_FILE, help="元のフォント")
+    subset_parser.add_argument("--output", default=SUBSET_FILE, help="出力先")
+    subset_parser.add_argument("--csv", default=None, help="カードのCSV（既定: cards.csv）")
+    args = parser.parse_args()
+
+    text = collect_text(args.csv)
+    glyphs = subset_font(args.source, args.output, text)
+    source_size = os.path.getsize(args.source)
+    output_size = os.path.getsize(args.output)
+    print(f"サブセットフォントを生成しました: {args.output}")
+    print(f"文字数 {len(text)}, グリフ数 {glyphs}, "
+          f"{source_size / 1024:.0f} KB -> {output_size / 1024:.0f} KB ({output_size / source_size:.1%})")
+    pygame.font.init()
+    print(f"読み込み時間（4サイズ）: {_load_time(args.source):.1f} ms -> {_load_time(args.output):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+フレーム時間のプロファイラー（F3でオーバーレイ表示）
+"""
+
+import csv
+import time
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+import pygame
+
+
+class _Phase:
+    """フェーズの計測区間（with文で使う）"""
+
+    __slots__ = ('profiler', 'index', 'start')
+
+    def __init__(self, profiler: 'FrameProfiler', index: int):
+        self.profiler = profiler
+        self.index = index
+        self.start = 0.0
+
+    def __enter__(self):
+        if self.profiler.enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.profiler.enabled:
+            self.profiler._current[self.index] += time.perf_counter() - self.start
+
+
+class FrameProfiler:
+    """フェーズごとのフレーム時間を固定長のリングバッファに記録する
+
+    無効時は計測区間の出入りでフラグを見るだけなので、常に組み込んでおける。
+    """
+
+    PHASES = ('events', 'cards', 'evaluate', 'buttons', 'overlay', 'flip')
+    PHASE_COLORS = {
+        'events': (255, 99, 71),
+        'cards': (65, 105, 225),
+        'evaluate': (255, 215, 0),
+        'buttons': (50, 205, 50),
+        'overlay': (186, 85, 211),
+        'flip': (0, 206, 209),
+    }
+    TARGET_FRAME_TIME = 1 / 60
+
+    def __init__(self, capacity: int = 600):
+        self.capacity = capacity
+        self.enabled = False
+        self.visible = False  # オーバーレイ表示（計測だけ行う場合はFalse）
+        self.count = 0  # 記録済みフレーム数（capacityを超えると古いものから上書き）
+        # 列: フレーム時間 + 各フェーズ（秒）
+        self._columns = [array('d', bytes(8 * capacity)) for _ in range(len(self.PHASES) + 1)]
+        self._current = [0.0] * len(self.PHASES)
+        self._phases = {name: _Phase(self, i) for i, name in enumerate(self.PHASES)}
+        self._frame_start: Optional[float] = None
+
+    def toggle(self):
+        """計測とオーバーレイ表示を切り替える"""
+        self.enabled = not self.enabled
+        self.visible = self.enabled
+        self._frame_start = None
+
+    def phase(self, name: str) -> _Phase:
+        """フェーズの計測区間を取得"""
+        return self._phases[name]
+
+    def begin_frame(self):
+        """フレームの開始（前フレームの開始からの経過をフレーム時間として記録）"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self._record(now - self._frame_start)
+        self._frame_start = now
+        self._current = [0.0] * len(self.PHASES)
+
+    def _record(self, frame_time: float):
+        """1フレーム分のサンプルをリングバッファへ書き込む"""
+        slot = self.count % self.capacity
+        self._columns[0][slot] = frame_time
+        for i, value in enumerate(self._current, 1):
+            self._columns[i][slot] = value
+        self.count += 1
+
+    def samples(self, last: Optional[int] = None) -> List[List[float]]:
+        """記録済みサンプルを古い順に取得（各行: フレーム時間, 各フェーズ）"""
+        n = min(self.count, self.capacity)
+        if last is not None:
+            n = min(n, last)
+        start = self.count - n
+        return [[column[(start + i) % self.capacity] for column in self._columns] for i in range(n)]
+
+    def summary(self) -> Dict[str, float]:
+        """平均・最大のフレーム時間、FPS、フェーズごとの平均（ミリ秒）"""
+        n = min(self.count, self.capacity)
+        if n == 0:
+            return {}
+        # 平均は順序に依存しないので列をそのまま集計する
+        frame_times = self._columns[0][:n]
+        total = sum(frame_times)
+        result = {
+            'frame_ms': total / n * 1000,
+            'max_ms': max(frame_times) * 1000,
+            'fps': n / total if total > 0 else 0.0,
+        }
+        for i, name in enumerate(self.PHASES, 1):
+            result[name] = sum(self._columns[i][:n]) / n * 1000
+        return result
+
+    def export_csv(self, path: str) -> int:
+        """サンプルをCSVに書き出し、行数を返す"""
+        rows = self.samples()
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame', 'frame_ms'] + [f'{name}_ms' for name in self.PHASES])
+            first = self.count - len(rows)
+            for i, row in enumerate(rows):
+                writer.writerow([first + i] + [f'{value * 1000:.3f}' for value in row])
+        return len(rows)
+
+    def draw(self, surface: pygame.Surface, font: pygame.font.Font, history: int = 180,
+             extra_lines: Sequence[str] = ()):
+        """フレーム時間・FPS・フェーズ別の積み上げヒストグラムを描画（extra_lines は追加の表示行）"""
+        width, height = 420, 300
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 190))
+
+        stats = self.summary()
+        lines = ["Profiler (F3: 閉じる | F4: CSV出力)"]
+        if stats:
+            lines.append(f"{stats['fps']:.1f} FPS | frame {stats['frame_ms']:.2f} ms (max {stats['max_ms']:.2f})")
+        lines.extend(extra_lines)
+        y = 8
+        for line in lines:
+            panel.blit(font.render(line, True, (255, 255, 255)), (10, y))
+            y += font.get_linesize()
+
+        # フェーズ別の平均時間
+        for name in self.PHASES:
+            pygame.draw.rect(panel, self.PHASE_COLORS[name], (10, y + 4, 10, 10))
+            value = f"{stats[name]:.2f} ms" if stats else "-"
+            panel.blit(font.render(f"{name}: {value}", True, (230, 230, 230)), (26, y))
+            y += font.get_linesize()
+
+        # 直近フレームの積み上げヒストグラム（縦軸: 2フレーム分の予算）
+        graph = pygame.Rect(10, y + 6, width - 20, height - y - 16)
+        pygame.draw.rect(panel, (60, 60, 60), graph, 1)
+        scale = graph.height / (self.TARGET_FRAME_TIME * 2)
+        budget_y = graph.bottom - int(self.TARGET_FRAME_TIME * scale)
+        pygame.draw.line(panel, (255, 255, 255, 120), (graph.x, budget_y), (graph.right - 1, budget_y))
+
+        rows = self.samples(last=history)
+        bar_width = max(1, graph.width // history)
+        for i, row in enumerate(rows):
+            x = graph.x + i * bar_width
+            bottom = graph.bottom
+            for j, name in enumerate(self.PHASES, 1):
+                bar_height = int(row[j] * scale)
+                if bar_height <= 0:
+                    continue
+                top = max(graph.y, bottom - bar_height)
+                pygame.draw.rect(panel, self.PHASE_COLORS[name], (x, top, bar_width, bottom - top))
+                bottom = top
+
+        surface.blit(panel, (surface.get_width() - width - 10, 10))
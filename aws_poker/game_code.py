@@ -0,0 +1,40 @@
+"""
+ゲームコードの生成・検証とスコア算出（pygameに依存しない）
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Optional, Sequence
+
+# コードに使うAWS風の単語
+AWS_WORDS = ["CLOUD", "SCALE", "SECURE", "DEPLOY", "LAMBDA", "BUCKET", "QUEUE", "STACK"]
+
+
+def generate_game_code(round_scores: Sequence[Sequence], timestamp: Optional[str] = None) -> str:
+    """ラウンドの役とスコアから覚えやすいゲームコードを生成"""
+    # ラウンドスコアとタイムスタンプからハッシュを生成
+    score_string = "-".join([f"{entry[0]}:{entry[1]}" for entry in round_scores])
+    hash_input = f"{score_string}-{timestamp or datetime.now().isoformat()}"
+    hash_hex = hashlib.md5(hash_input.encode()).hexdigest()
+
+    # AWS風の覚えやすいコードに変換
+    word1 = AWS_WORDS[int(hash_hex[:2], 16) % len(AWS_WORDS)]
+    word2 = AWS_WORDS[int(hash_hex[2:4], 16) % len(AWS_WORDS)]
+
+    # 数字部分（下4桁、1000未満もゼロ埋めして4桁にする）
+    num_part = f"{int(hash_hex[4:8], 16) % 10000:04d}"
+
+    return f"{word1}-{word2}-{num_part}"
+
+
+def validate_game_code(code: str) -> bool:
+    """ゲームコードの形式を検証"""
+    parts = code.split('-')
+    return len(parts) == 3 and len(parts[2]) == 4 and parts[2].isdigit()
+
+
+def score_from_code(code: str) -> int:
+    """ゲームコードからダミースコアを生成（実際には暗号化されたデータから復元）"""
+    # ハッシュ値からスコアを生成
+    hash_value = sum(ord(c) for c in code)
+    return (hash_value % 5000) + 1000  # 1000-6000の範囲
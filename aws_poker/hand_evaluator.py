@@ -2,9 +2,14 @@
 ポーカーハンドの評価とスコア計算
 """
 
-from typing import List, Tuple, Dict
+from typing import TYPE_CHECKING, List, Tuple, Dict
 from collections import Counter
-from .card import Card
+
+from .special_hands import compile_special_rules
+
+if TYPE_CHECKING:
+    # 型ヒントのみ（評価器はpygameなしで使えるようにする）
+    from .card import Card
 
 class HandEvaluator:
     """ポーカーハンドの評価クラス"""
@@ -24,10 +29,22 @@ class HandEvaluator:
         'Gray': 175
     }
     
+    # 役の序列（弱い順、hand_key の最上位ビット）
+    HAND_CATEGORIES = [
+        "High Card", "One Pair", "Two Pair", "Three of a Kind", "Straight", "Flush",
+        "Full House", "Four of a Kind", "Straight Flush",
+        "DevOps Suite", "Data Pipeline", "Cloud Trio", "IoT Ecosystem", "Serverless Combo",
+        "Security Suite", "Multi-Cloud", "AWS Architect", "Legendary Flush", "AWS Master",
+    ]
+    HAND_CATEGORY_INDEX = {name: i + 1 for i, name in enumerate(HAND_CATEGORIES)}
+    
+    # スペシャル役の判定表（ルール定義は special_hands.py）
+    SPECIAL_HANDS = compile_special_rules()
+    
     def __init__(self):
         pass
     
-    def evaluate_hand(self, cards: List[Card]) -> Tuple[str, int, Dict]:
+    def evaluate_hand(self, cards: List['Card']) -> Tuple[str, int, Dict]:
         """
         ハンドを評価して役名、スコア、詳細情報を返す
         """
@@ -49,21 +66,11 @@ class HandEvaluator:
         # 通常の役をチェック
         return self._check_standard_hands(cards, ranks, suits, rank_counts, suit_counts)
     
-    def _check_special_hands(self, cards: List[Card], ranks: List[str], suits: List[str]) -> Tuple[str, int, Dict]:
+    def _check_special_hands(self, cards: List['Card'], ranks: List[str], suits: List[str]) -> Tuple[str, int, Dict]:
         """AWSスペシャル役をチェック（カテゴリベース）"""
         
-        suit_counts = Counter(suits)
-        rank_counts = Counter(ranks)
-        
         # カテゴリ情報を取得
-        categories = []
-        for card in cards:
-            if hasattr(card, 'category') and card.category:
-                categories.append(card.category)
-            else:
-                categories.append('Unknown')
-        
-        category_counts = Counter(categories)
+        categories = [getattr(card, 'category', None) or 'Unknown' for card in cards]
         
         # AWSマスター (ロイヤルストレートフラッシュ)
         if self._is_royal_straight_flush(ranks, suits):
@@ -77,52 +84,14 @@ class HandEvaluator:
         if self._is_straight_flush(ranks, suits) and suits[0] == 'Green':
             return "Legendary Flush", 10000, {"suit": "Green"}
         
-        # AWSアーキテクト (主要5カテゴリ)
-        required_categories = {'Compute', 'Storage', 'Database', 'Security-Identity-Compliance', 'Analytics'}
-        if len(set(categories)) >= 5 and required_categories.issubset(set(categories)):
-            return "AWS Architect", 3000, {"categories": list(required_categories)}
-        
-        # マルチクラウド (5つの異なるスート)
-        if len(set(suits)) == 5:
-            return "Multi-Cloud", 2200, {"suits": list(set(suits))}
-        
-        # セキュリティスイート (Security中心)
-        if (category_counts.get('Security-Identity-Compliance', 0) >= 3 or
-            (category_counts.get('Security-Identity-Compliance', 0) >= 2 and 
-             category_counts.get('Management-Governance', 0) >= 1)):
-            return "Security Suite", 1500, {"security_focus": True}
-        
-        # サーバーレスコンボ (Compute + Integration + Database)
-        if (category_counts.get('Compute', 0) >= 1 and
-            category_counts.get('App-Integration', 0) >= 1 and
-            category_counts.get('Database', 0) >= 1):
-            return "Serverless Combo", 1300, {"combo": "Compute+Integration+Database"}
-        
-        # IoTエコシステム (IoT + Analytics + AI)
-        if (category_counts.get('Internet-of-Things', 0) >= 1 and
-            (category_counts.get('Analytics', 0) >= 1 or 
-             category_counts.get('Artificial-Intelligence', 0) >= 1)):
-            return "IoT Ecosystem", 1000, {"iot_focus": True}
-        
-        # クラウドトリオ (Compute + Storage + Database)
-        if (category_counts.get('Compute', 0) >= 1 and
-            category_counts.get('Storage', 0) >= 1 and
-            category_counts.get('Database', 0) >= 1):
-            return "Cloud Trio", 800, {"combo": "Compute+Storage+Database"}
-        
-        # データパイプライン (Analytics + Storage)
-        if (category_counts.get('Analytics', 0) >= 2 and
-            category_counts.get('Storage', 0) >= 1):
-            return "Data Pipeline", 600, {"combo": "Analytics+Storage"}
-        
-        # DevOpsスイート (Developer-Tools + Management)
-        if (category_counts.get('Developer-Tools', 0) >= 2 and
-            category_counts.get('Management-Governance', 0) >= 1):
-            return "DevOps Suite", 500, {"combo": "DevTools+Management"}
+        # カテゴリ・スートの枚数で決まる役（ルール順に判定）
+        special = self.SPECIAL_HANDS.evaluate(categories, suits)
+        if special is not None:
+            return special
         
         return "", 0, {}
     
-    def _check_standard_hands(self, cards: List[Card], ranks: List[str], suits: List[str], 
+    def _check_standard_hands(self, cards: List['Card'], ranks: List[str], suits: List[str], 
                             rank_counts: Counter, suit_counts: Counter) -> Tuple[str, int, Dict]:
         """通常のポーカー役をチェック"""
         
@@ -199,26 +168,6 @@ class HandEvaluator:
         
         return False
     
-    def _is_serverless_combo(self, cards: List[Card]) -> bool:
-        """サーバーレスコンボかチェック"""
-        filenames = [card.filename.lower() for card in cards]
-        has_lambda = any('lambda' in name for name in filenames)
-        has_api = any('api' in name for name in filenames)
-        has_dynamo = any('dynamo' in name for name in filenames)
-        return has_lambda and has_api and has_dynamo
-    
-    def _is_cloud_trio(self, suits: List[str], rank_counts: Counter) -> bool:
-        """クラウドトリオかチェック"""
-        suit_counts = Counter(suits)
-        has_compute = suit_counts.get('Green', 0) >= 1
-        has_storage = suit_counts.get('Blue', 0) >= 1
-        has_database = suit_counts.get('Blue', 0) >= 2  # StorageとDatabaseは両方Blue
-        
-        # 3つの異なるランク + 他2枚の条件もチェック
-        unique_ranks = len([rank for rank, count in rank_counts.items() if count >= 1])
-        
-        return has_compute and has_storage and unique_ranks >= 3
-    
     def _get_flush_bonus(self, suit: str) -> int:
         """フラッシュのスート別ボーナス"""
         bonuses = {
@@ -253,27 +202,37 @@ class HandEvaluator:
         return ""
     
     def get_hand_strength(self, hand_name: str, score: int) -> int:
-        """役の強さを数値で返す（比較用）"""
-        strength_map = {
-            "High Card": 1,
-            "One Pair": 2,
-            "Two Pair": 3,
-            "Three of a Kind": 4,
-            "Straight": 5,
-            "Flush": 6,
-            "Full House": 7,
-            "Four of a Kind": 8,
-            "Straight Flush": 9,
-            "Royal Straight Flush": 10,
-            "DevOps Suite": 11,
-            "Data Pipeline": 12,
-            "Cloud Trio": 13,
-            "IoT Ecosystem": 14,
-            "Serverless Combo": 15,
-            "Security Suite": 16,
-            "Multi-Cloud": 17,
-            "AWS Architect": 18,
-            "Legendary Flush": 19,
-            "AWS Master": 20
-        }
-        return strength_map.get(hand_name, 0) * 1000 + score
+        """役の強さを数値で返す（比較用、同じ役・スコア内の順序は区別しない）"""
+        return self.hand_key(hand_name, score, [])
+    
+    def hand_key(self, hand_name: str, score: int, ranks: List[str]) -> int:
+        """役・スコア・ランクから全順序の整数キーを作る（大きいほど強い）
+        
+        ビット構成: 役の序列 << 36 | スコア << 20 | タイブレーク（4ビット×5枚）
+        タイブレークは枚数の多いランク、次に高いランクの順に並べる
+        （ツーペアなら上のペア、下のペア、キッカー）。
+        """
+        category = self.HAND_CATEGORY_INDEX.get(hand_name, 0)
+        rank_counts = Counter(self.RANK_VALUES[rank] for rank in ranks)
+        ordered = sorted(rank_counts, key=lambda value: (rank_counts[value], value), reverse=True)
+        tiebreak = 0
+        for value in ordered:
+            for _ in range(rank_counts[value]):
+                tiebreak = (tiebreak << 4) | (value + 1)
+        tiebreak <<= 4 * (5 - len(ranks))
+        return (category << 36) | (min(score, 0xFFFF) << 20) | tiebreak
+    
+    def evaluate_key(self, cards: List['Card']) -> int:
+        """ハンドを評価して全順序の整数キーを返す"""
+        hand_name, score, _ = self.evaluate_hand(cards)
+        if len(cards) != 5:
+            return 0
+        return self.hand_key(hand_name, score, [card.rank for card in cards])
+
+
+def argsort_hand_keys(keys, descending: bool = True):
+    """整数キーを一括で並べ替えたインデックスを返す（要numpy）"""
+    import numpy as np
+
+    keys = np.asarray(keys, dtype=np.int64)
+    return np.argsort(-keys if descending else keys, kind='stable')
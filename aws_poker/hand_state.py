@@ -0,0 +1,147 @@
+"""
+手札の増分評価
+
+ランク・スート・カテゴリのヒストグラムとランクのビットマスクを保持し、
+1枚の入れ替えを定数時間で反映する。評価結果は HandEvaluator.evaluate_hand と同じ。
+"""
+
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from .hand_evaluator import HandEvaluator
+
+if TYPE_CHECKING:
+    from .card import Card
+
+HAND_SIZE = 5
+
+# ストレートになるランクのビットマスク（A-2-3-4-5 から 9-10-J-Q-K まで）
+STRAIGHT_MASKS = frozenset(0b11111 << start for start in range(len(HandEvaluator.RANK_ORDER) - 4))
+# AWSマスターのランク（A, 10, J, Q, K）
+ROYAL_MASK = sum(1 << HandEvaluator.RANK_VALUES[rank] for rank in ('A', '10', 'J', 'Q', 'K'))
+
+
+class HandState:
+    """5枚の手札の増分評価状態"""
+
+    def __init__(self, evaluator: Optional[HandEvaluator] = None):
+        self.evaluator = evaluator or HandEvaluator()
+        self.table = self.evaluator.SPECIAL_HANDS
+        self.cards: List[Optional['Card']] = [None] * HAND_SIZE
+        self.filled = 0
+        self.rank_counts = [0] * len(HandEvaluator.RANK_ORDER)
+        self.count_of_counts = [0] * (HAND_SIZE + 1)  # 出現回数ごとのランク数
+        self.rank_mask = 0
+        self.suit_counts: Dict[str, int] = {}
+        self.category_counts = [0] * len(self.table.categories)
+        self._result: Optional[Tuple[str, int, Dict]] = None
+
+    @classmethod
+    def from_cards(cls, cards: Sequence['Card'], evaluator: Optional[HandEvaluator] = None) -> 'HandState':
+        """手札から状態を作成"""
+        state = cls(evaluator)
+        state.set_cards(cards)
+        return state
+
+    def set_cards(self, cards: Sequence['Card']):
+        """手札全体を設定"""
+        for slot in range(HAND_SIZE):
+            self.replace(slot, cards[slot] if slot < len(cards) else None)
+
+    def replace(self, slot: int, card: Optional['Card']):
+        """指定位置のカードを入れ替える（定数時間）"""
+        old = self.cards[slot]
+        if old is card:
+            return
+        if old is not None:
+            self._update(old, -1)
+        if card is not None:
+            self._update(card, 1)
+        self.cards[slot] = card
+        self._result = None
+
+    def _update(self, card: 'Card', delta: int):
+        """ヒストグラムとビットマスクに1枚分を加減する"""
+        self.filled += delta
+
+        rank = HandEvaluator.RANK_VALUES[card.rank]
+        count = self.rank_counts[rank]
+        self.count_of_counts[count] -= 1
+        count += delta
+        self.count_of_counts[count] += 1
+        self.rank_counts[rank] = count
+        if count:
+            self.rank_mask |= 1 << rank
+        else:
+            self.rank_mask &= ~(1 << rank)
+
+        suit_count = self.suit_counts.get(card.suit, 0) + delta
+        if suit_count:
+            self.suit_counts[card.suit] = suit_count
+        else:
+            del self.suit_counts[card.suit]
+
+        category = self.table.category_index.get(getattr(card, 'category', None) or 'Unknown')
+        if category is not None:
+            self.category_counts[category] += delta
+
+    def evaluate(self) -> Tuple[str, int, Dict]:
+        """役名、スコア、詳細情報を返す（変更があるまで結果を保持）"""
+        if self._result is None:
+            self._result = self._classify()
+        return self._result
+
+    def key(self) -> int:
+        """全順序の整数キー（HandEvaluator.hand_key と同じ）"""
+        if self.filled != HAND_SIZE:
+            return 0
+        hand_name, score, _ = self.evaluate()
+        return self.evaluator.hand_key(hand_name, score, [card.rank for card in self.cards])
+
+    def _rank_with_count(self, count: int) -> str:
+        """指定された出現回数のランクを取得"""
+        for value, rank_count in enumerate(self.rank_counts):
+            if rank_count == count:
+                return HandEvaluator.RANK_ORDER[value]
+        return ""
+
+    def _classify(self) -> Tuple[str, int, Dict]:
+        """ヒストグラムから役を判定"""
+        if self.filled != HAND_SIZE:
+            return "Invalid Hand", 0, {}
+
+        evaluator = self.evaluator
+        flush_suit = next(iter(self.suit_counts)) if len(self.suit_counts) == 1 else None
+        straight = self.count_of_counts[1] == HAND_SIZE and self.rank_mask in STRAIGHT_MASKS
+        high_card = HandEvaluator.RANK_ORDER[self.rank_mask.bit_length() - 1]
+
+        # AWSスペシャル役
+        if flush_suit is not None and self.rank_mask == ROYAL_MASK:
+            bonus = evaluator._get_suit_bonus_multiplier(flush_suit)
+            return "AWS Master", int(15000 * bonus), {"suit": flush_suit, "bonus_multiplier": bonus}
+        if flush_suit == 'Green' and straight:
+            return "Legendary Flush", 10000, {"suit": "Green"}
+        rule_index = self.table.match(tuple(self.category_counts), len(self.suit_counts))
+        if rule_index >= 0:
+            return self.table.describe(rule_index, self.suit_counts.keys())
+
+        # 通常の役
+        if flush_suit is not None and straight:
+            suit_bonus = evaluator._get_flush_bonus(flush_suit)
+            return "Straight Flush", 5000 + suit_bonus, {"suit": flush_suit, "bonus": suit_bonus}
+        if self.count_of_counts[4]:
+            return "Four of a Kind", 2500, {"rank": self._rank_with_count(4)}
+        if self.count_of_counts[3] and self.count_of_counts[2]:
+            return "Full House", 1200, {"three": self._rank_with_count(3), "pair": self._rank_with_count(2)}
+        if flush_suit is not None:
+            return "Flush", evaluator._get_flush_bonus(flush_suit), {"suit": flush_suit}
+        if straight:
+            return "Straight", 400, {"high_card": high_card}
+        if self.count_of_counts[3]:
+            return "Three of a Kind", 200, {"rank": self._rank_with_count(3)}
+        if self.count_of_counts[2] == 2:
+            pairs = [HandEvaluator.RANK_ORDER[value] for value in range(len(self.rank_counts) - 1, -1, -1)
+                     if self.rank_counts[value] == 2]
+            return "Two Pair", 100, {"pairs": pairs}
+        if self.count_of_counts[2]:
+            return "One Pair", 50, {"rank": self._rank_with_count(2)}
+        return "High Card", 10, {"high_card": high_card}
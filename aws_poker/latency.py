@@ -0,0 +1,52 @@
+"""
+レイテンシの固定バケットヒストグラム（スコアリングサービス・アップローダー・負荷テストで共通）
+"""
+
+from bisect import bisect_left
+from typing import Dict
+
+
+class LatencyHistogram:
+    """固定バケットのレイテンシヒストグラム（ミリ秒）"""
+
+    BUCKETS_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)  # 最後は上限超え
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float):
+        """1リクエスト分の所要時間を記録"""
+        ms = seconds * 1000
+        self.counts[bisect_left(self.BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction: float) -> float:
+        """パーセンタイルの推定値（該当バケットの上限、上限超えは最大値）"""
+        if self.count == 0:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> Dict:
+        """JSON用の集計"""
+        buckets = {f"le_{bound}": count for bound, count in zip(self.BUCKETS_MS, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p90_ms": self.percentile(0.9),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+            "buckets": buckets,
+        }
@@ -2,47 +2,57 @@
 AWSポーカーゲームのメインクラス
 """
 
-import hashlib
 import json
 import os
 import random
 import string
 import sys
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
 
 import pygame
 
 from .card import Card, Deck
 from .hand_evaluator import HandEvaluator
+from .hand_state import HandState
+from .tablebase import DEFAULT_CSV, DEFAULT_TABLE, Tablebase
 from .sound_manager import SoundManager
-from .clipboard_utils import ClipboardManager
+from .clipboard_utils import CLIPBOARD_EVENT, ClipboardService
+from .frame_profiler import FrameProfiler
+from .font_manager import game_font
+from .render_backend import create_backend
+from .game_code import generate_game_code, score_from_code, validate_game_code
+from .snapshot import STATES, GameSnapshot, SnapshotError
+from .text_input import TextInputBox
+
+# ゲームコードの検証・登録の完了を通知するイベント
+# (code: str, valid: bool, score: int, error: Optional[str])
+GAME_CODE_EVENT = pygame.USEREVENT + 4
 
 
 class PokerGame:
     """AWSポーカーゲーム"""
     
-    def __init__(self, width: int = 1800, height: int = 800):
+    # 描画済みのまま使い回すUI（タイトル・ラベル・ボタン）の最大数
+    UI_CACHE_SIZE = 64
+    
+    def __init__(self, width: int = 1800, height: int = 800, surface_budget: Optional[int] = None,
+                 renderer: str = 'software', scale: float = 1.0):
         pygame.init()
         
         self.width = width
         self.height = height
-        self.screen = pygame.display.set_mode((width, height))
-        pygame.display.set_caption("AWS Porker - AWSアイコンポーカー")
+        # 描画バックエンド（texture: SDL2 Rendererでカード面をテクスチャ合成、使えなければsoftware）
+        self.backend = create_backend(renderer, width, height, "AWS Porker - AWSアイコンポーカー", scale)
+        self.screen = self.backend.screen
         
-        # フォント
-        font_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "fonts", "MPLUSRounded1c-Regular.ttf")
-        try:
-            self.font = pygame.font.Font(font_path, 24)
-            self.small_font = pygame.font.Font(font_path, 16)
-            self.large_font = pygame.font.Font(font_path, 32)
-            self.huge_font = pygame.font.Font(font_path, 48)
-        except:
-            # フォントが見つからない場合はデフォルトフォントを使用
-            self.font = pygame.font.Font(None, 36)
-            self.small_font = pygame.font.Font(None, 24)
-            self.large_font = pygame.font.Font(None, 48)
-            self.huge_font = pygame.font.Font(None, 72)
+        # フォント（読み込み済みのものを共有、サブセットがあれば優先、なければ既定フォント）
+        self.font = game_font(24)
+        self.small_font = game_font(16)
+        self.large_font = game_font(32)
+        self.huge_font = game_font(48)
         
         # 色定義
         self.bg_color = (34, 139, 34)  # フォレストグリーン
@@ -50,11 +60,22 @@ class PokerGame:
         self.button_hover_color = (100, 149, 237)
         self.text_color = (255, 255, 255)
         
+        # カード画像のサーフェス（表示形式へ変換して共有、カード表面はメモリ予算内でLRU）
+        self.surfaces = Card.surfaces
+        if surface_budget is not None:
+            self.surfaces.set_budget(surface_budget)
+        
+        # 変化の少ないUIの描画済みサーフェス（同じサーフェスならtexture描画でも転送は1度だけ）
+        self._ui_cache: 'OrderedDict[Hashable, pygame.Surface]' = OrderedDict()
+        
         # ゲーム状態
         self.deck = Deck()
         self.hand: List[Card] = []
         self.selected_cards: List[bool] = [False] * 5
         self.evaluator = HandEvaluator()
+        self.hand_state = HandState(self.evaluator)  # 手札の増分評価（毎フレームの役表示用）
+        self.tablebase: Optional[Tablebase] = None  # ヒント用テーブルベース（初回使用時に読み込む）
+        self.tablebase_available = os.path.exists(DEFAULT_TABLE)
         
         # ゲーム進行
         self.current_round = 1
@@ -75,13 +96,25 @@ class PokerGame:
         self.current_hand_result = None
         self.final_game_code = None  # 最終ゲームコードを保存
         
-        # クリップボード関連
-        self.clipboard_manager = ClipboardManager()
+        # クリップボード関連（描画ループを止めないようにバックグラウンドで処理）
+        self.clipboard_service = ClipboardService()
         self.code_copied_time = 0  # コピー完了時刻
         self.code_rect = None  # ゲームコードの矩形領域
         
-        # ランキング
+        # ゲームコード入力（ウィンドウ内のテキスト入力）
+        self.code_input = TextInputBox(
+            pygame.Rect(width // 2 - 300, height // 2 - 100, 600, 170), self.font,
+            "ゲームコードを入力してください", placeholder="例: CLOUD-LAMBDA-1234"
+        )
+        self.show_message = None  # 画面下部に表示する通知メッセージ
+        self.message_timer = 0
+        
+        # ランキング（ゲームコード登録はワーカースレッドからも書き込む）
         self.rankings_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), "rankings.json")
+        self.rankings_lock = threading.Lock()
+        
+        # フレーム時間プロファイラー（F3で表示、F4でCSV出力）
+        self.profiler = FrameProfiler()
         
         # サウンドマネージャー
         self.sound_manager = SoundManager()
@@ -98,9 +131,10 @@ class PokerGame:
     def deal_new_hand(self):
         """新しいハンドを配る"""
         if self.deck.cards_remaining() < 5:
-            self.deck = Deck()  # 新しいデッキを作成
+            self.deck = Deck(rng_state=self.deck.next_random())  # 新しいデッキを作成（乱数は引き継ぐ）
         
         self.hand = self.deck.deal(5)
+        self.hand_state.set_cards(self.hand)
         self.selected_cards = [False] * 5
         self.draws_remaining = 2
     
@@ -121,6 +155,7 @@ class PokerGame:
             "sound_toggle": pygame.Rect(start_x + button_spacing * 6, self.height - 100, button_width, button_height),
             "show_hands": pygame.Rect(start_x + button_spacing * 7, self.height - 100, button_width, button_height),
             "show_deck": pygame.Rect(start_x + button_spacing * 8, self.height - 100, button_width, button_height),
+            "hint": pygame.Rect(start_x + button_spacing * 9, self.height - 100, button_width, button_height),
             "close_overlay": pygame.Rect(self.width - 150, 50, 100, 40)
         }
     
@@ -129,8 +164,27 @@ class PokerGame:
         if event.type == pygame.QUIT:
             return False
         
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_pos = pygame.mouse.get_pos()
+        # プロファイラー操作はどの画面でも受け付ける
+        if event.type == pygame.KEYDOWN and event.key in (pygame.K_F3, pygame.K_F4):
+            if event.key == pygame.K_F3:
+                self.profiler.toggle()
+            elif self.profiler.enabled:
+                self.export_profile()
+            return True
+        
+        # ゲームコード入力中はキー入力を入力ボックスに渡し、クリックは無視する
+        if self.code_input.active and event.type in (pygame.TEXTINPUT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+            action = self.code_input.handle_event(event)
+            if action == 'submit':
+                self.submit_game_code(self.code_input.text)
+            elif action == 'cancel':
+                self.code_input.stop()
+            elif action == 'paste':
+                self.clipboard_service.paste_async()
+            return True
+        
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            mouse_pos = self.backend.mouse_pos()
             
             # カード選択
             if self.game_state == "playing":
@@ -168,6 +222,12 @@ class PokerGame:
                 self.next_round()
             pygame.time.set_timer(pygame.USEREVENT + 2, 0)  # タイマーを停止
         
+        elif event.type == CLIPBOARD_EVENT:
+            self.handle_clipboard_result(event)
+        
+        elif event.type == GAME_CODE_EVENT:
+            self.handle_game_code_result(event)
+        
         return True
     
     def handle_card_selection(self, mouse_pos: Tuple[int, int]):
@@ -204,6 +264,8 @@ class PokerGame:
                     self.show_hands_overlay()
                 elif button_name == "show_deck":
                     self.show_deck_overlay()
+                elif button_name == "hint" and self.should_show_button("hint"):
+                    self.show_hint()
                 elif button_name == "close_overlay" and self.show_overlay:
                     self.show_overlay = False
                     self.overlay_scroll = 0
@@ -238,6 +300,7 @@ class PokerGame:
         for i, selected in enumerate(self.selected_cards):
             if selected:
                 self.hand[i] = new_cards[new_card_index]
+                self.hand_state.replace(i, self.hand[i])
                 new_card_index += 1
                 self.selected_cards[i] = False
         
@@ -252,7 +315,7 @@ class PokerGame:
     
     def stand(self):
         """ハンドを確定"""
-        hand_name, score, details = self.evaluator.evaluate_hand(self.hand)
+        hand_name, score, details = self.hand_state.evaluate()
         self.round_scores.append((hand_name, score, details))
         self.total_score += score
         self.current_hand_result = (hand_name, score, details)
@@ -290,7 +353,7 @@ class PokerGame:
         self.final_game_code = None  # ゲームコードをリセット
         self.code_copied_time = 0  # コピー時刻をリセット
         self.code_rect = None  # 矩形をリセット
-        self.deck = Deck()
+        self.deck = Deck(rng_state=self.deck.next_random())
         self.deal_new_hand()
         self.game_state = "playing"
         
@@ -298,6 +361,54 @@ class PokerGame:
         pygame.time.set_timer(pygame.USEREVENT + 1, 0)
         pygame.time.set_timer(pygame.USEREVENT + 2, 0)
     
+    def save_snapshot(self) -> bytes:
+        """進行中のゲームをバイナリスナップショットにする
+
+        デッキの並び順とデッキの乱数状態を保存するので、再開後のドロー（シャッフル）や
+        新しいデッキも中断しなかった場合と同じになる。
+        """
+        return GameSnapshot(
+            self.deck.total_cards, [card.card_id for card in self.hand],
+            deck=[card.card_id for card in self.deck.cards],
+            selected=sum(1 << i for i, selected in enumerate(self.selected_cards) if selected),
+            round_number=self.current_round, draws_remaining=self.draws_remaining,
+            total_score=self.total_score,
+            round_scores=[(hand_name, score) for hand_name, score, _ in self.round_scores],
+            state=self.game_state if self.game_state in STATES else "playing",
+            game_code=self.final_game_code, rng_state=self.deck.rng_state,
+        ).to_bytes()
+    
+    def load_snapshot(self, data: bytes):
+        """スナップショットからゲームを再開（役の詳細情報は復元しない）"""
+        snapshot = GameSnapshot.from_bytes(data)
+        deck = Deck()
+        if snapshot.deck is None or snapshot.n_cards != deck.total_cards:
+            raise SnapshotError("カードデータが一致しません")
+        cards = sorted(deck.cards, key=lambda card: card.card_id)
+        deck.cards = [cards[card_id] for card_id in snapshot.deck]
+        deck.rng_state = snapshot.rng_state
+        
+        self.deck = deck
+        self.hand = [cards[card_id] for card_id in snapshot.hand]
+        self.hand_state.set_cards(self.hand)
+        self.selected_cards = [bool(snapshot.selected >> i & 1) for i in range(len(self.hand))]
+        self.current_round = snapshot.round
+        self.draws_remaining = snapshot.draws_remaining
+        self.total_score = snapshot.total_score
+        self.round_scores = [(hand_name, score, {}) for hand_name, score in snapshot.round_scores]
+        self.current_hand_result = self.round_scores[-1] if self.round_scores else None
+        self.final_game_code = snapshot.game_code
+        self.game_state = snapshot.state
+        
+        # 中断時のタイマーを設定し直す
+        pygame.time.set_timer(pygame.USEREVENT + 1, 0)
+        pygame.time.set_timer(pygame.USEREVENT + 2, 0)
+        if self.game_state == "hand_result":
+            self.transition_timer = pygame.time.get_ticks()
+            pygame.time.set_timer(pygame.USEREVENT + 2, self.transition_duration)
+        elif self.game_state == "playing" and self.draws_remaining <= 0:
+            pygame.time.set_timer(pygame.USEREVENT + 1, 1000)
+    
     def save_score(self):
         """スコアを保存"""
         # 既に生成されたゲームコードを使用、なければ新規生成
@@ -311,85 +422,74 @@ class PokerGame:
         }
         
         # ランキングファイルに保存
-        try:
-            with open(self.rankings_file, 'r') as f:
-                rankings = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            rankings = []
-        
-        rankings.append(ranking_entry)
-        rankings.sort(key=lambda x: x["total_score"], reverse=True)
-        
-        with open(self.rankings_file, 'w') as f:
-            json.dump(rankings, f, indent=2)
+        with self.rankings_lock:
+            rankings = self.load_rankings()
+            rankings.append(ranking_entry)
+            rankings.sort(key=lambda x: x["total_score"], reverse=True)
+            self.write_rankings(rankings)
         
         print(f"ゲームコード: {game_code}")
         print(f"スコア: {self.total_score}")
     
     def generate_game_code(self) -> str:
         """覚えやすいゲームコードを生成"""
-        # ラウンドスコアとタイムスタンプからハッシュを生成
-        score_string = "-".join([f"{hand}:{score}" for hand, score, _ in self.round_scores])
-        timestamp = datetime.now().isoformat()
-        hash_input = f"{score_string}-{timestamp}"
-        
-        hash_object = hashlib.md5(hash_input.encode())
-        hash_hex = hash_object.hexdigest()
-        
-        # AWS風の覚えやすいコードに変換
-        aws_words = ["CLOUD", "SCALE", "SECURE", "DEPLOY", "LAMBDA", "BUCKET", "QUEUE", "STACK"]
-        word1 = aws_words[int(hash_hex[:2], 16) % len(aws_words)]
-        word2 = aws_words[int(hash_hex[2:4], 16) % len(aws_words)]
-        
-        # 数字部分
-        num_part = str(int(hash_hex[4:8], 16))[-4:]
-        
-        return f"{word1}-{word2}-{num_part}"
+        return generate_game_code(self.round_scores)
     
     def load_game_code(self):
-        """ゲームコードを入力してランキングに追加"""
+        """ゲームコード入力ボックスを開く"""
+        if not self.code_input.active:
+            self.code_input.start()
+    
+    def submit_game_code(self, game_code: str):
+        """入力されたゲームコードの検証と登録をバックグラウンドで開始"""
+        self.code_input.stop()
+        game_code = game_code.strip()
+        if not game_code:
+            self.set_message("コードが入力されませんでした")
+            return
+        
+        threading.Thread(target=self._process_game_code, args=(game_code,),
+                         name="game-code", daemon=True).start()
+    
+    def _process_game_code(self, game_code: str):
+        """ワーカースレッドでゲームコードを検証してランキングに追加"""
+        valid, score, error = False, 0, None
         try:
-            # コンソール入力を使用（Tkinterの問題を回避）
-            print("\n" + "="*50)
-            print("🎮 ゲームコード入力")
-            print("="*50)
-            print("例: CLOUD-LAMBDA-1234")
-            game_code = input("ゲームコードを入力してください: ").strip()
-            
-            if game_code:
-                # ゲームコードの検証
-                if self.validate_game_code(game_code):
-                    # スコアデータを復元
-                    score = self.generate_dummy_score_from_code(game_code)
-                    self.add_score_to_ranking(game_code, score)
-                    
-                    # 成功メッセージを表示
-                    self.show_message = f"コード読み込み完了！スコア: {score}"
-                    self.message_timer = pygame.time.get_ticks()
-                    print(f"✅ ゲームコード '{game_code}' をランキングに追加しました！")
-                    print(f"📊 スコア: {score}")
-                else:
-                    self.show_message = "無効なゲームコードです"
-                    self.message_timer = pygame.time.get_ticks()
-                    print("❌ 無効なゲームコードです。")
-            else:
-                print("❌ コードが入力されませんでした。")
-                
+            valid = self.validate_game_code(game_code)
+            if valid:
+                # スコアデータを復元
+                score = self.generate_dummy_score_from_code(game_code)
+                self.add_score_to_ranking(game_code, score)
         except Exception as e:
-            print(f"❌ ゲームコード読み込みエラー: {e}")
-            self.show_message = "コード読み込みに失敗しました"
-            self.message_timer = pygame.time.get_ticks()
+            error = str(e)
+        pygame.event.post(pygame.event.Event(GAME_CODE_EVENT, code=game_code, valid=valid,
+                                             score=score, error=error))
+    
+    def handle_game_code_result(self, event):
+        """ゲームコード登録の完了イベントを処理"""
+        if event.error:
+            print(f"❌ ゲームコード読み込みエラー: {event.error}")
+            self.set_message("コード読み込みに失敗しました")
+        elif event.valid:
+            print(f"✅ ゲームコード '{event.code}' をランキングに追加しました！")
+            print(f"📊 スコア: {event.score}")
+            self.set_message(f"コード読み込み完了！スコア: {event.score}")
+        else:
+            print("❌ 無効なゲームコードです。")
+            self.set_message("無効なゲームコードです")
+    
+    def set_message(self, message: str):
+        """通知メッセージを表示"""
+        self.show_message = message
+        self.message_timer = pygame.time.get_ticks()
     
     def validate_game_code(self, code: str) -> bool:
         """ゲームコードの形式を検証"""
-        parts = code.split('-')
-        return len(parts) == 3 and len(parts[2]) == 4 and parts[2].isdigit()
+        return validate_game_code(code)
     
     def generate_dummy_score_from_code(self, code: str) -> int:
         """ゲームコードからダミースコアを生成（実際には暗号化されたデータから復元）"""
-        # ハッシュ値からスコアを生成
-        hash_value = sum(ord(c) for c in code)
-        return (hash_value % 5000) + 1000  # 1000-6000の範囲
+        return score_from_code(code)
     
     def add_score_to_ranking(self, game_code: str, score: int):
         """スコアをランキングに追加"""
@@ -401,39 +501,74 @@ class PokerGame:
             "loaded": True  # ロードされたスコアであることを示す
         }
         
+        with self.rankings_lock:
+            rankings = self.load_rankings()
+            
+            # 同じコードが既に存在するかチェック
+            if not any(entry["code"] == game_code for entry in rankings):
+                rankings.append(ranking_entry)
+                rankings.sort(key=lambda x: x["total_score"], reverse=True)
+                self.write_rankings(rankings)
+    
+    def load_rankings(self) -> List[Dict]:
+        """ランキングファイルを読み込む"""
         try:
             with open(self.rankings_file, 'r') as f:
-                rankings = json.load(f)
+                return json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
-            rankings = []
-        
-        # 同じコードが既に存在するかチェック
-        if not any(entry["code"] == game_code for entry in rankings):
-            rankings.append(ranking_entry)
-            rankings.sort(key=lambda x: x["total_score"], reverse=True)
-            
-            with open(self.rankings_file, 'w') as f:
-                json.dump(rankings, f, indent=2)
+            return []
+    
+    def write_rankings(self, rankings: List[Dict]):
+        """ランキングファイルを書き込む（描画中の読み込みと競合しないよう置き換えで）"""
+        tmp_path = self.rankings_file + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(rankings, f, indent=2)
+        os.replace(tmp_path, self.rankings_file)
+    
+    def export_profile(self):
+        """プロファイラーのサンプルをCSVに書き出す"""
+        path = f"frame_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        rows = self.profiler.export_csv(path)
+        print(f"フレームプロファイルを保存しました: {path} ({rows}フレーム)")
+        self.set_message(f"プロファイルを保存しました: {path}")
     
     def get_high_score(self) -> int:
         """ハイスコアを取得"""
-        try:
-            with open(self.rankings_file, 'r') as f:
-                rankings = json.load(f)
-            return rankings[0]["total_score"] if rankings else 0
-        except (FileNotFoundError, json.JSONDecodeError):
-            return 0
+        rankings = self.load_rankings()
+        return rankings[0]["total_score"] if rankings else 0
     
     def copy_game_code_to_clipboard(self):
-        """ゲームコードをクリップボードにコピー"""
+        """ゲームコードをクリップボードにコピー（完了は CLIPBOARD_EVENT で通知）"""
         if self.final_game_code:
-            success = self.clipboard_manager.copy_to_clipboard(self.final_game_code)
-            if success:
+            self.clipboard_service.copy_async(self.final_game_code)
+    
+    def handle_clipboard_result(self, event):
+        """クリップボード操作の完了イベントを処理"""
+        if event.action == 'paste':
+            # 貼り付けはゲームコード入力中のみ反映
+            if event.success and event.text and self.code_input.active:
+                self.code_input.insert(event.text)
+        elif event.action == 'copy':
+            if event.success:
                 self.code_copied_time = pygame.time.get_ticks()
-                print(f"ゲームコードをクリップボードにコピーしました: {self.final_game_code}")
+                print(f"ゲームコードをクリップボードにコピーしました: {event.text}")
             else:
                 print("クリップボードへのコピーに失敗しました")
     
+    def show_hint(self):
+        """テーブルベースから最善のホールドを引き、交換するカードを選択状態にする"""
+        if self.tablebase is None:
+            try:
+                self.tablebase = Tablebase.load(DEFAULT_TABLE, DEFAULT_CSV)
+            except (OSError, ValueError) as e:
+                print(f"テーブルベース読み込みエラー: {e}")
+                self.tablebase_available = False
+                return
+        
+        hold_mask, expected_score = self.tablebase.best_hold(self.hand, self.draws_remaining)
+        self.selected_cards = [not (hold_mask >> i & 1) for i in range(len(self.hand))]
+        self.set_message(f"ヒント: 選択したカードを交換（期待スコア {expected_score:.0f}）")
+    
     def show_hands_overlay(self):
         """役の一覧を表示"""
         self.show_overlay = True
@@ -471,29 +606,42 @@ class PokerGame:
             "total": len(remaining_cards)
         }
     
+    def ui_surface(self, key: Hashable, factory: Callable[[], pygame.Surface]) -> pygame.Surface:
+        """変化の少ないUIの描画済みサーフェスを取得（なければ factory で作り、古いものから破棄）"""
+        surface = self._ui_cache.pop(key, None)
+        if surface is None:
+            surface = factory()
+        self._ui_cache[key] = surface
+        if len(self._ui_cache) > self.UI_CACHE_SIZE:
+            self._ui_cache.popitem(last=False)
+        return surface
+    
+    def render_label(self, font: pygame.font.Font, text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        """描画済みのラベルを使い回す"""
+        return self.ui_surface(('label', font, text, color), lambda: font.render(text, True, color))
+    
     def draw(self):
         """画面描画"""
-        self.screen.fill(self.bg_color)
+        self.backend.clear(self.bg_color)
         
         # タイトル
-        title_text = self.large_font.render("AWS Porker", True, self.text_color)
-        self.screen.blit(title_text, (50, 20))
+        self.backend.draw_surface(self.render_label(self.large_font, "AWS Porker", self.text_color), (50, 20))
         
         # ゲーム情報
         info_text = f"Round {self.current_round}/{self.max_rounds} | Draws: {self.draws_remaining} | Score: {self.total_score}"
-        info_surface = self.font.render(info_text, True, self.text_color)
-        self.screen.blit(info_surface, (50, 70))
+        self.backend.draw_surface(self.render_label(self.font, info_text, self.text_color), (50, 70))
         
         # カード描画
         if self.game_state in ["playing", "hand_result"]:
-            self.draw_cards_on_screen()
+            with self.profiler.phase('cards'):
+                self.draw_cards_on_screen()
         
         # 現在のハンド評価
         if self.hand and self.game_state == "playing":
-            current_hand, current_score, details = self.evaluator.evaluate_hand(self.hand)
+            with self.profiler.phase('evaluate'):
+                current_hand, current_score, details = self.hand_state.evaluate()
             hand_text = f"Current Hand: {current_hand} ({current_score} points)"
-            hand_surface = self.font.render(hand_text, True, self.text_color)
-            self.screen.blit(hand_surface, (50, 450))
+            self.backend.draw_surface(self.render_label(self.font, hand_text, self.text_color), (50, 450))
             
             # ドロー使い切り時の自動スタンド通知
             if self.draws_remaining <= 0:
@@ -514,13 +662,34 @@ class PokerGame:
             self.draw_final_result()
         
         # ボタン描画
-        self.draw_buttons()
+        with self.profiler.phase('buttons'):
+            self.draw_buttons()
         
         # オーバーレイ描画
         if self.show_overlay:
-            self.draw_overlay()
-        
-        pygame.display.flip()
+            with self.profiler.phase('overlay'):
+                self.draw_overlay()
+        
+        # 通知メッセージ（3秒間表示）
+        if self.show_message and pygame.time.get_ticks() - self.message_timer < 3000:
+            message_surface = self.font.render(self.show_message, True, (255, 255, 0))
+            message_rect = message_surface.get_rect(centerx=self.width // 2, bottom=self.height - 120)
+            self.screen.blit(message_surface, message_rect)
+        
+        # ゲームコード入力ボックス
+        if self.code_input.active:
+            self.backend.mark(self.code_input.draw(self.screen, self.small_font))
+        
+        # プロファイラー
+        if self.profiler.visible:
+            backend = self.backend.stats()
+            self.profiler.draw(self.screen, self.small_font, extra_lines=[
+                self.surfaces.summary(),
+                f"renderer {self.backend.name} | textures {backend['textures']} (uploads {backend['uploads']})",
+            ])
+        
+        with self.profiler.phase('flip'):
+            self.backend.present()
     
     def draw_cards_on_screen(self):
         """カードを画面に描画"""
@@ -535,9 +704,9 @@ class PokerGame:
             if self.selected_cards[i]:
                 highlight_rect = pygame.Rect(x - 5, card_y - 5, 
                                            Card.CARD_WIDTH + 10, Card.CARD_HEIGHT + 10)
-                pygame.draw.rect(self.screen, (255, 255, 0), highlight_rect, 3)
+                self.backend.mark(pygame.draw.rect(self.screen, (255, 255, 0), highlight_rect, 3))
             
-            card.draw(self.screen, x, card_y, self.font, self.small_font)
+            card.draw(self.backend.card_layer, x, card_y, self.font, self.small_font)
     
     def draw_hand_result(self):
         """役の結果を大きく表示"""
@@ -547,9 +716,9 @@ class PokerGame:
         hand_name, score, details = self.current_hand_result
         
         # 半透明の背景
-        overlay = pygame.Surface((self.width, self.height))
-        overlay.set_alpha(150)
-        overlay.fill((0, 0, 0))
+        # 画素ごとのアルファにする（テクスチャ描画ではUIキャンバスごとカードの上に重ねるため）
+        overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 150))
         self.screen.blit(overlay, (0, 0))
         
         # 役名を大きく表示
@@ -576,8 +745,8 @@ class PokerGame:
         """最終結果を表示"""
         # 背景
         result_rect = pygame.Rect(100, 150, self.width - 200, 450)
-        pygame.draw.rect(self.screen, (0, 0, 0), result_rect)
-        pygame.draw.rect(self.screen, (255, 255, 255), result_rect, 3)
+        self.backend.mark(pygame.draw.rect(self.screen, (0, 0, 0), result_rect))
+        self.backend.mark(pygame.draw.rect(self.screen, (255, 255, 255), result_rect, 3))
         
         # タイトル
         title_surface = self.large_font.render("ゲーム終了！", True, (255, 255, 0))
@@ -608,7 +777,7 @@ class PokerGame:
         code_text = f"ゲームコード: {game_code}"
         
         # マウスホバー効果
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.backend.mouse_pos()
         code_surface = self.font.render(code_text, True, (100, 255, 100))
         code_rect = code_surface.get_rect(centerx=self.width // 2, y=result_rect.y + 180)
         self.code_rect = code_rect  # クリック判定用に保存
@@ -617,8 +786,8 @@ class PokerGame:
         if code_rect.collidepoint(mouse_pos):
             hover_rect = pygame.Rect(code_rect.x - 10, code_rect.y - 5, 
                                    code_rect.width + 20, code_rect.height + 10)
-            pygame.draw.rect(self.screen, (50, 50, 50), hover_rect)
-            pygame.draw.rect(self.screen, (100, 255, 100), hover_rect, 2)
+            self.backend.mark(pygame.draw.rect(self.screen, (50, 50, 50), hover_rect))
+            self.backend.mark(pygame.draw.rect(self.screen, (100, 255, 100), hover_rect, 2))
         
         self.screen.blit(code_surface, code_rect)
         
@@ -666,15 +835,15 @@ class PokerGame:
     def draw_overlay(self):
         """オーバーレイを描画"""
         # 半透明の背景
-        overlay_surface = pygame.Surface((self.width, self.height))
-        overlay_surface.set_alpha(200)
-        overlay_surface.fill((0, 0, 0))
+        # 画素ごとのアルファにする（テクスチャ描画ではUIキャンバスごとカードの上に重ねるため）
+        overlay_surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        overlay_surface.fill((0, 0, 0, 200))
         self.screen.blit(overlay_surface, (0, 0))
         
         # オーバーレイの内容
         content_rect = pygame.Rect(100, 100, self.width - 200, self.height - 200)
-        pygame.draw.rect(self.screen, (255, 255, 255), content_rect)
-        pygame.draw.rect(self.screen, (0, 0, 0), content_rect, 3)
+        self.backend.mark(pygame.draw.rect(self.screen, (255, 255, 255), content_rect))
+        self.backend.mark(pygame.draw.rect(self.screen, (0, 0, 0), content_rect, 3))
         
         if self.game_state == "show_hands":
             self.draw_hands_help(content_rect)
@@ -854,7 +1023,7 @@ class PokerGame:
     
     def draw_buttons(self):
         """ボタンを描画"""
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.backend.mouse_pos()
         
         for button_name, button_rect in self.buttons.items():
             # ボタンの表示条件
@@ -863,14 +1032,20 @@ class PokerGame:
             
             # ホバー効果
             color = self.button_hover_color if button_rect.collidepoint(mouse_pos) else self.button_color
-            pygame.draw.rect(self.screen, color, button_rect)
-            pygame.draw.rect(self.screen, self.text_color, button_rect, 2)
-            
-            # ボタンテキスト
             button_text = self.get_button_text(button_name)
-            text_surface = self.small_font.render(button_text, True, self.text_color)
-            text_rect = text_surface.get_rect(center=button_rect.center)
-            self.screen.blit(text_surface, text_rect)
+            surface = self.ui_surface(('button', button_rect.size, button_text, color),
+                                      lambda: self.render_button(button_rect.size, button_text, color))
+            self.backend.draw_surface(surface, button_rect.topleft)
+    
+    def render_button(self, size: Tuple[int, int], text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        """ボタン1つ分（背景・枠・テキスト）を描いたサーフェスを作成"""
+        surface = pygame.Surface(size)
+        rect = surface.get_rect()
+        pygame.draw.rect(surface, color, rect)
+        pygame.draw.rect(surface, self.text_color, rect, 2)
+        text_surface = self.small_font.render(text, True, self.text_color)
+        surface.blit(text_surface, text_surface.get_rect(center=rect.center))
+        return surface
     
     def should_show_button(self, button_name: str) -> bool:
         """ボタンを表示すべきかチェック"""
@@ -898,6 +1073,8 @@ class PokerGame:
             return not self.show_overlay and self.game_state != "hand_result"
         elif button_name == "show_deck":
             return not self.show_overlay and self.game_state != "hand_result"
+        elif button_name == "hint":
+            return self.tablebase_available and self.game_state == "playing" and self.draws_remaining > 0
         elif button_name == "close_overlay":
             return self.show_overlay
         return False
@@ -914,24 +1091,36 @@ class PokerGame:
             "sound_toggle": "♪ ON" if self.sound_manager.enabled else "♪ OFF",
             "show_hands": "役一覧",
             "show_deck": "カード分布",
+            "hint": "ヒント",
             "close_overlay": "閉じる"
         }
         return texts.get(button_name, button_name)
     
+    def run_frame(self) -> bool:
+        """1フレーム分のイベント処理と描画（終了要求があればFalse）"""
+        running = True
+        self.profiler.begin_frame()
+        with self.profiler.phase('events'):
+            for event in pygame.event.get():
+                if not self.handle_event(event):
+                    running = False
+        
+        self.draw()
+        return running
+    
     def run(self):
         """ゲームループ"""
         clock = pygame.time.Clock()
         running = True
         
         while running:
-            for event in pygame.event.get():
-                running = self.handle_event(event)
-            
-            self.draw()
+            running = self.run_frame()
             clock.tick(60)
         
         # クリーンアップ
+        self.clipboard_service.shutdown()
         self.sound_manager.cleanup()
+        self.backend.close()
         pygame.quit()
         sys.exit()
         pygame.quit()
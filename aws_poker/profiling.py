@@ -0,0 +1,213 @@
+"""
+ゲームのプロファイル計測（run_poker.py --profile）
+
+起動処理と指定フレーム数（または秒数）のゲームプレイをサンプリングし、
+speedscope形式のJSONと関数別の集計レポートを書き出す。
+入力は決まった操作列（SCRIPT）で再現するため、リリース間で比較できる。
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# 1操作あたりのフレーム数と、ラウンドごとに繰り返す操作列
+ACTION_INTERVAL = 20
+SCRIPT = [
+    ('card', 0), ('card', 1), ('button', 'draw'),
+    ('card', 2), ('button', 'draw'),
+    ('button', 'show_hands'), ('button', 'close_overlay'),
+    ('button', 'show_deck'), ('button', 'close_overlay'),
+    ('wait', None), ('wait', None), ('wait', None), ('wait', None),
+]
+
+FrameKey = Tuple[str, str, int]
+
+
+class SamplingProfiler:
+    """対象スレッドのスタックを一定間隔で記録するサンプリングプロファイラー"""
+
+    def __init__(self, interval: float = 0.001, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self.frames: List[FrameKey] = []
+        self.frame_ids: Dict[FrameKey, int] = {}
+        self.samples: List[Tuple[int, ...]] = []
+        self.weights: List[float] = []
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._switch_interval = sys.getswitchinterval()
+
+    def start(self):
+        """サンプリングを開始"""
+        # サンプラーがGILを取れるよう切り替え間隔を短くする
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """サンプリングを終了"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        sys.setswitchinterval(self._switch_interval)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _frame_id(self, code) -> int:
+        """コードオブジェクトのフレームIDを取得"""
+        key = (getattr(code, 'co_qualname', code.co_name), code.co_filename, code.co_firstlineno)
+        frame_id = self.frame_ids.get(key)
+        if frame_id is None:
+            frame_id = self.frame_ids[key] = len(self.frames)
+            self.frames.append(key)
+        return frame_id
+
+    def _run(self):
+        """サンプリングループ（経過時間を各サンプルの重みにする）"""
+        started = last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples.append(tuple(stack))
+            self.weights.append(now - last)
+            last = now
+        self.elapsed = time.perf_counter() - started
+
+    def to_speedscope(self, name: str) -> Dict:
+        """speedscope形式（sampled）に変換"""
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {
+                "frames": [{"name": func, "file": path, "line": line} for func, path, line in self.frames],
+            },
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(self.weights),
+                "samples": [list(stack) for stack in self.samples],
+                "weights": self.weights,
+            }],
+            "name": name,
+            "exporter": "aws_poker.profiling",
+        }
+
+    def top_functions(self, limit: int = 30) -> List[Tuple[FrameKey, float, float]]:
+        """関数ごとの自己時間・累積時間（秒）を自己時間の多い順に取得"""
+        self_time: Counter = Counter()
+        total_time: Counter = Counter()
+        for stack, weight in zip(self.samples, self.weights):
+            self_time[stack[-1]] += weight
+            for frame_id in set(stack):
+                total_time[frame_id] += weight
+        ranked = sorted(total_time, key=lambda i: (self_time[i], total_time[i]), reverse=True)
+        return [(self.frames[i], self_time[i], total_time[i]) for i in ranked[:limit]]
+
+
+def apply_action(game, action: str, target):
+    """操作列の1ステップをゲームに適用"""
+    if action == 'card':
+        if target < len(game.hand):
+            rect = game.hand[target].get_rect(100 + target * 180, 200)
+            game.handle_card_selection(rect.center)
+    elif action == 'button':
+        game.handle_button_click(game.buttons[target].center)
+
+
+def write_report(path: str, profiler: SamplingProfiler, frames: int, wall_time: float,
+                 phase_summary: Dict[str, float]):
+    """関数別の集計レポートを書き出す"""
+    total = sum(profiler.weights) or 1.0
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    lines = [
+        "AWS Poker プロファイル",
+        f"フレーム数: {frames} | 経過時間: {wall_time:.2f}秒 | サンプル数: {len(profiler.samples)}",
+    ]
+    if phase_summary:
+        phases = ", ".join(f"{name} {phase_summary[name]:.2f}ms" for name in phase_summary
+                           if name not in ('frame_ms', 'max_ms', 'fps'))
+        lines.append(f"FPS: {phase_summary['fps']:.1f} | フレーム平均 {phase_summary['frame_ms']:.2f}ms "
+                     f"(最大 {phase_summary['max_ms']:.2f}ms)")
+        lines.append(f"フェーズ平均: {phases}")
+    lines += ["", f"{'self%':>7} {'total%':>7} {'self(s)':>9}  関数"]
+    for (func, filename, line), self_time, total_time in profiler.top_functions():
+        if filename.startswith(root):
+            filename = os.path.relpath(filename, root)
+        lines.append(f"{self_time / total * 100:6.1f}% {total_time / total * 100:6.1f}% "
+                     f"{self_time:9.3f}  {func} ({filename}:{line})")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def profile_game(output_dir: str = "profile", frames: Optional[int] = 600,
+                 seconds: Optional[float] = None, interval: float = 0.001, seed: int = 0,
+                 renderer: str = 'software', scale: float = 1.0) -> Tuple[str, str]:
+    """起動とゲームプレイを計測し、(speedscope JSON, レポート) のパスを返す"""
+    # ウィンドウやオーディオ機器がなくても動くようにダミードライバーを既定にする
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    import pygame
+    from .poker_game import PokerGame
+
+    if frames is None and seconds is None:
+        frames = 600
+    random.seed(seed)
+    os.makedirs(output_dir, exist_ok=True)
+
+    profiler = SamplingProfiler(interval=interval)
+    started = time.perf_counter()
+    frame = 0
+    with profiler:
+        game = PokerGame(renderer=renderer, scale=scale)
+        # フェーズ別の時間は記録するが、オーバーレイは描画しない
+        game.profiler.enabled = True
+        clock = pygame.time.Clock()
+        while True:
+            if frames is not None and frame >= frames:
+                break
+            if seconds is not None and time.perf_counter() - started >= seconds:
+                break
+            if frame % ACTION_INTERVAL == 0:
+                action, target = SCRIPT[(frame // ACTION_INTERVAL) % len(SCRIPT)]
+                apply_action(game, action, target)
+            if not game.run_frame():
+                break
+            clock.tick(60)
+            frame += 1
+    wall_time = time.perf_counter() - started
+
+    phase_summary = game.profiler.summary()
+    game.clipboard_service.shutdown()
+    game.sound_manager.cleanup()
+    game.backend.close()
+    pygame.quit()
+
+    stamp = time.strftime('%Y%m%d_%H%M%S')
+    json_path = os.path.join(output_dir, f"aws_poker_{stamp}.speedscope.json")
+    report_path = os.path.join(output_dir, f"aws_poker_{stamp}.txt")
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(profiler.to_speedscope(f"AWS Poker ({frame} frames)"), f)
+    write_report(report_path, profiler, frame, wall_time, phase_summary)
+    return json_path, report_path
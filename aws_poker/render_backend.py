@@ -0,0 +1,289 @@
+"""
+描画バックエンド（ソフトウェア / SDL2 Renderer・Texture）
+
+ゲームは背景のクリア・カードの描画・それ以外のUI（文字・ボタン・オーバーレイ）の描画を分けて行う。
+
+- software: 従来どおり表示サーフェスへ blit して flip する（既定、フォールバック）
+- texture: pygame._sdl2.video の Renderer を使い、カード面は1度だけテクスチャに転送して毎フレーム合成する。
+  タイトル・ラベル・ボタンのように変化の少ないUIも、ゲーム側で描画済みサーフェスを使い回して
+  draw_surface で渡せばテクスチャとして再利用される。
+  それ以外のUIは論理解像度の透過キャンバス（UICanvas）に描き、カードの上に重ねる。キャンバスは blit・fill の
+  戻り値と mark() で渡された pygame.draw の戻り値から描いた範囲を記録し、その範囲だけを転送・合成して、
+  次のフレームの前にそこだけ消す（ピクセルを走査しない）。
+  ウィンドウの拡大やHigh-DPIは Renderer の論理サイズでレンダラー側が拡大する。GPUのレンダラーなら
+  ゲーム側の描画コストはウィンドウの解像度に依存しないが、SDLのソフトウェアレンダラーでは拡大もCPUで
+  行うので、ウィンドウが大きいほど合成・表示のコストが増える。
+
+stats() の canvas_bytes が転送したキャンバスのバイト数の累計。計測は
+python -m aws_poker.render_backend で行える（ダミードライバーではSDLのソフトウェアレンダラーになる）。
+
+SDLのソフトウェアレンダラー（accelerated=False）でも動くので、ダミードライバーでもテストできる。
+"""
+
+import argparse
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+BACKENDS = ('software', 'texture')
+
+
+def to_logical(pos: Tuple[int, int], window_size: Tuple[int, int],
+               logical_size: Tuple[int, int]) -> Tuple[int, int]:
+    """ウィンドウ座標を論理座標に変換（縦横比を保って中央に配置したレターボックス）"""
+    scale = min(window_size[0] / logical_size[0], window_size[1] / logical_size[1])
+    offset_x = (window_size[0] - logical_size[0] * scale) / 2
+    offset_y = (window_size[1] - logical_size[1] * scale) / 2
+    return int((pos[0] - offset_x) / scale), int((pos[1] - offset_y) / scale)
+
+
+class SoftwareBackend:
+    """表示サーフェスへ直接 blit する従来の描画"""
+
+    name = 'software'
+
+    def __init__(self, width: int, height: int, title: str):
+        self.size = (width, height)
+        self.screen = pygame.display.set_mode((width, height))
+        pygame.display.set_caption(title)
+        self.card_layer = self.screen  # カードも同じサーフェスへ描く
+
+    def draw_surface(self, surface: pygame.Surface, dest: Tuple[int, int]):
+        """描画済みのサーフェスを描く"""
+        self.screen.blit(surface, dest)
+
+    def mark(self, rect: pygame.Rect):
+        """pygame.draw で描いた範囲を記録（表示サーフェスへ直接描くので何もしない）"""
+
+    def clear(self, color: Tuple[int, int, int]):
+        """フレームの開始（背景色で塗る）"""
+        self.screen.fill(color)
+
+    def present(self):
+        """画面に反映"""
+        pygame.display.flip()
+
+    def mouse_pos(self) -> Tuple[int, int]:
+        """マウス位置（論理座標）"""
+        return pygame.mouse.get_pos()
+
+    def stats(self) -> Dict[str, int]:
+        """監視用の統計"""
+        return {'textures': 0, 'uploads': 0, 'canvas_bytes': 0}
+
+    def close(self):
+        """後片付け（表示サーフェスは pygame.quit で解放される）"""
+
+
+class UICanvas(pygame.Surface):
+    """描いた範囲を記録する透過キャンバス（blit・blits・fill の戻り値を dirty に溜める）
+
+    pygame.draw はメソッドを経由しないので、戻り値の矩形を mark() で渡す。
+    """
+
+    def __init__(self, size: Tuple[int, int]):
+        super().__init__(size, pygame.SRCALPHA)
+        self.dirty: List[pygame.Rect] = []
+
+    def blit(self, source, dest, area=None, special_flags=0) -> pygame.Rect:
+        rect = super().blit(source, dest, area, special_flags)
+        self.dirty.append(rect)
+        return rect
+
+    def blits(self, blit_sequence, doreturn=1):
+        rects = [self.blit(*args) for args in blit_sequence]
+        return rects if doreturn else None
+
+    def fill(self, color, rect=None, special_flags=0) -> pygame.Rect:
+        rect = super().fill(color, rect, special_flags)
+        self.dirty.append(rect)
+        return rect
+
+    def mark(self, rect: pygame.Rect):
+        """pygame.draw などで描いた範囲を記録"""
+        self.dirty.append(pygame.Rect(rect))
+
+    def erase(self, rect: pygame.Rect):
+        """範囲を透明に戻す（描いた範囲には数えない）"""
+        pygame.Surface.fill(self, (0, 0, 0, 0), rect)
+
+
+def merge_rects(rects: List[pygame.Rect], bounds: pygame.Rect) -> List[pygame.Rect]:
+    """重なる矩形を外接矩形にまとめる（画面外は切り取り、空の矩形は捨てる）"""
+    merged: List[pygame.Rect] = []
+    for rect in sorted((rect.clip(bounds) for rect in rects), key=lambda r: -r.width * r.height):
+        if not rect.width or not rect.height:
+            continue
+        # まとめた結果が他の矩形と重なることがあるので、重ならなくなるまで吸収する
+        while True:
+            index = rect.collidelist(merged)
+            if index < 0:
+                break
+            rect = rect.union(merged.pop(index))
+        merged.append(rect)
+    return merged
+
+
+class _CardLayer:
+    """カード面をテクスチャで描くレイヤー（Surface.blit と同じ呼び出し方で使える）"""
+
+    __slots__ = ('backend',)
+
+    def __init__(self, backend: 'TextureBackend'):
+        self.backend = backend
+
+    def blit(self, surface: pygame.Surface, dest: Tuple[int, int]):
+        self.backend.draw_surface(surface, dest)
+
+
+class TextureBackend:
+    """SDL2 Renderer でカード面のテクスチャとUIキャンバスを合成する描画"""
+
+    name = 'texture'
+
+    def __init__(self, width: int, height: int, title: str, scale: float = 1.0,
+                 accelerated: Optional[bool] = None, vsync: bool = False):
+        from pygame._sdl2.video import Renderer, Texture, Window
+
+        self.size = (width, height)
+        self.window = Window(title, size=(round(width * scale), round(height * scale)),
+                             resizable=True, allow_highdpi=True)
+        self.renderer = Renderer(self.window, accelerated=-1 if accelerated is None else int(accelerated),
+                                 vsync=vsync)
+        self.renderer.logical_size = (width, height)
+        self._texture_class = Texture
+
+        # UIを描く透過キャンバス（カードの上に重ねる）
+        self.screen = UICanvas((width, height))
+        self._canvas = Texture(self.renderer, (width, height), streaming=True)
+        self._canvas.blend_mode = pygame.BLENDMODE_BLEND
+        self.card_layer = _CardLayer(self)
+
+        # サーフェス -> テクスチャ（サーフェスが破棄されればテクスチャも解放される）
+        self._textures: 'weakref.WeakKeyDictionary[pygame.Surface, Texture]' = weakref.WeakKeyDictionary()
+        self._queue: List[Tuple[object, pygame.Rect]] = []
+        self._drawn: List[pygame.Rect] = []  # 直前のフレームでキャンバスに描かれていた範囲
+        self._clear_color = (0, 0, 0)
+        self.uploads = 0
+        self.canvas_bytes = 0
+
+    def texture(self, surface: pygame.Surface):
+        """サーフェスのテクスチャ（初回だけ転送）"""
+        texture = self._textures.get(surface)
+        if texture is None:
+            texture = self._textures[surface] = self._texture_class.from_surface(self.renderer, surface)
+            self.uploads += 1
+        return texture
+
+    def draw_surface(self, surface: pygame.Surface, dest: Tuple[int, int]):
+        """変化しないサーフェスをテクスチャとして描画（UIキャンバスの下に合成される）"""
+        self._queue.append((self.texture(surface), pygame.Rect(dest, surface.get_size())))
+
+    def mark(self, rect: pygame.Rect):
+        """pygame.draw でキャンバスに描いた範囲を記録"""
+        self.screen.mark(rect)
+
+    def clear(self, color: Tuple[int, int, int]):
+        """フレームの開始（背景色を記録し、前のフレームで描かれた範囲だけキャンバスを透明に戻す）"""
+        self._clear_color = color
+        self._queue.clear()
+        for rect in self._drawn:
+            self.screen.erase(rect)
+        self.screen.dirty.clear()
+
+    def drawn_rects(self) -> List[pygame.Rect]:
+        """このフレームでキャンバスに描いた範囲（重なりはまとめる）"""
+        return merge_rects(self.screen.dirty, self.screen.get_rect())
+
+    def compose(self):
+        """背景・テクスチャ・UIキャンバスの順に合成（present 前の状態）"""
+        self.renderer.draw_color = (*self._clear_color, 255)
+        self.renderer.clear()
+        for texture, rect in self._queue:
+            texture.draw(dstrect=rect)
+        # キャンバスは描かれている範囲だけ転送・合成する（それ以外は透明なので描かなくてよい）
+        self._drawn = self.drawn_rects()
+        for rect in self._drawn:
+            self._canvas.update(self.screen.subsurface(rect), rect)
+            self._canvas.draw(srcrect=rect, dstrect=rect)
+            self.canvas_bytes += rect.width * rect.height * 4
+
+    def present(self):
+        """画面に反映"""
+        self.compose()
+        self.renderer.present()
+
+    def mouse_pos(self) -> Tuple[int, int]:
+        """マウス位置（拡大・レターボックスを戻した論理座標）"""
+        return to_logical(pygame.mouse.get_pos(), self.window.size, self.size)
+
+    def stats(self) -> Dict[str, int]:
+        """監視用の統計"""
+        return {'textures': len(self._textures), 'uploads': self.uploads, 'canvas_bytes': self.canvas_bytes}
+
+    def close(self):
+        """テクスチャとウィンドウを解放"""
+        self._queue.clear()
+        self._drawn.clear()
+        self._textures.clear()
+        self.window.destroy()
+
+
+def create_backend(name: str, width: int, height: int, title: str, scale: float = 1.0,
+                   accelerated: Optional[bool] = None):
+    """描画バックエンドを作る（texture が使えなければ software にフォールバック）"""
+    if name not in BACKENDS:
+        raise ValueError(f"不明な描画バックエンドです: {name}")
+    if name == 'texture':
+        try:
+            return TextureBackend(width, height, title, scale, accelerated)
+        except (ImportError, pygame.error) as e:
+            print(f"テクスチャ描画を使えないため、ソフトウェア描画に切り替えます: {e}")
+    return SoftwareBackend(width, height, title)
+
+
+def benchmark(renderer: str, frames: int = 300, scale: float = 1.0) -> Dict[str, float]:
+    """プロファイルと同じ操作列でゲームを動かし、描画の1フレームあたりの時間と転送量を計測"""
+    from .poker_game import PokerGame
+    from .profiling import ACTION_INTERVAL, SCRIPT, apply_action
+
+    game = PokerGame(renderer=renderer, scale=scale)
+    try:
+        elapsed = 0.0
+        for frame in range(frames):
+            if frame % ACTION_INTERVAL == 0:
+                action, target = SCRIPT[(frame // ACTION_INTERVAL) % len(SCRIPT)]
+                apply_action(game, action, target)
+            started = time.perf_counter()
+            game.draw()
+            elapsed += time.perf_counter() - started
+        stats = game.backend.stats()
+        return {'frame_ms': elapsed / frames * 1000, 'uploads': stats['uploads'],
+                'canvas_kb': stats['canvas_bytes'] / frames / 1024}
+    finally:
+        game.clipboard_service.shutdown()
+        game.sound_manager.cleanup()
+        game.backend.close()
+        pygame.quit()
+
+
+def main():
+    """描画バックエンドごとのフレーム時間を比較"""
+    parser = argparse.ArgumentParser(description="描画バックエンドのベンチマーク")
+    parser.add_argument("--frames", type=int, default=300, help="計測するフレーム数")
+    parser.add_argument("--scale", type=float, default=1.0, help="texture のウィンドウ拡大率")
+    args = parser.parse_args()
+
+    import os
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    for name in BACKENDS:
+        result = benchmark(name, args.frames, args.scale)
+        print(f"{name:8s}: {result['frame_ms']:.2f} ms/フレーム | テクスチャ転送 {result['uploads']}回 | "
+              f"キャンバス転送 {result['canvas_kb']:.0f} KB/フレーム")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+"""
+ローカルHTTPスコアリングサービス（標準ライブラリとasyncioのみ）
+
+    python -m aws_poker.serve --port 8080 --workers 4
+    python -m aws_poker.serve bench --requests 20000 --concurrency 32
+
+エンドポイント（カードIDは cards.csv の行番号、0始まり）:
+    POST /evaluate        {"cards": [ID×5]} -> {"hand", "score", "details"}
+    POST /evaluate/batch  {"hands": [[ID×5], ...]} -> {"hands": [...], "scores": [...]}
+                          Content-Type: application/octet-stream の場合、本文はu16のIDを
+                          5個ずつ並べたもので、応答はi32のスコア配列（どちらもリトルエンディアン）
+    POST /verify-code     {"code": "..."} -> {"valid", "score"}
+    GET  /metrics         エンドポイントごとのレイテンシヒストグラム
+    GET  /health
+
+接続はkeep-aliveで使い回せる。役判定はプロセスプールで行い、ワーカーは
+カードカタログを共有メモリから参照する。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import signal
+import struct
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .catalog import load_catalog
+from .game_code import score_from_code, validate_game_code
+from .hand_state import HAND_SIZE, HandState
+from .latency import LatencyHistogram
+from .shared_catalog import SharedTables, catalog_cards, publish_catalog, shared_catalog
+
+DEFAULT_PORT = 8080
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cards.csv")
+
+MAX_BODY = 16 * 1024 * 1024
+BATCH_CHUNK = 4096  # ワーカー1回あたりの手札数
+JSON_TYPE = "application/json"
+BINARY_TYPE = "application/octet-stream"
+
+
+class HTTPError(Exception):
+    """HTTPエラー応答"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# ---- ワーカープロセス ----
+
+_worker_tables: Optional[SharedTables] = None
+_worker_deck: List = []
+_worker_state: Optional[HandState] = None
+
+
+def _init_worker(handle):
+    """ワーカーの初期化（カタログは共有メモリから参照する）"""
+    global _worker_tables, _worker_deck, _worker_state
+    _worker_tables = SharedTables.attach(handle)
+    _worker_deck = catalog_cards(shared_catalog(_worker_tables))
+    _worker_state = HandState()
+
+
+def _evaluate_hands(hands: Sequence[Sequence[int]]) -> List[Tuple[str, int, Dict]]:
+    """手札（カードIDのリスト）をまとめて判定"""
+    state, deck = _worker_state, _worker_deck
+    results = []
+    for hand in hands:
+        state.set_cards([deck[card_id] for card_id in hand])
+        results.append(state.evaluate())
+    return results
+
+
+def pack_ids(ids: Sequence[int]) -> bytes:
+    """カードID列をバイナリ本文にする（u16、リトルエンディアン）"""
+    return struct.pack(f'<{len(ids)}H', *ids)
+
+
+def unpack_ids(data: bytes) -> Tuple[int, ...]:
+    """バイナリ本文からカードID列を読む"""
+    return struct.unpack(f'<{len(data) // 2}H', data)
+
+
+def unpack_scores(data: bytes) -> Tuple[int, ...]:
+    """バイナリ応答からスコア列を読む（i32、リトルエンディアン）"""
+    return struct.unpack(f'<{len(data) // 4}i', data)
+
+
+def _score_packed(data: bytes) -> bytes:
+    """u16のカードID列をi32のスコア列にする"""
+    ids = unpack_ids(data)
+    state, deck = _worker_state, _worker_deck
+    scores = []
+    for start in range(0, len(ids), HAND_SIZE):
+        state.set_cards([deck[card_id] for card_id in ids[start:start + HAND_SIZE]])
+        scores.append(state.evaluate()[1])
+    return struct.pack(f'<{len(scores)}i', *scores)
+
+
+# ---- サーバー ----
+
+class ScoringServer:
+    """役判定・ゲームコード検証のHTTPサーバー"""
+
+    def __init__(self, csv_path: str = DEFAULT_CSV, workers: Optional[int] = None):
+        with load_catalog(csv_path) as catalog:
+            self.num_cards = len(catalog)
+            self.tables = publish_catalog(catalog)
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                            initargs=(self.tables.handle,))
+        self.metrics: Dict[str, LatencyHistogram] = {}
+        self.routes = {
+            ("POST", "/evaluate"): self.evaluate_one,
+            ("POST", "/evaluate/batch"): self.evaluate_batch,
+            ("POST", "/verify-code"): self.verify_code,
+            ("GET", "/metrics"): self.get_metrics,
+            ("GET", "/health"): self.get_health,
+        }
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> Tuple[str, int]:
+        """待ち受けを開始し、実際のアドレスを返す"""
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    def close(self):
+        """待ち受けとワーカーを停止し、共有メモリを解放"""
+        if self.server is not None:
+            self.server.close()
+        self.executor.shutdown()
+        self.tables.close()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """1接続分のリクエストを順に処理（keep-alive）"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._write(writer, 400, JSON_TYPE, b'{"error": "bad request line"}', False)
+                    break
+                headers = await self._read_headers(reader)
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+
+                started = time.perf_counter()
+                path = target.split("?", 1)[0]
+                try:
+                    try:
+                        length = int(headers.get("content-length", "0"))
+                    except ValueError:
+                        raise HTTPError(400, "Content-Lengthが不正です")
+                    if length > MAX_BODY:
+                        raise HTTPError(413, "リクエストが大きすぎます")
+                    body = await reader.readexactly(length) if length else b""
+                    status, content_type, payload = await self.dispatch(method, path, headers, body)
+                except HTTPError as e:
+                    status, content_type = e.status, JSON_TYPE
+                    payload = json.dumps({"error": e.message}, ensure_ascii=False).encode('utf-8')
+                    if e.status == 413:
+                        keep_alive = False
+                await self._write(writer, status, content_type, payload, keep_alive)
+                self.metrics.setdefault(path if (method, path) in self.routes else "other",
+                                        LatencyHistogram()).record(time.perf_counter() - started)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+        """ヘッダーを読み込む（名前は小文字）"""
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, status: int, content_type: str, payload: bytes, keep_alive: bool):
+        """応答を書き込む"""
+        head = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+    async def dispatch(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, str, bytes]:
+        """ルーティング"""
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                raise HTTPError(405, "メソッドが許可されていません")
+            raise HTTPError(404, "見つかりません")
+        return await handler(headers, body)
+
+    async def _run(self, func, *args):
+        """プロセスプールで実行"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    @staticmethod
+    def _json(data) -> Tuple[int, str, bytes]:
+        return 200, JSON_TYPE, json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+    @staticmethod
+    def _parse_json(body: bytes) -> Dict:
+        try:
+            data = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPError(400, "JSONが不正です")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "JSONオブジェクトが必要です")
+        return data
+
+    def _check_hand(self, hand) -> List[int]:
+        """手札が重複のない5個のカードIDか検証"""
+        if (not isinstance(hand, list) or len(hand) != HAND_SIZE
+                or not all(isinstance(card_id, int) and 0 <= card_id < self.num_cards for card_id in hand)):
+            raise HTTPError(400, f"手札は0〜{self.num_cards - 1}のカードID{HAND_SIZE}個で指定してください")
+        if len(set(hand)) != HAND_SIZE:
+            raise HTTPError(400, "手札に同じカードIDが含まれています")
+        return hand
+
+    async def evaluate_one(self, headers: Dict[str, str], body: bytes) -> Tuple[int, str, bytes]:
+        """1つの手札を判定"""
+        hand = self._check_hand(self._parse_json(body).get("cards"))
+        hand_name, score, details = (await self._run(_evaluate_hands, [hand]))[0]
+        return self._json({"hand": hand_name, "score": score, "details": details})
+
+    async def evaluate_batch(self, headers: Dict[str, str], body: bytes) -> Tuple[int, str, bytes]:
+        """複数の手札をまとめて判定（JSONまたはバイナリ）"""
+        if headers.get("content-type", "").split(";")[0].strip() == BINARY_TYPE:
+            if len(body) % (2 * HAND_SIZE):
+                raise HTTPError(400, f"本文はu16のカードID{HAND_SIZE}個単位で指定してください")
+            ids = unpack_ids(body)
+            if ids and max(ids) >= self.num_cards:
+                raise HTTPError(400, "カードIDが範囲外です")
+            if any(len(set(ids[start:start + HAND_SIZE])) != HAND_SIZE for start in range(0, len(ids), HAND_SIZE)):
+                raise HTTPError(400, "手札に同じカードIDが含まれています")
+            step = BATCH_CHUNK * HAND_SIZE * 2
+            chunks = await asyncio.gather(*(self._run(_score_packed, body[start:start + step])
+                                            for start in range(0, len(body), step)))
+            return 200, BINARY_TYPE, b"".join(chunks)
+
+        hands = self._parse_json(body).get("hands")
+        if not isinstance(hands, list):
+            raise HTTPError(400, "hands にはリストを指定してください")
+        hands = [self._check_hand(hand) for hand in hands]
+        chunks = await asyncio.gather(*(self._run(_evaluate_hands, hands[start:start + BATCH_CHUNK])
+                                        for start in range(0, len(hands), BATCH_CHUNK)))
+        results = [result for chunk in chunks for result in chunk]
+        return self._json({"hands": [hand_name for hand_name, _, _ in results],
+                           "scores": [score for _, score, _ in results]})
+
+    async def verify_code(self, headers: Dict[str, str], body: bytes) -> Tuple[int, str, bytes]:
+        """ゲームコードを検証してスコアを返す"""
+        code = self._parse_json(body).get("code")
+        if not isinstance(code, str):
+            raise HTTPError(400, "code には文字列を指定してください")
+        valid = validate_game_code(code)
+        return self._json({"valid": valid, "score": score_from_code(code) if valid else None})
+
+    async def get_metrics(self, headers: Dict[str, str], body: bytes) -> Tuple[int, str, bytes]:
+        """エンドポイントごとのレイテンシ"""
+        return self._json({path: histogram.to_dict() for path, histogram in sorted(self.metrics.items())})
+
+    async def get_health(self, headers: Dict[str, str], body: bytes) -> Tuple[int, str, bytes]:
+        return self._json({"status": "ok", "cards": self.num_cards})
+
+
+async def _serve(args):
+    """サーバーを起動して停止まで待つ（SIGTERMでも後片付けしてから終了する）"""
+    server = ScoringServer(args.csv, args.workers)
+    stopped = asyncio.Event()
+    try:
+        # bench は子プロセスのサーバーを terminate で止めるので、ワーカーと共有メモリを残さないようにする
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopped.set)
+    except NotImplementedError:
+        pass  # Windows ではシグナルハンドラーを登録できない
+    try:
+        host, port = await server.start(args.host, DEFAULT_PORT if args.port is None else args.port)
+        print(f"スコアリングサービスを起動しました: http://{host}:{port}", flush=True)
+        await stopped.wait()
+    finally:
+        server.close()
+
+
+# ---- 負荷テスト ----
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str, path: str,
+                  body: bytes = b"", content_type: str = JSON_TYPE) -> Tuple[int, bytes]:
+    """keep-aliveの接続で1リクエストを送り、ステータスと本文を返す"""
+    writer.write((f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+                  f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = await ScoringServer._read_headers(reader)
+    return status, await reader.readexactly(int(headers.get("content-length", "0")))
+
+
+def _bench_bodies(endpoint: str, num_cards: int, batch: int, count: int, seed: int) -> List[Tuple[str, bytes, str]]:
+    """負荷テスト用のリクエストを作る"""
+    import random
+
+    rng = random.Random(seed)
+    bodies = []
+    for _ in range(count):
+        hands = [rng.sample(range(num_cards), HAND_SIZE) for _ in range(batch if endpoint != "evaluate" else 1)]
+        if endpoint == "evaluate":
+            bodies.append(("/evaluate", json.dumps({"cards": hands[0]}).encode(), JSON_TYPE))
+        elif endpoint == "batch":
+            bodies.append(("/evaluate/batch", json.dumps({"hands": hands}).encode(), JSON_TYPE))
+        else:
+            bodies.append(("/evaluate/batch", pack_ids([card_id for hand in hands for card_id in hand]), BINARY_TYPE))
+    return bodies
+
+
+async def run_load(host: str, port: int, requests: int, concurrency: int, endpoint: str = "evaluate",
+                   batch: int = 100, num_cards: int = 309, seed: int = 0) -> Dict:
+    """keep-aliveの接続を並列に張って負荷をかけ、結果を集計"""
+    bodies = _bench_bodies(endpoint, num_cards, batch, min(requests, 256), seed)
+    histogram = LatencyHistogram()
+    errors = 0
+    remaining = requests
+
+    async def client():
+        nonlocal remaining, errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                path, body, content_type = bodies[remaining % len(bodies)]
+                started = time.perf_counter()
+                status, _ = await request(reader, writer, "POST", path, body, content_type)
+                histogram.record(time.perf_counter() - started)
+                if status != 200:
+                    errors += 1
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    hands_per_request = 1 if endpoint == "evaluate" else batch
+    result = histogram.to_dict()
+    result.update({"errors": errors, "seconds": elapsed, "requests_per_second": histogram.count / elapsed,
+                   "hands_per_second": histogram.count * hands_per_request / elapsed})
+    return result
+
+
+def _bench(args):
+    """サーバーを子プロセスで起動（--port指定時は既存のサーバー）して負荷テスト"""
+    process = None
+    host, port = args.host, args.port
+    try:
+        if port is None:
+            process = subprocess.Popen([sys.executable, "-m", "aws_poker.serve", "--port", "0",
+                                        "--workers", str(args.workers or os.cpu_count() or 1), "--csv", args.csv],
+                                       stdout=subprocess.PIPE, text=True)
+            match = re.search(r"http://([^:]+):(\d+)", process.stdout.readline())
+            if match is None:
+                raise RuntimeError("サーバーを起動できませんでした")
+            host, port = match.group(1), int(match.group(2))
+
+        with load_catalog(args.csv) as catalog:
+            num_cards = len(catalog)
+        result = asyncio.run(run_load(host, port, args.requests, args.concurrency, args.endpoint,
+                                      args.batch, num_cards))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print(f"{args.endpoint}: {result['requests_per_second']:.0f} req/s, "
+          f"{result['hands_per_second']:.0f} 手札/s, エラー {result['errors']}")
+    print(f"レイテンシ: 平均 {result['mean_ms']:.2f} ms, p50 {result['p50_ms']:.2f} ms, "
+          f"p90 {result['p90_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, 最大 {result['max_ms']:.2f} ms")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """コマンドライン引数の定義"""
+    parser = argparse.ArgumentParser(description="AWS Poker スコアリングサービス")
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けアドレス")
+    parser.add_argument("--port", type=int, default=None, help=f"ポート（既定: {DEFAULT_PORT}）")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数（既定: CPU数）")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="カードデータのCSV")
+    subparsers = parser.add_subparsers(dest="command")
+    bench = subparsers.add_parser("bench", help="localhostに負荷をかけて計測")
+    # 既定値を持たせない（親の --port を上書きしないように、指定されたときだけ設定する）
+    bench.add_argument("--port", type=int, default=argparse.SUPPRESS,
+                       help="既存サーバーのポート（省略時は子プロセスで起動）")
+    bench.add_argument("--requests", type=int, default=20000, help="リクエスト数")
+    bench.add_argument("--concurrency", type=int, default=32, help="同時接続数")
+    bench.add_argument("--endpoint", choices=["evaluate", "batch", "binary"], default="evaluate",
+                       help="対象（batch/binary は /evaluate/batch）")
+    bench.add_argument("--batch", type=int, default=100, help="バッチあたりの手札数")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """コマンドライン"""
+    args = build_parser().parse_args(argv)
+
+    if args.command == "bench":
+        _bench(args)
+        return
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        print("スコアリングサービスを停止しました")
+
+
+if __name__ == "__main__":
+    main()
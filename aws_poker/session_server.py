@@ -0,0 +1,511 @@
+"""
+複数セッションのゲームサーバー（ヘッドレス、asyncio）
+
+PokerGame と同じルールのゲームを多数同時にホストする。プロトコルは1行1JSONで、
+リクエスト {"id": 任意, "action": ..., "session": ..., ...} に対して
+{"id": ..., "ok": true, "state": {...}} または {"id": ..., "ok": false, "error": "..."} を返す。
+
+    python -m aws_poker.session_server --port 8765
+    python -m aws_poker.session_server bench --sessions 2000 --connections 50
+
+アクション:
+    new              新しいセッションを作って最初の手札を配る
+    deal             同じセッションで新しいゲームを始める
+    toggle {index}   カードの選択を切り替える
+    draw             選択したカードを交換（ドローを使い切ると自動スタンド）
+    stand            手札を確定
+    next             次のラウンドへ（最終ラウンドの後はゲームコードを生成）
+    code             最終ゲームコード
+    state / close / stats
+
+セッションはカードIDと整数だけを持つ小さなオブジェクトで、カードカタログと役判定は
+全セッションで共有する。一定時間操作のないセッションはバイナリスナップショット
+（snapshot.py）にして退避し、次の操作で復元する。
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import secrets
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .catalog import load_catalog
+from .game_code import generate_game_code
+from .hand_state import HAND_SIZE, HandState
+from .latency import LatencyHistogram
+from .shared_catalog import catalog_cards
+from .snapshot import GameSnapshot, splitmix64
+
+DEFAULT_PORT = 8765
+DEFAULT_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cards.csv")
+
+MAX_ROUNDS = 5
+DRAWS_PER_ROUND = 2
+MAX_LINE = 64 * 1024
+
+
+class SessionError(Exception):
+    """クライアントに返すエラー"""
+
+
+class GameSession:
+    """1ゲーム分の状態（カードIDと整数のみ）"""
+
+    __slots__ = ('session_id', 'hand', 'dealt', 'selected', 'round', 'draws_remaining',
+                 'total_score', 'round_scores', 'state', 'game_code', 'rng_state', 'last_active')
+
+    def __init__(self, session_id: str, rng_state: int = 0):
+        self.session_id = session_id
+        self.hand: List[int] = []
+        self.dealt = 0  # デッキから出ているカードのビットマスク
+        self.selected = 0  # 選択中のカードのビットマスク
+        self.round = 1
+        self.draws_remaining = DRAWS_PER_ROUND
+        self.total_score = 0
+        self.round_scores: List[Tuple[str, int]] = []
+        self.state = "playing"  # playing, hand_result, final_result
+        self.game_code: Optional[str] = None
+        self.rng_state = rng_state  # セッションごとの乱数（splitmix64の状態）
+        self.last_active = 0.0
+
+    def snapshot(self, n_cards: int) -> GameSnapshot:
+        """スナップショットにする"""
+        return GameSnapshot(n_cards, self.hand, dealt=self.dealt, selected=self.selected,
+                            round_number=self.round, draws_remaining=self.draws_remaining,
+                            total_score=self.total_score, round_scores=self.round_scores,
+                            state=self.state, game_code=self.game_code, rng_state=self.rng_state)
+
+    @classmethod
+    def from_snapshot(cls, session_id: str, snapshot: GameSnapshot) -> 'GameSession':
+        """スナップショットから復元"""
+        session = cls(session_id, snapshot.rng_state)
+        session.hand = snapshot.hand
+        session.dealt = snapshot.dealt
+        session.selected = snapshot.selected
+        session.round = snapshot.round
+        session.draws_remaining = snapshot.draws_remaining
+        session.total_score = snapshot.total_score
+        session.round_scores = snapshot.round_scores
+        session.state = snapshot.state
+        session.game_code = snapshot.game_code
+        return session
+
+
+class SessionManager:
+    """セッションの作成・操作・退避（カードと役判定は全セッションで共有）"""
+
+    def __init__(self, csv_path: str = DEFAULT_CSV, idle_timeout: float = 600.0,
+                 max_sessions: int = 100000, max_suspended: int = 1000000, seed: Optional[int] = None):
+        with load_catalog(csv_path) as catalog:
+            self.cards = catalog_cards(catalog)
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.max_suspended = max_suspended
+        self.rng = random.Random(seed)  # 新しいセッションの乱数シード用
+        self.state = HandState()
+        self.sessions: "OrderedDict[str, GameSession]" = OrderedDict()  # 最終操作の古い順
+        self.suspended: "OrderedDict[str, bytes]" = OrderedDict()  # 退避したスナップショット（古い順）
+        self.evicted = 0
+        self.actions = {
+            "deal": self.new_game,
+            "toggle": self.toggle,
+            "draw": self.draw,
+            "stand": self.stand,
+            "next": self.next_round,
+            "code": self.final_code,
+            "state": lambda session, request: None,
+        }
+
+    # ---- セッション管理 ----
+
+    def create(self) -> GameSession:
+        """新しいセッションを作成して最初の手札を配る"""
+        if len(self.sessions) >= self.max_sessions:
+            self.evict_idle()
+            if len(self.sessions) >= self.max_sessions:
+                raise SessionError("セッション数が上限に達しています")
+        session = GameSession(secrets.token_urlsafe(9), self.rng.getrandbits(64))
+        self.new_game(session)
+        session.last_active = time.monotonic()
+        self.sessions[session.session_id] = session
+        return session
+
+    def get(self, session_id) -> GameSession:
+        """セッションを取得し、最終操作時刻を更新（退避済みなら復元）"""
+        if not isinstance(session_id, str):
+            raise SessionError("セッションが見つかりません")
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.resume(session_id)
+        session.last_active = time.monotonic()
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def suspend(self, session: GameSession):
+        """セッションをスナップショットにして退避"""
+        del self.sessions[session.session_id]
+        self.suspended[session.session_id] = session.snapshot(len(self.cards)).to_bytes()
+        while len(self.suspended) > self.max_suspended:
+            self.suspended.popitem(last=False)
+
+    def resume(self, session_id: str) -> GameSession:
+        """退避したセッションを復元"""
+        data = self.suspended.pop(session_id, None)
+        if data is None:
+            raise SessionError("セッションが見つかりません")
+        session = GameSession.from_snapshot(session_id, GameSnapshot.from_bytes(data))
+        self.sessions[session_id] = session
+        return session
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """一定時間操作のないセッションを退避し、退避した数を返す"""
+        deadline = (time.monotonic() if now is None else now) - self.idle_timeout
+        removed = 0
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if session.last_active > deadline:
+                break
+            self.suspend(session)
+            removed += 1
+        self.evicted += removed
+        return removed
+
+    def handle(self, request: Dict) -> Dict:
+        """1リクエストを処理して応答を返す"""
+        response = {"id": request.get("id")}
+        try:
+            action = request.get("action")
+            if not isinstance(action, str):
+                raise SessionError("不明なアクションです")
+            if action == "new":
+                session = self.create()
+            elif action == "close":
+                self.sessions.pop(self.get(request.get("session")).session_id)
+                response["ok"] = True
+                return response
+            elif action == "stats":
+                response.update(ok=True, sessions=len(self.sessions), suspended=len(self.suspended),
+                                evicted=self.evicted)
+                return response
+            elif action in self.actions:
+                session = self.get(request.get("session"))
+                result = self.actions[action](session, request)
+                if result is not None:
+                    response["result"] = result
+            else:
+                raise SessionError(f"不明なアクションです: {action}")
+        except SessionError as e:
+            response.update(ok=False, error=str(e))
+            return response
+        response.update(ok=True, state=self.describe(session))
+        return response
+
+    def describe(self, session: GameSession) -> Dict:
+        """クライアントに返す状態"""
+        cards = self.cards
+        return {
+            "session": session.session_id,
+            "state": session.state,
+            "round": session.round,
+            "draws_remaining": session.draws_remaining,
+            "total_score": session.total_score,
+            "cards": [{"id": card_id, "rank": cards[card_id].rank, "suit": cards[card_id].suit,
+                       "category": cards[card_id].category} for card_id in session.hand],
+            "selected": [bool(session.selected >> i & 1) for i in range(len(session.hand))],
+            "game_code": session.game_code,
+        }
+
+    # ---- ゲーム進行（PokerGame と同じルール） ----
+
+    @staticmethod
+    def _next_random(session: GameSession) -> int:
+        """セッションの乱数を1つ進める（splitmix64、状態は64ビット整数1つ）"""
+        session.rng_state, value = splitmix64(session.rng_state)
+        return value
+
+    def _draw_card(self, session: GameSession) -> int:
+        """デッキに残っているカードを1枚引く"""
+        while True:
+            card_id = self._next_random(session) % len(self.cards)
+            if not session.dealt >> card_id & 1:
+                session.dealt |= 1 << card_id
+                return card_id
+
+    def _deal_hand(self, session: GameSession):
+        """新しい手札を配る（残りが5枚未満なら新しいデッキ）"""
+        if len(self.cards) - bin(session.dealt).count("1") < HAND_SIZE:
+            session.dealt = 0
+        session.hand = [self._draw_card(session) for _ in range(HAND_SIZE)]
+        session.selected = 0
+        session.draws_remaining = DRAWS_PER_ROUND
+        session.state = "playing"
+
+    def new_game(self, session: GameSession, request: Optional[Dict] = None):
+        """新しいゲームを開始"""
+        session.dealt = 0
+        session.round = 1
+        session.total_score = 0
+        session.round_scores = []
+        session.game_code = None
+        self._deal_hand(session)
+
+    def _require_playing(self, session: GameSession):
+        if session.state != "playing":
+            raise SessionError("手札の操作はプレイ中のみできます")
+
+    def toggle(self, session: GameSession, request: Dict):
+        """カードの選択を切り替える"""
+        self._require_playing(session)
+        index = request.get("index")
+        if not isinstance(index, int) or not 0 <= index < HAND_SIZE:
+            raise SessionError(f"index は0〜{HAND_SIZE - 1}で指定してください")
+        session.selected ^= 1 << index
+
+    def draw(self, session: GameSession, request: Dict):
+        """選択したカードを交換（捨てたカードはデッキに戻る）"""
+        self._require_playing(session)
+        if session.draws_remaining <= 0:
+            raise SessionError("ドローの残り回数がありません")
+        if not session.selected:
+            return None
+        slots = [i for i in range(HAND_SIZE) if session.selected >> i & 1]
+        for i in slots:
+            session.dealt &= ~(1 << session.hand[i])
+        for i in slots:
+            session.hand[i] = self._draw_card(session)
+        session.selected = 0
+        session.draws_remaining -= 1
+
+        # ドローを使い切った場合は自動的にスタンド
+        if session.draws_remaining <= 0:
+            return self.stand(session, request)
+        return None
+
+    def stand(self, session: GameSession, request: Dict) -> Dict:
+        """手札を確定"""
+        self._require_playing(session)
+        self.state.set_cards([self.cards[card_id] for card_id in session.hand])
+        hand_name, score, details = self.state.evaluate()
+        session.round_scores.append((hand_name, score))
+        session.total_score += score
+        session.state = "hand_result"
+        return {"hand": hand_name, "score": score, "details": details}
+
+    def next_round(self, session: GameSession, request: Dict):
+        """次のラウンドへ"""
+        if session.state != "hand_result":
+            raise SessionError("スタンドしてから次のラウンドへ進んでください")
+        session.round += 1
+        if session.round > MAX_ROUNDS:
+            session.state = "final_result"
+            # ゲーム終了時にゲームコードを一度だけ生成
+            session.game_code = generate_game_code(session.round_scores)
+        else:
+            self._deal_hand(session)
+
+    def final_code(self, session: GameSession, request: Dict) -> Dict:
+        """最終ゲームコードとラウンドごとの結果"""
+        if session.game_code is None:
+            raise SessionError("ゲームがまだ終わっていません")
+        return {"code": session.game_code, "total_score": session.total_score,
+                "rounds": [{"hand": hand, "score": score} for hand, score in session.round_scores]}
+
+
+class SessionServer:
+    """1行1JSONのプロトコルでセッションを操作するTCPサーバー"""
+
+    def __init__(self, manager: SessionManager, sweep_interval: float = 30.0):
+        self.manager = manager
+        self.sweep_interval = sweep_interval
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> Tuple[str, int]:
+        """待ち受けと放置セッションの定期退避を開始"""
+        self.server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE)
+        self._sweeper = asyncio.get_running_loop().create_task(self._sweep())
+        return self.server.sockets[0].getsockname()[:2]
+
+    def close(self):
+        """待ち受けを停止"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        if self.server is not None:
+            self.server.close()
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.manager.evict_idle()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """1接続分のリクエストを順に処理"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError
+                except ValueError:
+                    response = {"id": None, "ok": False, "error": "JSONが不正です"}
+                else:
+                    response = self.manager.handle(request)
+                writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b"\n")
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # ValueError: 1行が上限を超えた
+            pass
+        finally:
+            writer.close()
+
+
+async def _serve(args):
+    manager = SessionManager(args.csv, idle_timeout=args.idle_timeout, max_sessions=args.max_sessions)
+    server = SessionServer(manager)
+    try:
+        host, port = await server.start(args.host, DEFAULT_PORT if args.port is None else args.port)
+        print(f"ゲームサーバーを起動しました: tcp://{host}:{port}", flush=True)
+        await server.server.serve_forever()
+    finally:
+        server.close()
+
+
+# ---- 負荷テスト ----
+
+def measure_session_memory(csv_path: str = DEFAULT_CSV, sessions: int = 2000) -> float:
+    """セッション1つあたりのメモリ（バイト、最初の手札を配った状態）"""
+    import tracemalloc
+
+    manager = SessionManager(csv_path, seed=0)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(sessions):
+        manager.create()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return allocated / sessions
+
+
+async def play_games(host: str, port: int, sessions: int, connections: int, seed: int = 0) -> Dict:
+    """並列の接続でゲームを最後まで遊び、アクションごとのレイテンシを集計"""
+    histograms: Dict[str, LatencyHistogram] = {}
+    remaining = sessions
+    errors = 0
+    rng = random.Random(seed)
+
+    async def client():
+        nonlocal remaining
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+
+        async def send(request: Dict) -> Dict:
+            nonlocal errors
+            started = time.perf_counter()
+            writer.write(json.dumps(request).encode('utf-8') + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            histograms.setdefault(request["action"], LatencyHistogram()).record(time.perf_counter() - started)
+            if not response["ok"]:
+                errors += 1
+            return response
+
+        try:
+            while remaining > 0:
+                remaining -= 1
+                session = (await send({"action": "new"}))["state"]["session"]
+                for _ in range(MAX_ROUNDS):
+                    response = {"state": {"state": "playing"}}
+                    for _ in range(DRAWS_PER_ROUND):
+                        for index in range(HAND_SIZE):
+                            if rng.random() < 0.4:
+                                await send({"action": "toggle", "session": session, "index": index})
+                        response = await send({"action": "draw", "session": session})
+                    if response["state"]["state"] == "playing":
+                        await send({"action": "stand", "session": session})
+                    await send({"action": "next", "session": session})
+                await send({"action": "code", "session": session})
+                await send({"action": "close", "session": session})
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    elapsed = time.perf_counter() - started
+    total = sum(histogram.count for histogram in histograms.values())
+    return {"seconds": elapsed, "actions_per_second": total / elapsed, "errors": errors,
+            "actions": {action: histogram.to_dict() for action, histogram in sorted(histograms.items())}}
+
+
+def _bench(args):
+    """セッションあたりのメモリと、子プロセスのサーバーに対するアクションのレイテンシを計測"""
+    per_session = measure_session_memory(args.csv)
+    print(f"セッションあたりのメモリ: {per_session:.0f} バイト")
+
+    process = None
+    host, port = args.host, args.port
+    try:
+        if port is None:
+            process = subprocess.Popen([sys.executable, "-m", "aws_poker.session_server", "--port", "0",
+                                        "--csv", args.csv], stdout=subprocess.PIPE, text=True)
+            match = re.search(r"tcp://([^:]+):(\d+)", process.stdout.readline())
+            if match is None:
+                raise RuntimeError("サーバーを起動できませんでした")
+            host, port = match.group(1), int(match.group(2))
+        result = asyncio.run(play_games(host, port, args.sessions, args.connections))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print(f"{args.sessions}ゲーム ({args.connections}接続): {result['actions_per_second']:.0f} アクション/s, "
+          f"エラー {result['errors']}")
+    for action, stats in result["actions"].items():
+        print(f"  {action:<7} 平均 {stats['mean_ms']:.2f} ms, p50 {stats['p50_ms']:.2f} ms, "
+              f"p99 {stats['p99_ms']:.2f} ms, 最大 {stats['max_ms']:.2f} ms")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """コマンドライン引数の定義"""
+    parser = argparse.ArgumentParser(description="AWS Poker 複数セッションのゲームサーバー")
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けアドレス")
+    parser.add_argument("--port", type=int, default=None, help=f"ポート（既定: {DEFAULT_PORT}）")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="カードデータのCSV")
+    parser.add_argument("--idle-timeout", type=float, default=600.0, help="放置セッションを退避するまでの秒数")
+    parser.add_argument("--max-sessions", type=int, default=100000, help="同時セッション数の上限")
+    subparsers = parser.add_subparsers(dest="command")
+    bench = subparsers.add_parser("bench", help="セッションのメモリとアクションのレイテンシを計測")
+    # 既定値を持たせない（親の --port を上書きしないように、指定されたときだけ設定する）
+    bench.add_argument("--port", type=int, default=argparse.SUPPRESS,
+                       help="既存サーバーのポート（省略時は子プロセスで起動）")
+    bench.add_argument("--sessions", type=int, default=2000, help="最後まで遊ぶゲーム数")
+    bench.add_argument("--connections", type=int, default=50, help="同時接続数")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """コマンドライン"""
+    args = build_parser().parse_args(argv)
+
+    if args.command == "bench":
+        _bench(args)
+        return
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        print("ゲームサーバーを停止しました")
+
+
+if __name__ == "__main__":
+    main()
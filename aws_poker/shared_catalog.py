@@ -0,0 +1,155 @@
+"""
+カードカタログと判定表の共有メモリ公開（ワーカープール用）
+
+親プロセスでカタログのID配列や事前計算した表を1つの共有メモリブロックに書き込み、
+ワーカーはハンドル（ブロック名と配置情報のタプル）からゼロコピーで参照する。
+ワーカーごとにCSVのパースや表の再構築をしないので、起動時間とメモリはワーカー数に依存しない。
+
+    with publish_catalog(catalog, {"one_draw_keys": keys}) as tables:
+        ProcessPoolExecutor(initializer=init, initargs=(tables.handle,))
+
+    # ワーカー側
+    tables = SharedTables.attach(handle)
+    catalog = shared_catalog(tables)
+"""
+
+from array import array
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+from .catalog import RANKS, CardCatalog
+
+ALIGNMENT = 8
+
+# ハンドル: (共有メモリ名, [(配列名, 形式, 形状, オフセット, バイト数)], メタデータ)
+Layout = List[Tuple[str, str, Tuple[int, ...], int, int]]
+Handle = Tuple[str, Layout, Dict[str, Any]]
+
+
+class SharedTables:
+    """名前付きの配列を1つの共有メモリブロックにまとめたもの
+
+    作成したプロセス（owner）が close 時にブロックを削除する。
+    取得したビューは close 時に解放されるので、それ以降は使えない。
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, layout: Layout, meta: Dict[str, Any], owner: bool):
+        self._shm = shm
+        self.layout = layout
+        self.meta = meta
+        self.owner = owner
+        self._entries = {entry[0]: entry for entry in layout}
+        self._views: Dict[str, memoryview] = {}
+
+    @classmethod
+    def create(cls, arrays: Mapping[str, Any], meta: Optional[Dict[str, Any]] = None) -> 'SharedTables':
+        """配列（array.array・numpy配列などバッファを持つもの）を共有メモリへコピーして公開"""
+        layout: Layout = []
+        size = 0
+        for name, values in arrays.items():
+            with memoryview(values) as view:
+                if not view.c_contiguous:
+                    raise ValueError(f"共有する配列は連続している必要があります: {name}")
+                size = (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+                layout.append((name, view.format, tuple(view.shape), size, view.nbytes))
+                size += view.nbytes
+
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for (name, _, _, offset, nbytes), values in zip(layout, arrays.values()):
+            with memoryview(values) as view, view.cast('B') as source:
+                shm.buf[offset:offset + nbytes] = source
+        return cls(shm, layout, dict(meta or {}), owner=True)
+
+    @classmethod
+    def attach(cls, handle: Handle) -> 'SharedTables':
+        """ハンドルから既存のブロックに接続（コピーしない）"""
+        name, layout, meta = handle
+        return cls(shared_memory.SharedMemory(name=name), layout, meta, owner=False)
+
+    @property
+    def handle(self) -> Handle:
+        """ワーカーへ渡すハンドル（pickle可能）"""
+        return self._shm.name, self.layout, self.meta
+
+    @property
+    def nbytes(self) -> int:
+        """共有メモリブロックのサイズ"""
+        return self._shm.size
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def __getitem__(self, name: str) -> memoryview:
+        """配列のビュー（numpyでは np.asarray で配列として扱える）"""
+        view = self._views.get(name)
+        if view is None:
+            _, fmt, shape, offset, nbytes = self._entries[name]
+            view = self._shm.buf[offset:offset + nbytes]
+            # 空の配列は形状を指定してキャストできないので1次元のままにする
+            view = view.cast(fmt, shape) if nbytes else view.cast(fmt)
+            self._views[name] = view
+        return view
+
+    def close(self):
+        """ビューを解放して切断（ownerはブロックも削除）"""
+        if self._shm is None:
+            return
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def publish_catalog(catalog: CardCatalog, tables: Optional[Mapping[str, Any]] = None) -> SharedTables:
+    """カタログのID配列と追加の表を共有メモリに公開"""
+    arrays: Dict[str, Any] = {
+        'rank_ids': array('B', catalog.rank_ids),
+        'suit_ids': array('B', catalog.suit_ids),
+        'category_ids': array('H', catalog.category_ids),
+    }
+    arrays.update(tables or {})
+    return SharedTables.create(arrays, {'suits': list(catalog.suits), 'categories': list(catalog.categories)})
+
+
+class SharedCatalog:
+    """共有メモリ上のID配列だけを参照するカタログ
+
+    CardCatalog と同じID配列と語彙を持つが、サービス名やパスの文字列は共有しないので
+    rows() / row() / string() は持たない（行が必要なら load_catalog で開く）。
+    """
+
+    __slots__ = ('rank_ids', 'suit_ids', 'category_ids', 'ranks', 'suits', 'categories', 'source')
+
+    def __init__(self, tables: SharedTables):
+        self.rank_ids = tables['rank_ids']
+        self.suit_ids = tables['suit_ids']
+        self.category_ids = tables['category_ids']
+        self.ranks = RANKS
+        self.suits: List[str] = tables.meta['suits']
+        self.categories: List[str] = tables.meta['categories']
+        self.source = 'shared'
+
+    def __len__(self):
+        return len(self.rank_ids)
+
+
+def shared_catalog(tables: SharedTables) -> SharedCatalog:
+    """共有メモリ上のID配列を参照するカタログ（文字列の行は持たない）"""
+    return SharedCatalog(tables)
+
+
+def catalog_cards(catalog: Union[CardCatalog, SharedCatalog]) -> List[SimpleNamespace]:
+    """カタログのID配列から役判定用のカード（ランク・スート・カテゴリのみ）を作る"""
+    return [SimpleNamespace(rank=RANKS[rank_id], suit=catalog.suits[suit_id],
+                            category=catalog.categories[category_id])
+            for rank_id, suit_id, category_id in zip(catalog.rank_ids, catalog.suit_ids, catalog.category_ids)]
@@ -0,0 +1,152 @@
+"""
+進行中のゲームのバイナリスナップショット（中断・再開用）
+
+カードはカタログの行番号で持ち、役名は HandEvaluator.HAND_CATEGORIES の番号にするため、
+5ラウンド分の結果を含めても100バイト前後になる。
+
+レイアウト（リトルエンディアン）:
+    ヘッダー (24バイト)
+        magic "AWSS", version u8, flags u8, n_cards u16,
+        round u8, draws_remaining u8, selected u8 (ビットマスク), state u8,
+        total_score i32, rng_state u64
+    手札 count u8 + u16 × count
+    デッキ
+        flags & PERMUTATION: 残りのデッキの並び count u16 + u16 × count
+        それ以外: デッキから出ているカードのビットマスク (n_cards + 7) // 8 バイト
+    ラウンド結果 count u8 + (役番号 u8, スコア i32) × count
+    flags & GAME_CODE: ゲームコード length u8 + ASCII
+"""
+
+import struct
+from array import array
+from typing import List, Optional, Tuple
+
+from .hand_evaluator import HandEvaluator
+
+MAGIC = b'AWSS'
+VERSION = 1
+
+HEADER = struct.Struct('<4sBBHBBBBiQ')
+ROUND = struct.Struct('<Bi')
+U8 = struct.Struct('<B')
+U16 = struct.Struct('<H')
+
+FLAG_PERMUTATION = 1
+FLAG_GAME_CODE = 2
+
+MASK64 = (1 << 64) - 1
+
+STATES = ('playing', 'hand_result', 'final_result')
+# 役番号（0は役なし）
+HAND_NAMES = ['Invalid Hand'] + HandEvaluator.HAND_CATEGORIES
+HAND_NAME_INDEX = {name: i for i, name in enumerate(HAND_NAMES)}
+
+
+def splitmix64(state: int) -> Tuple[int, int]:
+    """splitmix64で乱数を1つ生成し、(次の状態, 乱数) を返す（状態は64ビット整数1つで保存できる）"""
+    state = (state + 0x9E3779B97F4A7C15) & MASK64
+    value = ((state ^ (state >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return state, value ^ (value >> 31)
+
+
+class SnapshotError(ValueError):
+    """スナップショットの形式が不正"""
+
+
+class GameSnapshot:
+    """1ゲームの進行状態
+
+    デッキは並び順が意味を持つ場合（PokerGame）は deck に残りのカードIDを、
+    順序を持たない場合（セッションサーバー）は dealt にデッキから出ているカードの
+    ビットマスクを入れる。
+    """
+
+    __slots__ = ('n_cards', 'hand', 'deck', 'dealt', 'selected', 'round', 'draws_remaining',
+                 'total_score', 'round_scores', 'state', 'game_code', 'rng_state')
+
+    def __init__(self, n_cards: int, hand: List[int], deck: Optional[List[int]] = None, dealt: int = 0,
+                 selected: int = 0, round_number: int = 1, draws_remaining: int = 2, total_score: int = 0,
+                 round_scores: Optional[List[Tuple[str, int]]] = None, state: str = 'playing',
+                 game_code: Optional[str] = None, rng_state: int = 0):
+        self.n_cards = n_cards
+        self.hand = hand
+        self.deck = deck
+        self.dealt = dealt
+        self.selected = selected
+        self.round = round_number
+        self.draws_remaining = draws_remaining
+        self.total_score = total_score
+        self.round_scores = round_scores or []
+        self.state = state
+        self.game_code = game_code
+        self.rng_state = rng_state
+
+    def __eq__(self, other):
+        return isinstance(other, GameSnapshot) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def to_bytes(self) -> bytes:
+        """バイナリにする"""
+        flags = (FLAG_PERMUTATION if self.deck is not None else 0) | (FLAG_GAME_CODE if self.game_code else 0)
+        parts = [
+            HEADER.pack(MAGIC, VERSION, flags, self.n_cards, self.round, self.draws_remaining,
+                        self.selected, STATES.index(self.state), self.total_score, self.rng_state),
+            U8.pack(len(self.hand)), array('H', self.hand).tobytes(),
+        ]
+        if self.deck is not None:
+            parts += [U16.pack(len(self.deck)), array('H', self.deck).tobytes()]
+        else:
+            parts.append(self.dealt.to_bytes((self.n_cards + 7) // 8, 'little'))
+        parts.append(U8.pack(len(self.round_scores)))
+        parts += [ROUND.pack(HAND_NAME_INDEX.get(hand_name, 0), score) for hand_name, score in self.round_scores]
+        if self.game_code:
+            code = self.game_code.encode('ascii')
+            parts += [U8.pack(len(code)), code]
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'GameSnapshot':
+        """バイナリから復元"""
+        try:
+            (magic, version, flags, n_cards, round_number, draws_remaining, selected, state,
+             total_score, rng_state) = HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION:
+                raise SnapshotError("スナップショットの形式が不正です")
+            offset = HEADER.size
+
+            count = data[offset]
+            hand = array('H', data[offset + 1:offset + 1 + 2 * count]).tolist()
+            offset += 1 + 2 * count
+
+            deck, dealt = None, 0
+            if flags & FLAG_PERMUTATION:
+                count = U16.unpack_from(data, offset)[0]
+                deck = array('H', data[offset + 2:offset + 2 + 2 * count]).tolist()
+                offset += 2 + 2 * count
+            else:
+                size = (n_cards + 7) // 8
+                dealt = int.from_bytes(data[offset:offset + size], 'little')
+                offset += size
+
+            count = data[offset]
+            offset += 1
+            round_scores = []
+            for _ in range(count):
+                hand_index, score = ROUND.unpack_from(data, offset)
+                round_scores.append((HAND_NAMES[hand_index], score))
+                offset += ROUND.size
+
+            game_code = None
+            if flags & FLAG_GAME_CODE:
+                length = data[offset]
+                game_code = data[offset + 1:offset + 1 + length].decode('ascii')
+                offset += 1 + length
+            if offset != len(data):
+                raise SnapshotError("スナップショットの長さが一致しません")
+            return cls(n_cards, hand, deck, dealt, selected, round_number, draws_remaining, total_score,
+                       round_scores, STATES[state], game_code, rng_state)
+        except SnapshotError:
+            raise
+        except (struct.error, IndexError, ValueError) as e:
+            raise SnapshotError(f"スナップショットを読み込めません: {e}")
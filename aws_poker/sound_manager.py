@@ -5,56 +5,123 @@ AWSポーカーゲーム用サウンドマネージャー
 import os
 import pygame
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+
+# プロセス内で共有するデコード済み効果音（パス -> Sound）
+_sound_cache: Dict[str, pygame.mixer.Sound] = {}
+# ミキサーを使っているSoundManagerの数（最後の1つが cleanup したときだけミキサーを終了する）
+_mixer_users = 0
+
+
+def _reset_shared():
+    """pygame.quit でミキサーが終了したら共有状態を捨てる"""
+    global _mixer_users
+    _mixer_users = 0
+    _sound_cache.clear()
+
 
 class SoundManager:
     """サウンド管理クラス"""
     
-    def __init__(self, sounds_dir: str = None):
+    # 効果音ファイル（BGMは pygame.mixer.music で管理）
+    SOUND_FILES = {
+        'card_draw': 'card_draw.wav',
+        'hand_complete': 'hand_complete.wav',
+        'game_end': 'game_end.wav'
+    }
+    
+    # 効果音ごとに予約するミキサーチャンネル数（連続ドローでも取りこぼさない）
+    CHANNEL_RESERVATIONS = {
+        'card_draw': 3,
+        'hand_complete': 1,
+        'game_end': 1
+    }
+    
+    def __init__(self, sounds_dir: str = None, enabled: bool = True):
         if sounds_dir is None:
             sounds_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "sounds")
         self.sounds_dir = Path(sounds_dir)
         self.sounds: Dict[str, pygame.mixer.Sound] = {}
+        self.channels: Dict[str, List[pygame.mixer.Channel]] = {}
+        self.next_channel: Dict[str, int] = {}
         self.bgm_playing = False
+        self.mixer_user = False  # _mixer_users に数えられているか
         self.volume_bgm = 0.3
         self.volume_sfx = 0.7
-        self.enabled = True
         
-        # pygame.mixerを初期化
+        # ヘッドレス実行（enabled=False）ではミキサーを初期化しない
+        self.enabled = enabled and self.init_mixer()
+    
+    def init_mixer(self) -> bool:
+        """pygame.mixerを初期化してチャンネルを予約"""
+        global _mixer_users
         try:
             pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
-            self.load_sounds()
+            self.reserve_channels()
+            if not self.mixer_user:
+                if _mixer_users == 0:
+                    # 登録は1回の pygame.quit で消えるので、最初の利用者ができるたびに登録する
+                    pygame.register_quit(_reset_shared)
+                _mixer_users += 1
+                self.mixer_user = True
+            return True
         except pygame.error as e:
             print(f"サウンド初期化エラー: {e}")
-            self.enabled = False
+            return False
     
-    def load_sounds(self):
-        """サウンドファイルを読み込み"""
-        if not self.enabled:
-            return
+    def reserve_channels(self):
+        """効果音ごとに専用チャンネルを予約し、音量を一度だけ設定"""
+        total = sum(self.CHANNEL_RESERVATIONS.values())
+        if pygame.mixer.get_num_channels() < total:
+            pygame.mixer.set_num_channels(total)
+        pygame.mixer.set_reserved(total)
+        
+        channel_id = 0
+        for sound_name, count in self.CHANNEL_RESERVATIONS.items():
+            self.channels[sound_name] = [pygame.mixer.Channel(channel_id + i) for i in range(count)]
+            self.next_channel[sound_name] = 0
+            channel_id += count
+        self._apply_sfx_volume()
+    
+    def _apply_sfx_volume(self):
+        """予約チャンネルに効果音の音量を設定"""
+        for channels in self.channels.values():
+            for channel in channels:
+                channel.set_volume(self.volume_sfx)
+    
+    def get_sound(self, sound_name: str) -> Optional[pygame.mixer.Sound]:
+        """効果音を取得（初回使用時にデコードして共有キャッシュに保存）"""
+        sound = self.sounds.get(sound_name)
+        if sound is not None:
+            return sound
         
-        sound_files = {
-            'bgm': 'aws_poker_bgm.wav',
-            'card_draw': 'card_draw.wav',
-            'hand_complete': 'hand_complete.wav',
-            'game_end': 'game_end.wav'
-        }
+        filename = self.SOUND_FILES.get(sound_name)
+        if filename is None:
+            return None
+        sound_path = str(self.sounds_dir / filename)
         
-        for sound_name, filename in sound_files.items():
-            sound_path = self.sounds_dir / filename
+        sound = _sound_cache.get(sound_path)
+        if sound is None:
+            if not os.path.exists(sound_path):
+                print(f"サウンドファイルが見つかりません: {sound_path}")
+                return None
             try:
-                if sound_path.exists():
-                    if sound_name == 'bgm':
-                        # BGMは pygame.mixer.music で管理
-                        continue
-                    else:
-                        sound = pygame.mixer.Sound(str(sound_path))
-                        self.sounds[sound_name] = sound
-                        print(f"サウンド読み込み成功: {sound_name}")
-                else:
-                    print(f"サウンドファイルが見つかりません: {sound_path}")
+                sound = pygame.mixer.Sound(sound_path)
             except pygame.error as e:
                 print(f"サウンド読み込みエラー ({sound_name}): {e}")
+                return None
+            _sound_cache[sound_path] = sound
+        
+        self.sounds[sound_name] = sound
+        return sound
+    
+    def load_sounds(self):
+        """全ての効果音を事前にデコード（通常は初回再生時に遅延デコード）"""
+        if not self.enabled:
+            return
+        
+        for sound_name in self.SOUND_FILES:
+            self.get_sound(sound_name)
     
     def play_bgm(self, loop: bool = True):
         """BGMを再生"""
@@ -85,14 +152,26 @@ class SoundManager:
             print(f"BGM停止エラー: {e}")
     
     def play_sound(self, sound_name: str):
-        """効果音を再生"""
-        if not self.enabled or sound_name not in self.sounds:
+        """効果音を再生
+
+        予約チャンネルのうち空いているものを順番に使う。全て再生中の場合は
+        最も古い再生を打ち切って置き換える（連続ドローでは最大で予約数まで重ねて鳴る）。
+        """
+        if not self.enabled:
+            return
+        
+        sound = self.get_sound(sound_name)
+        channels = self.channels.get(sound_name)
+        if sound is None or not channels:
             return
         
         try:
-            sound = self.sounds[sound_name]
-            sound.set_volume(self.volume_sfx)
-            sound.play()
+            # 予約チャンネルを順番に探して空きを使い、全て使用中なら最も古い再生（次の順番）を置き換える
+            start = self.next_channel[sound_name]
+            index = next((i % len(channels) for i in range(start, start + len(channels))
+                          if not channels[i % len(channels)].get_busy()), start)
+            self.next_channel[sound_name] = (index + 1) % len(channels)
+            channels[index].play(sound)
         except pygame.error as e:
             print(f"効果音再生エラー ({sound_name}): {e}")
     
@@ -105,9 +184,13 @@ class SoundManager:
     def set_sfx_volume(self, volume: float):
         """効果音音量を設定（0.0-1.0）"""
         self.volume_sfx = max(0.0, min(1.0, volume))
+        self._apply_sfx_volume()
     
     def toggle_sound(self):
         """サウンドのオン/オフを切り替え"""
+        # 他の利用者がミキサーを初期化済みでも、自分のチャンネル予約と利用者登録は必要
+        if not self.enabled and (not self.channels or not self.mixer_user) and not self.init_mixer():
+            return False
         self.enabled = not self.enabled
         if not self.enabled:
             self.stop_bgm()
@@ -122,7 +205,21 @@ class SoundManager:
         return pygame.mixer.music.get_busy()
     
     def cleanup(self):
-        """リソースをクリーンアップ"""
+        """リソースをクリーンアップ（ミキサーと共有キャッシュは最後の利用者のときだけ破棄）"""
+        global _mixer_users
+        self.sounds.clear()
+        self.channels.clear()
+        if not self.mixer_user:
+            return
+        self.mixer_user = False
+        _mixer_users = max(0, _mixer_users - 1)
+        if _mixer_users > 0:
+            # 他のインスタンスがまだミキサーと共有キャッシュを使っている
+            self.enabled = False
+            return
         if self.enabled:
             self.stop_bgm()
-            pygame.mixer.quit()
+        pygame.mixer.quit()
+        self.enabled = False
+        # ミキサー終了後のSoundは使えないので共有キャッシュも破棄
+        _sound_cache.clear()
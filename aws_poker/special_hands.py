@@ -0,0 +1,146 @@
+"""
+AWSスペシャル役のルール定義
+
+役はカテゴリ（とスート）の必要枚数だけで宣言し、compile_special_rules() で
+カテゴリヒストグラムに対する判定表へ変換する。ルールは上から順に判定するので、
+新しい役は得点順の位置に追加すればよい。
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# スペシャル役（判定順）
+#   requires: いずれかを満たせば成立する条件のリスト（カテゴリ -> 必要枚数）
+#   distinct_suits: 必要な異なるスートの数
+SPECIAL_HAND_RULES: List[Dict] = [
+    {
+        "name": "AWS Architect", "score": 3000,
+        "requires": [{"Compute": 1, "Storage": 1, "Database": 1,
+                      "Security-Identity-Compliance": 1, "Analytics": 1}],
+        "details": {"categories": ["Compute", "Storage", "Database",
+                                   "Security-Identity-Compliance", "Analytics"]},
+    },
+    {
+        "name": "Multi-Cloud", "score": 2200,
+        "distinct_suits": 5,
+    },
+    {
+        "name": "Security Suite", "score": 1500,
+        "requires": [{"Security-Identity-Compliance": 3},
+                     {"Security-Identity-Compliance": 2, "Management-Governance": 1}],
+        "details": {"security_focus": True},
+    },
+    {
+        "name": "Serverless Combo", "score": 1300,
+        "requires": [{"Compute": 1, "App-Integration": 1, "Database": 1}],
+        "details": {"combo": "Compute+Integration+Database"},
+    },
+    {
+        "name": "IoT Ecosystem", "score": 1000,
+        "requires": [{"Internet-of-Things": 1, "Analytics": 1},
+                     {"Internet-of-Things": 1, "Artificial-Intelligence": 1}],
+        "details": {"iot_focus": True},
+    },
+    {
+        "name": "Cloud Trio", "score": 800,
+        "requires": [{"Compute": 1, "Storage": 1, "Database": 1}],
+        "details": {"combo": "Compute+Storage+Database"},
+    },
+    {
+        "name": "Data Pipeline", "score": 600,
+        "requires": [{"Analytics": 2, "Storage": 1}],
+        "details": {"combo": "Analytics+Storage"},
+    },
+    {
+        "name": "DevOps Suite", "score": 500,
+        "requires": [{"Developer-Tools": 2, "Management-Governance": 1}],
+        "details": {"combo": "DevTools+Management"},
+    },
+]
+
+
+class SpecialHandTable:
+    """スペシャル役のルールをカテゴリヒストグラムの判定表にまとめたもの
+
+    各条件は「参照カテゴリごとの必要枚数」の行（thresholds）と必要スート数になる。
+    手札のヒストグラムが行の全要素以上なら成立し、成立した条件のうち
+    最も上位のルールが役になる。判定結果はヒストグラム単位でキャッシュする。
+    """
+
+    def __init__(self, rules: Sequence[Dict]):
+        self.rules = list(rules)
+        self.categories: List[str] = sorted({category for rule in self.rules
+                                             for clause in rule.get("requires", [{}])
+                                             for category in clause})
+        self.category_index = {category: i for i, category in enumerate(self.categories)}
+
+        # 条件ごとの行（ルール順に並ぶ）
+        self.clause_rules: List[int] = []
+        self.thresholds: List[Tuple[int, ...]] = []
+        self.min_suits: List[int] = []
+        for rule_index, rule in enumerate(self.rules):
+            for clause in rule.get("requires", [{}]):
+                row = [0] * len(self.categories)
+                for category, count in clause.items():
+                    row[self.category_index[category]] = count
+                self.clause_rules.append(rule_index)
+                self.thresholds.append(tuple(row))
+                self.min_suits.append(rule.get("distinct_suits", 0))
+
+        self._cache: Dict[Tuple[Tuple[int, ...], int], int] = {}
+
+    def histogram(self, categories: Sequence[str]) -> Tuple[int, ...]:
+        """手札のカテゴリを参照カテゴリのヒストグラムにする（対象外は無視）"""
+        counts = [0] * len(self.categories)
+        index = self.category_index
+        for category in categories:
+            i = index.get(category)
+            if i is not None:
+                counts[i] += 1
+        return tuple(counts)
+
+    def match(self, histogram: Tuple[int, ...], distinct_suits: int) -> int:
+        """成立する最上位ルールの番号（なければ-1）"""
+        key = (histogram, distinct_suits)
+        rule_index = self._cache.get(key)
+        if rule_index is None:
+            rule_index = -1
+            for clause, row in enumerate(self.thresholds):
+                if distinct_suits >= self.min_suits[clause] and all(
+                        have >= need for have, need in zip(histogram, row)):
+                    rule_index = self.clause_rules[clause]
+                    break
+            self._cache[key] = rule_index
+        return rule_index
+
+    def evaluate(self, categories: Sequence[str], suits: Sequence[str]) -> Optional[Tuple[str, int, Dict]]:
+        """手札のスペシャル役を判定（役名, スコア, 詳細）"""
+        distinct_suits = set(suits)
+        rule_index = self.match(self.histogram(categories), len(distinct_suits))
+        if rule_index < 0:
+            return None
+        return self.describe(rule_index, distinct_suits)
+
+    def describe(self, rule_index: int, distinct_suits) -> Tuple[str, int, Dict]:
+        """ルール番号から（役名, スコア, 詳細）を作る"""
+        rule = self.rules[rule_index]
+        if "distinct_suits" in rule:
+            details = {"suits": sorted(distinct_suits)}
+        else:
+            details = dict(rule.get("details", {}))
+        return rule["name"], rule["score"], details
+
+    def match_batch(self, histograms, distinct_suits):
+        """(N, カテゴリ数) のヒストグラムをまとめて判定し、ルール番号の配列を返す（要numpy）"""
+        import numpy as np
+
+        histograms = np.asarray(histograms)
+        thresholds = np.asarray(self.thresholds, dtype=histograms.dtype).reshape(-1, len(self.categories))
+        ok = (histograms[:, None, :] >= thresholds[None, :, :]).all(axis=2)
+        ok &= np.asarray(distinct_suits)[:, None] >= np.asarray(self.min_suits)[None, :]
+        first = ok.argmax(axis=1)
+        return np.where(ok.any(axis=1), np.asarray(self.clause_rules)[first], -1)
+
+
+def compile_special_rules(rules: Sequence[Dict] = SPECIAL_HAND_RULES) -> SpecialHandTable:
+    """ルール定義から判定表を作成"""
+    return SpecialHandTable(rules)
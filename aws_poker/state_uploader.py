@@ -0,0 +1,297 @@
+"""
+ゲーム状態のバックグラウンドアップローダー（S3）
+
+スナップショットをキューに積み、ワーカースレッドがまとめてgzip圧縮した
+JSON Lines として時刻で分割したキーにアップロードする。呼び出し側（描画ループ）は
+キューに積むだけでネットワークを待たない。スロットリング・5xx・接続エラーだけを指数バックオフで
+再試行し（バケットがない・権限がないなどの恒久的なエラーはすぐに諦める）、close() で残りを書き出す。
+close() は全体の期限を持ち、期限を過ぎたら再試行せずに終える。
+
+キー: {prefix}/dt=YYYY-MM-DD/hour=HH/YYYYMMDDTHHMMSS.ffffff-{ランダム}-{件数}.jsonl.gz
+
+    python -m aws_poker.state_uploader bench --snapshots 20000 --latency-ms 20
+"""
+
+import argparse
+import gzip
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from .latency import LatencyHistogram
+
+
+# 再試行するエラーコード（スロットリング・一時的なサーバーエラー）
+RETRYABLE_CODES = frozenset({
+    "Throttling", "ThrottlingException", "ThrottledException", "RequestThrottled", "SlowDown",
+    "RequestLimitExceeded", "TooManyRequestsException", "ProvisionedThroughputExceededException",
+    "RequestTimeout", "RequestTimeoutException", "InternalError", "ServiceUnavailable",
+})
+# 再試行する例外（botocoreの接続・タイムアウト系はクラス名で判定する）
+RETRYABLE_EXCEPTIONS = frozenset({
+    "HTTPClientError", "EndpointConnectionError", "ConnectionClosedError", "ConnectTimeoutError",
+    "ReadTimeoutError", "ProxyConnectionError",
+})
+
+
+def is_retryable(error: Exception) -> bool:
+    """一時的なエラー（スロットリング・5xx・接続エラー）か"""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        code = response.get("Error", {}).get("Code", "")
+        status = response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return code in RETRYABLE_CODES or status == 429 or status >= 500
+    return any(cls.__name__ in RETRYABLE_EXCEPTIONS for cls in type(error).__mro__)
+
+
+class _Flush:
+    """キューに積む書き出し要求"""
+
+    __slots__ = ('done',)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class StateUploader:
+    """ゲーム状態のスナップショットをまとめてS3へアップロードする"""
+
+    def __init__(self, s3_client, bucket: str, prefix: str = "game_states", max_batch: int = 500,
+                 flush_interval: float = 5.0, max_queue: int = 10000, max_retries: int = 5,
+                 backoff: float = 0.5, max_backoff: float = 30.0, compresslevel: int = 6,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix.rstrip("/")
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.compresslevel = compresslevel
+        self.sleep = sleep
+
+        self._queue: "queue.Queue" = queue.Queue(max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._deadline: Optional[float] = None  # close() の期限（time.monotonic）
+        self.put_latency = LatencyHistogram()
+        self.stats = {
+            "submitted": 0, "dropped": 0, "uploaded_records": 0, "uploaded_objects": 0,
+            "raw_bytes": 0, "compressed_bytes": 0, "retries": 0, "failed_records": 0, "unsent_records": 0,
+        }
+
+    def start(self) -> 'StateUploader':
+        """ワーカースレッドを開始"""
+        if self._thread is None:
+            self._deadline = None
+            self._thread = threading.Thread(target=self._run, name="state-uploader", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, game_state: Dict) -> bool:
+        """スナップショットをキューに積む（キューが一杯ならFalse、待たない）"""
+        record = dict(game_state)
+        record.setdefault("timestamp", datetime.now().isoformat())
+        # 呼び出し側が後で状態を書き換えても影響しないよう、この時点でシリアライズする
+        line = json.dumps(record, ensure_ascii=False).encode('utf-8')
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("submitted")
+        if self._thread is None:
+            self.start()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """キューに積まれた分を全てアップロードするまで待つ"""
+        if self._thread is None:
+            return True
+        request = _Flush()
+        self._queue.put(request)
+        return request.done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """残りを書き出してワーカーを停止（timeout 秒を過ぎたら再試行せず、残りは送らない）"""
+        if self._thread is None:
+            return
+        if timeout is not None:
+            self._deadline = time.monotonic() + timeout
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def _run(self):
+        """ワーカー: バッチが一杯になるか一定時間たつまで集めてアップロード"""
+        batch: List[bytes] = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, bytes):
+                if self._expired():
+                    self._count("unsent_records")
+                    continue
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+                if len(batch) < self.max_batch:
+                    continue
+            if batch:
+                self._upload(batch)
+                batch = []
+            if isinstance(item, _Flush):
+                item.done.set()
+            elif item is _STOP:
+                return
+
+    def _expired(self, delay: float = 0.0) -> bool:
+        """close() の期限を過ぎるか"""
+        return self._deadline is not None and time.monotonic() + delay > self._deadline
+
+    def object_key(self, now: datetime, count: int) -> str:
+        """時刻で分割した一意なキー"""
+        return (f"{self.prefix}/dt={now:%Y-%m-%d}/hour={now:%H}/"
+                f"{now:%Y%m%dT%H%M%S.%f}-{uuid.uuid4().hex[:12]}-{count}.jsonl.gz")
+
+    def _upload(self, batch: List[bytes]):
+        """1バッチを圧縮してアップロード（一時的なエラーは指数バックオフで再試行）"""
+        raw = b"\n".join(batch) + b"\n"
+        body = gzip.compress(raw, self.compresslevel)
+        key = self.object_key(datetime.now(timezone.utc), len(batch))
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=body,
+                                          ContentType="application/x-ndjson", ContentEncoding="gzip")
+            except Exception as e:
+                # フルジッター付きの指数バックオフ
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                if attempt == self.max_retries or not is_retryable(e) or self._expired(delay):
+                    print(f"ゲーム状態のアップロードに失敗しました: {key} - {e}")
+                    self._count("failed_records", len(batch))
+                    return
+                self._count("retries")
+                self.sleep(delay)
+                continue
+            self.put_latency.record(time.perf_counter() - started)
+            with self._lock:
+                self.stats["uploaded_records"] += len(batch)
+                self.stats["uploaded_objects"] += 1
+                self.stats["raw_bytes"] += len(raw)
+                self.stats["compressed_bytes"] += len(body)
+            return
+
+
+class MemoryS3Client:
+    """ローカル検証用のS3代わり（put_object / get_object のみ、遅延と失敗を模擬できる）"""
+
+    def __init__(self, latency: float = 0.0, failures: int = 0):
+        self.objects: Dict[str, Dict[str, bytes]] = {}
+        self.latency = latency
+        self.failures = failures  # 最初のN回のput_objectを失敗させる
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket: str, Key: str, Body: bytes, **kwargs):
+        with self._lock:
+            self.calls += 1
+            fail = self.calls <= self.failures
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise ConnectionError("模擬的なネットワークエラー")
+        with self._lock:
+            self.objects.setdefault(Bucket, {})[Key] = bytes(Body)
+        return {"ETag": uuid.uuid4().hex}
+
+    def get_object(self, Bucket: str, Key: str):
+        import io
+        return {"Body": io.BytesIO(self.objects[Bucket][Key])}
+
+
+def read_records(s3_client, bucket: str, key: str) -> List[Dict]:
+    """アップロードしたオブジェクトからスナップショットを読み戻す"""
+    body = s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+    return [json.loads(line) for line in gzip.decompress(body).splitlines() if line]
+
+
+def _bench(args):
+    """スナップショットの投入レイテンシとアップロードのスループットを計測"""
+    if args.bucket:
+        import boto3
+        client = boto3.client("s3")
+        bucket = args.bucket
+    else:
+        client = MemoryS3Client(latency=args.latency_ms / 1000)
+        bucket = "bench"
+
+    state = {"round": 3, "total_score": 4200, "hand": ["EC2", "S3", "Lambda", "DynamoDB", "IAM"],
+             "selected": [True, False, False, True, False], "draws_remaining": 1}
+    submit_latency = LatencyHistogram()
+    uploader = StateUploader(client, bucket, prefix=args.prefix, max_batch=args.batch,
+                             max_queue=max(args.snapshots, 1)).start()
+    started = time.perf_counter()
+    for i in range(args.snapshots):
+        state["frame"] = i
+        submit_started = time.perf_counter()
+        uploader.submit(state)
+        submit_latency.record(time.perf_counter() - submit_started)
+    submitted = time.perf_counter() - started
+    uploader.close()
+    elapsed = time.perf_counter() - started
+
+    stats = uploader.stats
+    ratio = stats["compressed_bytes"] / stats["raw_bytes"] if stats["raw_bytes"] else 0.0
+    print(f"投入: {args.snapshots / submitted:.0f} 件/s "
+          f"(平均 {submit_latency.total_ms / max(submit_latency.count, 1) * 1000:.1f} µs, "
+          f"最大 {submit_latency.max_ms:.2f} ms)")
+    print(f"アップロード: {stats['uploaded_records'] / elapsed:.0f} 件/s, {stats['uploaded_objects']} オブジェクト, "
+          f"圧縮率 {ratio:.1%}, 再試行 {stats['retries']}, 失敗 {stats['failed_records']}, "
+          f"未送信 {stats['unsent_records']}")
+    put = uploader.put_latency.to_dict()
+    print(f"put_object: 平均 {put['mean_ms']:.2f} ms, p50 {put['p50_ms']:.2f} ms, p99 {put['p99_ms']:.2f} ms")
+
+
+def main():
+    """コマンドライン"""
+    parser = argparse.ArgumentParser(description="ゲーム状態アップローダー")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    bench = subparsers.add_parser("bench", help="スループットとレイテンシを計測")
+    bench.add_argument("--snapshots", type=int, default=20000, help="投入するスナップショット数")
+    bench.add_argument("--batch", type=int, default=500, help="1オブジェクトあたりの最大件数")
+    bench.add_argument("--latency-ms", type=float, default=20.0, help="ローカルS3代わりの応答遅延")
+    bench.add_argument("--bucket", default=None, help="実際のS3バケット（省略時はローカルの代わりを使う）")
+    bench.add_argument("--prefix", default="game_states", help="キーのプレフィックス")
+    args = parser.parse_args()
+    _bench(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+カード画像のサーフェス管理（表示形式への変換・共有・メモリ予算）
+
+読み込んだアイコンや生成したカード面を一度だけ表示形式へ変換（convert / convert_alpha）し、
+同じ内容のサーフェスはキーで共有する。ピクセルの総バイト数を集計し、予算を超えたら
+最も長く描画されていないカード表面から破棄する（必要になれば作り直す）。
+アイコンとカード裏面は枚数が少なく全カードで共有するので破棄しない。
+
+ディスプレイが未初期化の間は変換せずに保持し、初期化後に最初に使われたときに変換する。
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+
+import pygame
+
+ICON_SIZE = (80, 80)
+PLACEHOLDER_COLOR = (200, 200, 200)
+
+
+class _Entry:
+    """管理中のサーフェス"""
+
+    __slots__ = ('surface', 'nbytes', 'converted')
+
+    def __init__(self, surface: pygame.Surface, nbytes: int, converted: bool):
+        self.surface = surface
+        self.nbytes = nbytes
+        self.converted = converted
+
+
+def surface_bytes(surface: pygame.Surface) -> int:
+    """サーフェスのピクセルが占めるバイト数"""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+class SurfaceManager:
+    """表示形式に変換したサーフェスを共有し、カード表面をLRUで予算内に保つ"""
+
+    def __init__(self, budget_bytes: int = 32 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self._shared: Dict[Hashable, _Entry] = {}  # アイコン・裏面（破棄しない）
+        self._faces: 'OrderedDict[Hashable, _Entry]' = OrderedDict()  # 末尾が最近描画したもの
+        self.total_bytes = 0
+        self.face_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.conversions = 0
+
+    @staticmethod
+    def display_ready() -> bool:
+        """表示形式へ変換できるか（ディスプレイのモードが設定済みか）"""
+        return pygame.display.get_init() and pygame.display.get_surface() is not None
+
+    def convert(self, surface: pygame.Surface) -> Tuple[pygame.Surface, bool]:
+        """表示形式へ変換（透過を持つものは convert_alpha）。変換できたかも返す"""
+        if not self.display_ready():
+            return surface, False
+        self.conversions += 1
+        if surface.get_flags() & pygame.SRCALPHA:
+            return surface.convert_alpha(), True
+        return surface.convert(), True
+
+    def _store(self, surface: pygame.Surface) -> _Entry:
+        surface, converted = self.convert(surface)
+        entry = _Entry(surface, surface_bytes(surface), converted)
+        self.total_bytes += entry.nbytes
+        return entry
+
+    def _refresh(self, entry: _Entry, is_face: bool) -> pygame.Surface:
+        """ディスプレイ初期化前に作ったものを変換し直す"""
+        if not entry.converted and self.display_ready():
+            old_bytes = entry.nbytes
+            entry.surface, entry.converted = self.convert(entry.surface)
+            entry.nbytes = surface_bytes(entry.surface)
+            self.total_bytes += entry.nbytes - old_bytes
+            if is_face:
+                self.face_bytes += entry.nbytes - old_bytes
+        return entry.surface
+
+    def shared(self, key: Hashable, factory: Callable[[], pygame.Surface]) -> pygame.Surface:
+        """破棄しない共有サーフェス（なければ factory で作る）"""
+        entry = self._shared.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self._shared[key] = self._store(factory())
+            return entry.surface
+        self.hits += 1
+        return self._refresh(entry, is_face=False)
+
+    def load_icon(self, path: str, size: Tuple[int, int] = ICON_SIZE) -> pygame.Surface:
+        """アイコン画像を読み込んで拡大（同じパスは1枚を共有、読めなければ灰色の代替画像）"""
+        key = ('icon', path, size)
+        if key in self._shared:
+            self.hits += 1
+            return self._refresh(self._shared[key], is_face=False)
+        try:
+            return self.shared(key, lambda: pygame.transform.scale(pygame.image.load(path), size))
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"画像読み込みエラー: {path} - {e}")
+        # 読めなかったパスは代替画像と同じエントリを指す（バイト数は1回だけ数える）
+        self.shared(('placeholder', size), lambda: self._placeholder(size))
+        self._shared[key] = self._shared[('placeholder', size)]
+        return self._shared[key].surface
+
+    @staticmethod
+    def _placeholder(size: Tuple[int, int]) -> pygame.Surface:
+        surface = pygame.Surface(size)
+        surface.fill(PLACEHOLDER_COLOR)
+        return surface
+
+    def face(self, key: Hashable, factory: Callable[[], pygame.Surface]) -> pygame.Surface:
+        """カード表面（使うたびに最近描画したものとして扱い、予算を超えたら古いものから破棄）"""
+        entry = self._faces.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._faces.move_to_end(key)
+            return self._refresh(entry, is_face=True)
+
+        self.misses += 1
+        entry = self._faces[key] = self._store(factory())
+        self.face_bytes += entry.nbytes
+        self._evict()
+        return entry.surface
+
+    def _evict(self):
+        """予算内に収まるまで最も長く描画されていないカード表面を破棄（直前に使ったものは残す）"""
+        while self.total_bytes > self.budget_bytes and len(self._faces) > 1:
+            _, entry = self._faces.popitem(last=False)
+            self.total_bytes -= entry.nbytes
+            self.face_bytes -= entry.nbytes
+            self.evictions += 1
+
+    def set_budget(self, budget_bytes: int):
+        """予算を変更（超えていればその場で破棄）"""
+        self.budget_bytes = budget_bytes
+        self._evict()
+
+    def clear(self):
+        """全てのサーフェスを手放す（統計は残す）"""
+        self._shared.clear()
+        self._faces.clear()
+        self.total_bytes = 0
+        self.face_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """監視用の統計"""
+        return {
+            'budget_bytes': self.budget_bytes,
+            'total_bytes': self.total_bytes,
+            'face_bytes': self.face_bytes,
+            'shared': len({id(entry) for entry in self._shared.values()}),
+            'faces': len(self._faces),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'conversions': self.conversions,
+        }
+
+    def summary(self) -> str:
+        """オーバーレイ表示用の1行"""
+        return (f"surfaces {self.total_bytes / 1048576:.1f}/{self.budget_bytes / 1048576:.0f} MB | "
+                f"faces {len(self._faces)} | evicted {self.evictions}")
+
+
+# プロセス内で共有するマネージャー（デッキを作り直してもアイコンを読み直さない）
+default_manager = SurfaceManager()
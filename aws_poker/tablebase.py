@@ -0,0 +1,394 @@
+"""
+ホールド戦略のテーブルベース（ヒント用）
+
+残すカードの組み合わせごとに、ドロー後の期待スコアを事前に計算して保存する。
+実行時は手札の32通りのホールドについて表を引くだけで最善手が分かる。
+
+309枚のデッキでは開始ハンドが約230億通りあり、厳密な列挙は現実的でないため、
+残すカードを次の特徴に抽象化したキーで表を作る（役の判定に必要な情報だけを残す）:
+    ランクの多重集合、スペシャル役で参照するカテゴリ（それ以外は "other"）の多重集合、
+    異なるスートの数、全て同じスートならそのスート、残りドロー回数
+期待値はデッキ全体（残したカードを除く）から引くモンテカルロ法で推定する。
+ドロー2回の期待値は、1回目の表を使って2回目のホールドを最適に選んだ値の平均。
+
+表はサンプリングした開始ハンドに現れたキーしか持たない（特に4枚・3枚残しはほとんど欠ける）ので、
+ヒントでは表にないホールドをその場で同じ方法で推定して補う（1枚だけ引くドロー1回はデッキを全列挙して厳密に計算）。
+
+    python -m aws_poker.tablebase --hands 20000 --rollouts 300 --workers 8
+"""
+
+import argparse
+import os
+import random
+import struct
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .catalog import file_digest, load_catalog
+from .hand_evaluator import HandEvaluator
+from .hand_state import HAND_SIZE, HandState
+from .shared_catalog import SharedTables, catalog_cards, publish_catalog, shared_catalog
+
+MAGIC = b'AWTB'
+VERSION = 2
+HEADER = struct.Struct('<4sHHI20s')
+
+ALL_HELD = (1 << HAND_SIZE) - 1
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CSV = os.path.join(ROOT, "cards.csv")
+DEFAULT_TABLE = os.path.join(ROOT, "hold_tablebase.bin")
+
+CardCode = Tuple[int, int, int]
+
+
+class HoldKeyEncoder:
+    """残すカードを抽象化した整数キーに変換する
+
+    ビット構成: draws << 47 | 同一スート << 43 | 異なるスート数 << 40 | ランク << 20 | カテゴリ
+    ランク・カテゴリは昇順に4ビットずつ（値+1）。5枚で20ビットずつ使うので、
+    スート数より上のフィールドは40ビット目から置く（同一スートはスートID+1で4ビット、スート15種まで）。
+    """
+
+    def __init__(self, suits: Sequence[str]):
+        categories = HandEvaluator.SPECIAL_HANDS.categories
+        self.suit_ids = {suit: i for i, suit in enumerate(sorted(suits))}
+        self.category_ids = {category: i for i, category in enumerate(categories)}
+        self.other_category = len(categories)
+
+    def card_code(self, card) -> CardCode:
+        """カードを（ランク値, スートID, カテゴリ区分）に変換"""
+        category = getattr(card, 'category', None) or 'Unknown'
+        return (HandEvaluator.RANK_VALUES[card.rank], self.suit_ids[card.suit],
+                self.category_ids.get(category, self.other_category))
+
+    @staticmethod
+    def key(codes: Sequence[CardCode], draws: int) -> int:
+        """残すカードのコードからキーを作る"""
+        ranks = 0
+        for value in sorted(code[0] for code in codes):
+            ranks = (ranks << 4) | (value + 1)
+        categories = 0
+        for value in sorted(code[2] for code in codes):
+            categories = (categories << 4) | (value + 1)
+        return HoldKeyEncoder.pack(ranks, categories, {code[1] for code in codes}, draws)
+
+    @staticmethod
+    def pack(ranks: int, categories: int, suits: set, draws: int) -> int:
+        """ランク・カテゴリのビット列とスートの集合からキーを組み立てる"""
+        same_suit = next(iter(suits)) + 1 if len(suits) == 1 else 0
+        return (draws << 47) | (same_suit << 43) | (len(suits) << 40) | (ranks << 20) | categories
+
+
+def held_cards(cards: Sequence, mask: int) -> List:
+    """ホールドマスク（ビットi = i枚目を残す）に対応するカード"""
+    return [card for i, card in enumerate(cards) if mask >> i & 1]
+
+
+class RolloutEstimator:
+    """デッキからのドローをシミュレートしてホールドの期待スコアを推定する（構築とヒントで共通）
+
+    ドロー2回の値は、引いた5枚について one_draw（ドロー1回の表）で最善のホールドを選んだ値の平均。
+    """
+
+    def __init__(self, deck: Sequence, encoder: HoldKeyEncoder, one_draw: Callable[[int], Optional[float]]):
+        self.deck = deck
+        self.encoder = encoder
+        self.codes = [encoder.card_code(card) for card in deck]
+        self.one_draw = one_draw
+        self.state = HandState()
+        self.cache: Dict[int, float] = {}  # 5枚のキー -> ドロー1回を残した価値
+
+    def estimate(self, held: Sequence, excluded: Set[int], draws: int, rollouts: int,
+                 rng: random.Random) -> float:
+        """held を残して excluded 以外のデッキから引いたときの平均スコア"""
+        state, deck = self.state, self.deck
+        kept = len(held)
+        for slot, card in enumerate(held):
+            state.replace(slot, card)
+        held_codes = [self.encoder.card_code(card) for card in held]
+
+        total = 0.0
+        for _ in range(rollouts):
+            drawn: List[int] = []
+            while len(drawn) < HAND_SIZE - kept:
+                index = rng.randrange(len(deck))
+                if index not in excluded and index not in drawn:
+                    drawn.append(index)
+            for slot, index in enumerate(drawn, kept):
+                state.replace(slot, deck[index])
+            if draws == 1:
+                total += state.evaluate()[1]
+            else:
+                total += self.best_one_draw_value(held_codes + [self.codes[index] for index in drawn])
+        return total / rollouts
+
+    def exact_one_card(self, held: Sequence, excluded: Set[int]) -> float:
+        """4枚残してドロー1回の期待スコア（デッキを全列挙）"""
+        state = self.state
+        for slot, card in enumerate(held):
+            state.replace(slot, card)
+        total, count = 0.0, 0
+        for index, card in enumerate(self.deck):
+            if index in excluded:
+                continue
+            state.replace(HAND_SIZE - 1, card)
+            total += state.evaluate()[1]
+            count += 1
+        return total / count
+
+    def best_one_draw_value(self, codes: List[CardCode]) -> float:
+        """ドロー1回を残した手札（self.state の5枚）の価値（1回目の表で最善のホールドを選ぶ）"""
+        hand_key = HoldKeyEncoder.key(codes, 1)
+        best = self.cache.get(hand_key)
+        if best is not None:
+            return best
+
+        best = float(self.state.evaluate()[1])
+        # 全ホールドで共通の並べ替えを一度だけ行う
+        by_rank = sorted(range(HAND_SIZE), key=lambda i: codes[i][0])
+        by_category = sorted(range(HAND_SIZE), key=lambda i: codes[i][2])
+        suits = [code[1] for code in codes]
+        for mask in range(ALL_HELD):
+            ranks = 0
+            for i in by_rank:
+                if mask >> i & 1:
+                    ranks = (ranks << 4) | (codes[i][0] + 1)
+            categories = 0
+            for i in by_category:
+                if mask >> i & 1:
+                    categories = (categories << 4) | (codes[i][2] + 1)
+            held_suits = {suits[i] for i in range(HAND_SIZE) if mask >> i & 1}
+            value = self.one_draw(HoldKeyEncoder.pack(ranks, categories, held_suits, 1))
+            if value is not None and value > best:
+                best = value
+        self.cache[hand_key] = best
+        return best
+
+
+class Tablebase:
+    """ホールド戦略の表（キー -> 期待スコア）
+
+    deck を渡すと、表にないホールドをその場で推定して表に加える（渡さなければ表にあるホールドだけを比べる）。
+    ドロー2回の推定で2回目のホールドを選ぶときは、表にある（推定済みを含む）ドロー1回のキーだけを比べる。
+    """
+
+    def __init__(self, values: Dict[int, float], suits: Sequence[str], source_digest: bytes = b'\0' * 20,
+                 deck: Optional[Sequence] = None, rollouts: int = 300):
+        self.values = values
+        self.encoder = HoldKeyEncoder(suits)
+        self.suits = sorted(suits)
+        self.source_digest = source_digest
+        self.state = HandState()
+        self.rollouts = rollouts
+        self.estimated = 0  # その場で推定したキーの数
+        self.estimator = RolloutEstimator(deck, self.encoder, self.values.get) if deck else None
+        self._deck_indices: Dict[CardCode, List[int]] = {}
+        for index, code in enumerate(self.estimator.codes if self.estimator else []):
+            self._deck_indices.setdefault(code, []).append(index)
+
+    def __len__(self):
+        return len(self.values)
+
+    def hold_value(self, cards: Sequence, mask: int, draws_remaining: int) -> Optional[float]:
+        """ホールドの期待スコア（表になければ推定して加える。推定できなければNone）"""
+        if mask == ALL_HELD or draws_remaining <= 0:
+            self.state.set_cards(cards)
+            return float(self.state.evaluate()[1])
+        held = held_cards(cards, mask)
+        key = self.encoder.key([self.encoder.card_code(card) for card in held], draws_remaining)
+        value = self.values.get(key)
+        if value is None and self.estimator is not None:
+            value = self.values[key] = self._estimate(held, draws_remaining, key)
+            self.estimated += 1
+        return value
+
+    def _estimate(self, held: Sequence, draws: int, key: int) -> float:
+        """表にないホールドの期待スコアを構築時と同じ方法で推定（残したカードはデッキから除く）"""
+        excluded: Set[int] = set()
+        for card in held:
+            candidates = self._deck_indices.get(self.encoder.card_code(card), [])
+            index = next((i for i in candidates if i not in excluded), None)
+            if index is not None:
+                excluded.add(index)
+        if draws == 1 and len(held) == HAND_SIZE - 1:
+            return self.estimator.exact_one_card(held, excluded)
+        # キーごとに乱数を固定して、同じホールドは常に同じ推定値にする
+        return self.estimator.estimate(held, excluded, draws, self.rollouts, random.Random(key))
+
+    def expected_score(self, cards: Sequence, mask: int, draws_remaining: int) -> Optional[float]:
+        """ホールドの期待スコア（表になく推定もできない組み合わせはNone）"""
+        return self.hold_value(cards, mask, draws_remaining)
+
+    def best_hold(self, cards: Sequence, draws_remaining: int) -> Tuple[int, float]:
+        """最善のホールドマスクと期待スコアを返す"""
+        best_mask, best_value = ALL_HELD, self.hold_value(cards, ALL_HELD, draws_remaining)
+        if draws_remaining <= 0:
+            return best_mask, best_value
+
+        for mask in range(ALL_HELD):
+            value = self.hold_value(cards, mask, draws_remaining)
+            if value is not None and value > best_value:
+                best_mask, best_value = mask, value
+        return best_mask, best_value
+
+    def save(self, path: str):
+        """表を圧縮して保存"""
+        keys = sorted(self.values)
+        key_array = array('q', keys)
+        value_array = array('f', (self.values[k] for k in keys))
+        suits = "\n".join(self.suits).encode('utf-8')
+        payload = zlib.compress(struct.pack('<I', len(suits)) + suits
+                                + key_array.tobytes() + value_array.tobytes(), 9)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, len(keys), self.source_digest))
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TABLE, csv_path: Optional[str] = None) -> 'Tablebase':
+        """保存した表を読み込む
+
+        csv_path を渡すと、構築元のCSVと内容が一致しなければ拒否し、一致すればそのデッキで表にないホールドを推定する。
+        """
+        with open(path, 'rb') as f:
+            magic, version, _, n_entries, source_digest = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("テーブルベースの形式が不正です")
+            if csv_path is not None and source_digest != file_digest(csv_path):
+                raise ValueError(f"テーブルベースが {os.path.basename(csv_path)} と一致しません（再構築してください）")
+            payload = zlib.decompress(f.read())
+
+        suits_length = struct.unpack_from('<I', payload)[0]
+        offset = 4 + suits_length
+        suits = payload[4:offset].decode('utf-8').split("\n")
+        keys = array('q')
+        keys.frombytes(payload[offset:offset + n_entries * keys.itemsize])
+        offset += n_entries * keys.itemsize
+        values = array('f')
+        values.frombytes(payload[offset:offset + n_entries * values.itemsize])
+
+        # 構築元と同じデッキがあれば、表にないホールドをその場で推定できる
+        deck = None
+        if csv_path is not None:
+            with load_catalog(csv_path) as catalog:
+                deck = catalog_cards(catalog)
+        return cls(dict(zip(keys, values)), suits, source_digest, deck)
+
+
+# ---- 構築（ワーカープロセス） ----
+
+class SortedTable:
+    """昇順のキー配列と値配列で引く読み取り専用の表（共有メモリ上の配列をそのまま使う）"""
+
+    def __init__(self, keys: Sequence[int], values: Sequence[float]):
+        self.keys = keys
+        self.values = values
+
+    def get(self, key: int) -> Optional[float]:
+        """キーの値（なければNone）"""
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.values[i]
+        return None
+
+
+_worker_deck: List = []
+_worker_estimator: Optional[RolloutEstimator] = None
+_worker_tables: Optional[SharedTables] = None
+
+
+def _init_worker(handle):
+    """ワーカープロセスの初期化（カタログとドロー1回の表は共有メモリから参照する）"""
+    global _worker_deck, _worker_estimator, _worker_tables
+    _worker_tables = SharedTables.attach(handle)
+    _worker_deck = catalog_cards(shared_catalog(_worker_tables))
+    table = SortedTable(_worker_tables['one_draw_keys'], _worker_tables['one_draw_values'])
+    _worker_estimator = RolloutEstimator(_worker_deck, HoldKeyEncoder({card.suit for card in _worker_deck}),
+                                         table.get)
+
+
+def _estimate_chunk(args: Tuple[int, int, int, int]) -> Dict[int, Tuple[float, int]]:
+    """ランダムな開始ハンドに現れるホールドの期待スコアを推定（キー -> (合計, 回数)）"""
+    seed, n_hands, rollouts, draws = args
+    rng = random.Random(seed)
+    deck = _worker_deck
+    estimator = _worker_estimator
+    codes_of = estimator.codes
+    totals: Dict[int, Tuple[float, int]] = {}
+
+    for _ in range(n_hands):
+        hand = rng.sample(range(len(deck)), HAND_SIZE)
+        for mask in range(ALL_HELD):
+            kept = [index for i, index in enumerate(hand) if mask >> i & 1]
+            key = HoldKeyEncoder.key([codes_of[index] for index in kept], draws)
+            if key in totals:
+                continue
+            # 残したカード以外からドローする（捨てたカードもデッキに戻る）
+            mean = estimator.estimate([deck[index] for index in kept], set(kept), draws, rollouts, rng)
+            totals[key] = (mean * rollouts, rollouts)
+    return totals
+
+
+def _merge(results, merged: Dict[int, Tuple[float, int]]):
+    """ワーカーの集計結果を合算"""
+    for totals in results:
+        for key, (total, count) in totals.items():
+            previous_total, previous_count = merged.get(key, (0.0, 0))
+            merged[key] = (previous_total + total, previous_count + count)
+
+
+def build_tablebase(csv_path: str = DEFAULT_CSV, hands: int = 20000, rollouts: int = 300,
+                    workers: Optional[int] = None, seed: int = 0, chunk_hands: int = 200) -> Tablebase:
+    """テーブルベースを構築（ドロー1回の表を作ってからドロー2回の表を作る）"""
+    chunks = [(seed * 1_000_003 + i, min(chunk_hands, hands - start), rollouts)
+              for i, start in enumerate(range(0, hands, chunk_hands))]
+
+    values: Dict[int, float] = {}
+    with load_catalog(csv_path) as catalog:
+        for draws in (1, 2):
+            started = time.time()
+            merged: Dict[int, Tuple[float, int]] = {}
+            # ドロー2回の構築ではドロー1回の表をキー順の配列にして共有する
+            one_draw_keys = sorted(values) if draws == 2 else []
+            one_draw = {'one_draw_keys': array('q', one_draw_keys),
+                        'one_draw_values': array('d', (values[key] for key in one_draw_keys))}
+            tasks = [(chunk_seed + draws * 7919, n, r, draws) for chunk_seed, n, r in chunks]
+            with publish_catalog(catalog, one_draw) as tables, \
+                    ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                        initargs=(tables.handle,)) as executor:
+                for done, totals in enumerate(executor.map(_estimate_chunk, tasks), 1):
+                    _merge([totals], merged)
+                    print(f"\rドロー{draws}回: {done}/{len(tasks)} チャンク, {len(merged)} キー", end="", flush=True)
+            print(f" ({time.time() - started:.0f}秒)")
+            for key, (total, count) in merged.items():
+                values[key] = total / count
+        suits = list(catalog.suits)
+
+    return Tablebase(values, suits, file_digest(csv_path))
+
+
+def main():
+    """テーブルベースを構築して保存"""
+    parser = argparse.ArgumentParser(description="ホールド戦略のテーブルベースを構築")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="カードデータのCSV")
+    parser.add_argument("--output", default=DEFAULT_TABLE, help="出力ファイル")
+    parser.add_argument("--hands", type=int, default=20000, help="サンプリングする開始ハンド数")
+    parser.add_argument("--rollouts", type=int, default=300, help="ホールドごとのドロー試行回数")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数（既定: CPU数）")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    args = parser.parse_args()
+
+    tablebase = build_tablebase(args.csv, args.hands, args.rollouts, args.workers, args.seed)
+    tablebase.save(args.output)
+    print(f"テーブルベースを保存しました: {args.output} ({len(tablebase)}エントリ, "
+          f"{os.path.getsize(args.output) / 1024:.0f}KB)")
+
+
+if __name__ == "__main__":
+    main()
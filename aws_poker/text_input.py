@@ -0,0 +1,99 @@
+"""
+ウィンドウ内のテキスト入力ボックス
+"""
+
+from typing import Optional, Tuple
+
+import pygame
+
+
+class TextInputBox:
+    """TEXTINPUTイベントで文字を受け取るモーダル入力ボックス
+
+    handle_event() は入力確定で 'submit'、キャンセルで 'cancel'、
+    貼り付け要求（Ctrl+V / Cmd+V）で 'paste' を返す。貼り付ける文字列は
+    呼び出し側がクリップボードから取得して insert() で渡す。
+    """
+
+    def __init__(self, rect: pygame.Rect, font: pygame.font.Font, prompt: str,
+                 placeholder: str = "", max_length: int = 32):
+        self.rect = rect
+        self.font = font
+        self.prompt = prompt
+        self.placeholder = placeholder
+        self.max_length = max_length
+        self.text = ""
+        self.active = False
+
+        # 色定義
+        self.bg_color = (0, 0, 0)
+        self.border_color = (255, 255, 255)
+        self.text_color = (255, 255, 255)
+        self.placeholder_color = (120, 120, 120)
+
+    def start(self):
+        """入力を開始"""
+        self.text = ""
+        self.active = True
+        pygame.key.start_text_input()
+        pygame.key.set_text_input_rect(self.rect)
+
+    def stop(self):
+        """入力を終了"""
+        self.active = False
+        pygame.key.stop_text_input()
+
+    def insert(self, text: str):
+        """文字列を挿入（改行や制御文字は除く）"""
+        text = "".join(c for c in text if c.isprintable()).strip()
+        self.text = (self.text + text)[:self.max_length]
+
+    def handle_event(self, event) -> Optional[str]:
+        """イベントを処理し、確定・キャンセル・貼り付け要求を返す"""
+        if not self.active:
+            return None
+
+        if event.type == pygame.TEXTINPUT:
+            self.insert(event.text)
+        elif event.type == pygame.KEYDOWN:
+            if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
+                return 'submit'
+            if event.key == pygame.K_ESCAPE:
+                return 'cancel'
+            if event.key == pygame.K_BACKSPACE:
+                self.text = self.text[:-1]
+            elif event.key == pygame.K_v and event.mod & (pygame.KMOD_CTRL | pygame.KMOD_META):
+                return 'paste'
+        return None
+
+    def draw(self, surface: pygame.Surface, small_font: Optional[pygame.font.Font] = None) -> pygame.Rect:
+        """入力ボックスを描画し、描いた範囲を返す"""
+        pygame.draw.rect(surface, self.bg_color, self.rect)
+        pygame.draw.rect(surface, self.border_color, self.rect, 3)
+
+        # プロンプト
+        prompt_surface = self.font.render(self.prompt, True, self.text_color)
+        surface.blit(prompt_surface, (self.rect.x + 20, self.rect.y + 15))
+
+        # 入力欄
+        field = pygame.Rect(self.rect.x + 20, self.rect.y + 60, self.rect.width - 40, 44)
+        pygame.draw.rect(surface, (255, 255, 255), field, 2)
+
+        if self.text:
+            text_surface = self.font.render(self.text, True, self.text_color)
+        else:
+            text_surface = self.font.render(self.placeholder, True, self.placeholder_color)
+        text_pos: Tuple[int, int] = (field.x + 10, field.centery - text_surface.get_height() // 2)
+        surface.blit(text_surface, text_pos)
+
+        # カーソル（0.5秒ごとに点滅）
+        if (pygame.time.get_ticks() // 500) % 2 == 0:
+            cursor_x = field.x + 10 + (text_surface.get_width() if self.text else 0) + 2
+            pygame.draw.line(surface, self.text_color, (cursor_x, field.y + 8), (cursor_x, field.bottom - 8), 2)
+
+        # 操作説明
+        if small_font is not None:
+            help_surface = small_font.render("Enterで確定 | ESCでキャンセル | Ctrl+Vで貼り付け",
+                                             True, (200, 200, 200))
+            surface.blit(help_surface, (self.rect.x + 20, field.bottom + 12))
+        return self.rect
@@ -9,6 +9,8 @@ import re
 from pathlib import Path
 from typing import List, Dict, Tuple
 
+from aws_poker.catalog import catalog_path_for, write_catalog
+
 class ArchitectureCardGenerator:
     """Architecture-Iconsからカードデータを生成するクラス"""
     
@@ -134,6 +136,11 @@ class ArchitectureCardGenerator:
             for card in self.cards:
                 writer.writerow(card)
         
+        # 起動高速化用のバイナリカタログも出力
+        catalog_path = catalog_path_for(output_file)
+        write_catalog(self.cards, catalog_path, source_csv=output_file)
+        print(f"バイナリカタログを生成しました: {catalog_path}")
+        
         print(f"完了: {len(self.cards)}枚のカードを生成しました")
     
     def print_statistics(self):
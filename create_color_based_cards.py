@@ -3,24 +3,174 @@
 アイコンの実際の色を分析してスートを決定するカード生成スクリプト
 """
 
+import argparse
+import hashlib
+import json
 import os
 import csv
 import re
 import colorsys
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 from PIL import Image
 import numpy as np
-from sklearn.cluster import KMeans
 from collections import Counter
 
+from aws_poker.catalog import catalog_path_for, write_catalog
+
+class ColorAnalysisCache:
+    """アイコン内容のハッシュと分析パラメータをキーにした永続色分析キャッシュ（SQLite）"""
+    
+    def __init__(self, db_path: str = None):
+        if db_path is None:
+            db_path = os.path.join(os.path.dirname(__file__), ".color_cache.sqlite")
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS color_analysis ("
+            " content_hash TEXT NOT NULL,"
+            " params TEXT NOT NULL,"
+            " dominant_colors TEXT NOT NULL,"
+            " suit TEXT NOT NULL,"
+            " icon_path TEXT,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (content_hash, params))"
+        )
+        self.conn.commit()
+    
+    @staticmethod
+    def hash_file(image_path: Path) -> str:
+        """PNGファイルの内容ハッシュを計算"""
+        return hashlib.sha256(Path(image_path).read_bytes()).hexdigest()
+    
+    def get(self, content_hash: str, params: str) -> Optional[Tuple[List[Tuple[int, int, int]], str]]:
+        """キャッシュされた (主要色, スート) を取得"""
+        row = self.conn.execute(
+            "SELECT dominant_colors, suit FROM color_analysis WHERE content_hash = ? AND params = ?",
+            (content_hash, params)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [tuple(color) for color in json.loads(row[0])], row[1]
+    
+    def put_many(self, entries: List[Tuple[str, str, List[Tuple[int, int, int]], str, str]]):
+        """(内容ハッシュ, パラメータ, 主要色, スート, アイコンパス) をまとめて保存"""
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO color_analysis VALUES (?, ?, ?, ?, ?, ?)",
+            [(content_hash, params, json.dumps(colors), suit, icon_path, now)
+             for content_hash, params, colors, suit, icon_path in entries]
+        )
+        self.conn.commit()
+    
+    @staticmethod
+    def path_key(image_path: Path) -> str:
+        """保存するアイコンパス（削除済みのアイコンも指定できるよう絶対パスにそろえる）"""
+        return str(Path(image_path).resolve())
+    
+    def invalidate(self, image_paths: List[Path] = None, params: str = None) -> int:
+        """エントリを無効化（指定がなければ全件）し、削除件数を返す
+        
+        アイコンは現在の内容のハッシュか、保存したパスのどちらかが一致すれば削除する（削除済みのアイコンも指定できる）。
+        """
+        conditions, values = [], []
+        if image_paths:
+            paths = [self.path_key(path) for path in image_paths]
+            hashes = [self.hash_file(path) for path in image_paths if Path(path).exists()]
+            conditions.append(f"(icon_path IN ({', '.join('?' * len(paths))})"
+                              f" OR content_hash IN ({', '.join('?' * len(hashes))}))")
+            values.extend(paths + hashes)
+        if params is not None:
+            conditions.append("params = ?")
+            values.append(params)
+        
+        query = "DELETE FROM color_analysis"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        deleted = self.conn.execute(query, values).rowcount
+        self.conn.commit()
+        return deleted
+    
+    def prune(self) -> int:
+        """アイコンファイルが存在しなくなったエントリを削除し、削除件数を返す"""
+        paths = [row[0] for row in self.conn.execute(
+            "SELECT DISTINCT icon_path FROM color_analysis WHERE icon_path IS NOT NULL")]
+        missing = [(path,) for path in paths if not os.path.exists(path)]
+        if not missing:
+            return 0
+        deleted = self.conn.executemany("DELETE FROM color_analysis WHERE icon_path = ?", missing).rowcount
+        self.conn.commit()
+        return deleted
+    
+    def stats(self) -> Dict:
+        """キャッシュ統計を取得"""
+        total = self.conn.execute("SELECT COUNT(*) FROM color_analysis").fetchone()[0]
+        by_params = dict(self.conn.execute(
+            "SELECT params, COUNT(*) FROM color_analysis GROUP BY params ORDER BY params"
+        ).fetchall())
+        by_suit = dict(self.conn.execute(
+            "SELECT suit, COUNT(*) FROM color_analysis GROUP BY suit ORDER BY suit"
+        ).fetchall())
+        return {
+            'path': self.db_path,
+            'entries': total,
+            'size_bytes': os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'by_params': by_params,
+            'by_suit': by_suit,
+        }
+    
+    def print_stats(self):
+        """キャッシュ統計を表示"""
+        stats = self.stats()
+        lookups = stats['hits'] + stats['misses']
+        hit_rate = (stats['hits'] / lookups * 100) if lookups else 0.0
+        
+        print("\n=== 色分析キャッシュ統計 ===")
+        print(f"  ファイル: {stats['path']} ({stats['size_bytes'] / 1024:.1f} KB)")
+        print(f"  エントリ数: {stats['entries']}")
+        print(f"  今回の参照: ヒット {stats['hits']} / ミス {stats['misses']} (ヒット率 {hit_rate:.1f}%)")
+        for params, count in stats['by_params'].items():
+            print(f"  {params}: {count}件")
+        for suit, count in stats['by_suit'].items():
+            print(f"    {suit}: {count}件")
+    
+    def close(self):
+        """データベース接続を閉じる"""
+        self.conn.close()
+
 class ColorBasedCardGenerator:
     """アイコンの色分析に基づくカードジェネレーター"""
     
-    def __init__(self, base_path: str = None):
+    # 主要色の抽出方式
+    # kmeans: 従来のKMeans(n_init=10)（既定）、minibatch: 色ヒストグラムで初期化したMiniBatchKMeans、
+    # histogram: 量子化色ヒストグラム（最速。--check で既存のスート判定と一致を確認してから使う）
+    MODES = ('kmeans', 'minibatch', 'histogram')
+    
+    # スキャン結果から生成するCSVの列（rank は別途割り当て、icon_path は行の識別に使う）
+    GENERATED_COLUMNS = ('service_name', 'category', 'suit', 'filename')
+    
+    # 分析ロジックを変更した場合は上げて永続キャッシュを無効化する
+    ANALYSIS_VERSION = 2
+    
+    def __init__(self, base_path: str = None, mode: str = 'kmeans', workers: Optional[int] = None,
+                 cache: Optional[ColorAnalysisCache] = None):
         if base_path is None:
             base_path = os.path.join(os.path.dirname(__file__), "Architecture-Icons")
+        if mode not in self.MODES:
+            raise ValueError(f"未対応の色抽出モードです: {mode}")
         self.base_path = Path(base_path)
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache
         self.cards = []
         
         # より細かい色からスートへのマッピング（実際のAWS色に基づく）
@@ -40,67 +190,94 @@ class ColorBasedCardGenerator:
         # 色分析結果のキャッシュ
         self.color_cache = {}
     
-    def extract_dominant_colors(self, image_path: Path, n_colors: int = 8) -> List[Tuple[int, int, int]]:
-        """画像から主要色を抽出（改良版）"""
+    def extract_dominant_colors(self, image_path: Path, n_colors: int = 8) -> Optional[List[Tuple[int, int, int]]]:
+        """画像から主要色を抽出（改良版。読み込みや分析に失敗した場合はNone）"""
         try:
-            # 画像を開く
-            with Image.open(image_path) as img:
-                # RGBAの場合はRGBに変換
-                if img.mode == 'RGBA':
-                    # 透明部分を白背景に合成
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[-1])
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # 画像をリサイズして処理を高速化
-                img = img.resize((96, 96))  # より高解像度で分析
-                
-                # ピクセルデータを取得
-                pixels = np.array(img).reshape(-1, 3)
-                
-                # 白に近い色（背景）をより厳密に除外
-                non_white_pixels = []
-                for pixel in pixels:
-                    # 白、薄いグレーを除外
-                    if not (pixel[0] > 230 and pixel[1] > 230 and pixel[2] > 230):
-                        # 非常に暗い色も除外（影など）
-                        if not (pixel[0] < 20 and pixel[1] < 20 and pixel[2] < 20):
-                            non_white_pixels.append(pixel)
-                
-                if len(non_white_pixels) < 10:
-                    # ほとんど白の場合はグレーとして扱う
-                    return [(128, 128, 128)]
-                
-                non_white_pixels = np.array(non_white_pixels)
-                
-                # K-meansクラスタリングで主要色を抽出
-                n_colors = min(n_colors, len(non_white_pixels))
-                kmeans = KMeans(n_clusters=n_colors, random_state=42, n_init=10)
-                kmeans.fit(non_white_pixels)
-                
-                # クラスタの中心色を取得
-                colors = kmeans.cluster_centers_.astype(int)
-                
-                # 各色の出現頻度を計算
-                labels = kmeans.labels_
-                color_counts = Counter(labels)
-                
-                # 頻度順にソート
-                sorted_colors = []
-                for label, count in color_counts.most_common():
-                    color = tuple(colors[label])
-                    # 極端に暗い色や明るい色を除外
-                    r, g, b = color
-                    if not (r < 30 and g < 30 and b < 30) and not (r > 240 and g > 240 and b > 240):
-                        sorted_colors.append(color)
-                
-                return sorted_colors[:5]  # 上位5色を返す
+            pixels = self._load_foreground_pixels(image_path)
+            if pixels is None:
+                # ほとんど白の場合はグレーとして扱う
+                return [(128, 128, 128)]
+            
+            if self.mode == 'histogram':
+                sorted_colors = self._histogram_colors(pixels)
+            else:
+                sorted_colors = self._cluster_colors(pixels, n_colors)
+            
+            # 極端に暗い色や明るい色を除外
+            return [
+                color for color in sorted_colors
+                if not all(c < 30 for c in color) and not all(c > 240 for c in color)
+            ][:5]  # 上位5色を返す
                 
         except Exception as e:
             print(f"色抽出エラー ({image_path}): {e}")
-            return [(128, 128, 128)]  # デフォルトはグレー
+            return None
+    
+    def _load_foreground_pixels(self, image_path: Path) -> Optional[np.ndarray]:
+        """背景（白・黒）を除いたピクセル配列を取得"""
+        with Image.open(image_path) as img:
+            # RGBAの場合はRGBに変換
+            if img.mode == 'RGBA':
+                # 透明部分を白背景に合成
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[-1])
+                img = background
+            elif img.mode != 'RGB':
+                img = img.convert('RGB')
+            
+            # 画像をリサイズして処理を高速化
+            img = img.resize((96, 96))  # より高解像度で分析
+            
+            # ピクセルデータを取得
+            pixels = np.asarray(img).reshape(-1, 3)
+        
+        # 白、薄いグレー、非常に暗い色（影など）をマスクで一括除外
+        white = (pixels > 230).all(axis=1)
+        black = (pixels < 20).all(axis=1)
+        pixels = pixels[~(white | black)]
+        
+        if len(pixels) < 10:
+            return None
+        return pixels
+    
+    def _cluster_colors(self, pixels: np.ndarray, n_colors: int) -> List[Tuple[int, int, int]]:
+        """K-meansクラスタリングで主要色を頻度順に抽出"""
+        n_colors = min(n_colors, len(pixels))
+        
+        if self.mode == 'minibatch':
+            from sklearn.cluster import MiniBatchKMeans
+            # アイコン自身の色ヒストグラムの上位色から開始（ウォームスタート）。
+            # 他のアイコンの結果を引き継がないので、分析順やワーカー数に依らず同じ結果になる
+            init = np.array(self._histogram_colors(pixels)[:n_colors], dtype=float)
+            kmeans = MiniBatchKMeans(n_clusters=len(init), init=init, n_init=1,
+                                     random_state=42, batch_size=1024)
+        else:
+            from sklearn.cluster import KMeans
+            kmeans = KMeans(n_clusters=n_colors, random_state=42, n_init=10)
+        kmeans.fit(pixels)
+        
+        # クラスタの中心色を取得
+        colors = kmeans.cluster_centers_.astype(int)
+        
+        # 各色の出現頻度を計算して頻度順にソート
+        color_counts = Counter(kmeans.labels_)
+        return [tuple(int(c) for c in colors[label]) for label, _ in color_counts.most_common()]
+    
+    def _histogram_colors(self, pixels: np.ndarray, bins_per_channel: int = 16) -> List[Tuple[int, int, int]]:
+        """量子化した色ヒストグラムで主要色を頻度順に抽出"""
+        shift = 8 - int(np.log2(bins_per_channel))
+        quantized = (pixels >> shift).astype(np.int32)
+        keys = (quantized[:, 0] * bins_per_channel + quantized[:, 1]) * bins_per_channel + quantized[:, 2]
+        
+        unique_keys, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        # 各ビンの代表色はビン内ピクセルの平均色
+        sums = np.zeros((len(unique_keys), 3), dtype=np.int64)
+        np.add.at(sums, inverse.ravel(), pixels)
+        means = (sums // counts[:, None]).astype(int)
+        
+        # 頻度順（同数の場合はビン番号順で決定的に）
+        order = np.lexsort((unique_keys, -counts))
+        return [tuple(int(c) for c in means[i]) for i in order]
     
     def rgb_to_hsv(self, r: int, g: int, b: int) -> Tuple[float, float, float]:
         """RGBをHSVに変換"""
@@ -201,15 +378,31 @@ class ColorBasedCardGenerator:
             else:
                 return 'Purple'
     
+    def analysis_params(self) -> str:
+        """永続キャッシュのキーに含める分析パラメータ"""
+        return json.dumps({'mode': self.mode, 'n_colors': 8, 'size': 96,
+                           'version': self.ANALYSIS_VERSION}, sort_keys=True)
+    
     def analyze_icon_color(self, image_path: Path) -> str:
         """アイコンの色を分析してスートを決定（改良版）"""
         if str(image_path) in self.color_cache:
             return self.color_cache[str(image_path)]
         
-        # 主要色を抽出
-        dominant_colors = self.extract_dominant_colors(image_path)
+        _, most_common_suit = self.analyze_icon(image_path)
         
-        # 各色をスートに分類（重み付き投票）
+        # キャッシュに保存
+        self.color_cache[str(image_path)] = most_common_suit
+        return most_common_suit
+    
+    def analyze_icon(self, image_path: Path) -> Tuple[Optional[List[Tuple[int, int, int]]], str]:
+        """アイコンの主要色を抽出してスートを判定（失敗した場合は主要色がNoneでスートはグレー）"""
+        dominant_colors = self.extract_dominant_colors(image_path)
+        if dominant_colors is None:
+            return None, 'Gray'
+        return dominant_colors, self.vote_suit(dominant_colors)
+    
+    def vote_suit(self, dominant_colors: List[Tuple[int, int, int]]) -> str:
+        """主要色の重み付き投票でスートを決定"""
         suit_votes = Counter()
         for i, color in enumerate(dominant_colors):
             suit = self.classify_color_to_suit(color)
@@ -219,18 +412,8 @@ class ColorBasedCardGenerator:
         
         # 最も多く投票されたスートを選択
         if suit_votes:
-            most_common_suit = suit_votes.most_common(1)[0][0]
-        else:
-            most_common_suit = 'Gray'
-        
-        # キャッシュに保存
-        self.color_cache[str(image_path)] = most_common_suit
-        
-        # より詳細な色情報を表示
-        color_info = ", ".join([f"RGB{color}" for color in dominant_colors[:3]])
-        print(f"  {image_path.name}: [{color_info}] -> {most_common_suit}")
-        
-        return most_common_suit
+            return suit_votes.most_common(1)[0][0]
+        return 'Gray'
     
     def extract_service_name(self, filename: str) -> str:
         """ファイル名からサービス名を抽出"""
@@ -239,11 +422,10 @@ class ColorBasedCardGenerator:
         name = name.replace("-", " ").replace("_", " ")
         return name
     
-    def scan_architecture_icons(self):
-        """Architecture-Iconsフォルダをスキャンしてアイコンを収集"""
-        print("Architecture-Iconsフォルダをスキャン中...")
-        
-        for category_dir in self.base_path.iterdir():
+    def collect_icon_files(self) -> List[Tuple[str, Path]]:
+        """カテゴリ名とPNGファイルの組を決定的な順序で収集"""
+        icon_files = []
+        for category_dir in sorted(self.base_path.iterdir()):
             if not category_dir.is_dir() or category_dir.name.startswith('.'):
                 continue
             
@@ -256,26 +438,94 @@ class ColorBasedCardGenerator:
                 continue
             
             # PNGファイルを収集
-            png_files = list(pixel_48_dir.glob("*.png"))
-            png_files = [f for f in png_files if not f.name.startswith('.')]
+            png_files = sorted(f for f in pixel_48_dir.glob("*.png") if not f.name.startswith('.'))
+            print(f"{category_name}: {len(png_files)}個のPNGファイル")
             
-            print(f"\n{category_name}: {len(png_files)}個のPNGファイルを分析中...")
+            icon_files.extend((category_name, png_file) for png_file in png_files)
+        return icon_files
+    
+    def analyze_icons(self, png_files: List[Path]) -> List[str]:
+        """複数のアイコンを並列に分析し、入力と同じ順序でスートを返す"""
+        pending = [f for f in png_files if str(f) not in self.color_cache]
+        
+        # 永続キャッシュにある（内容が変わっていない）アイコンは分析しない
+        content_hashes = {}
+        if self.cache is not None:
+            params = self.analysis_params()
+            uncached = []
+            for png_file in pending:
+                content_hash = self.cache.hash_file(png_file)
+                cached = self.cache.get(content_hash, params)
+                if cached is None:
+                    content_hashes[str(png_file)] = content_hash
+                    uncached.append(png_file)
+                else:
+                    self.color_cache[str(png_file)] = cached[1]
+            print(f"キャッシュ済み: {len(pending) - len(uncached)}個 / 新規・変更: {len(uncached)}個")
+            pending = uncached
+        
+        total = len(pending)
+        if total:
+            workers = min(self.workers, total)
+            if workers > 1:
+                # 1ワーカーあたり数チャンクに分けて負荷の偏りを抑える
+                chunksize = max(1, total // (workers * 4))
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=(str(self.base_path), self.mode)) as executor:
+                    results = executor.map(_analyze_worker, pending, chunksize=chunksize)
+                    self._collect_results(pending, results, total, content_hashes)
+            else:
+                results = (self.analyze_icon(f) for f in pending)
+                self._collect_results(pending, results, total, content_hashes)
+        
+        return [self.color_cache[str(f)] for f in png_files]
+    
+    def _collect_results(self, png_files: List[Path], results, total: int, content_hashes: Dict[str, str]):
+        """分析結果をキャッシュに格納しながら進捗を表示"""
+        entries = []
+        failures = 0
+        for done, (png_file, (dominant_colors, suit)) in enumerate(zip(png_files, results), 1):
+            self.color_cache[str(png_file)] = suit
+            if dominant_colors is None:
+                # 失敗時のグレーは一時的な代替なので永続キャッシュには残さない（次回再分析する）
+                failures += 1
+            elif self.cache is not None:
+                entries.append((content_hashes[str(png_file)], self.analysis_params(),
+                                dominant_colors, suit, self.cache.path_key(png_file)))
+            self._report_progress(done, total)
+        print()
+        if failures:
+            print(f"警告: {failures}個のアイコンを分析できなかったためグレーとして扱いました")
+        
+        if entries:
+            self.cache.put_many(entries)
+    
+    def _report_progress(self, done: int, total: int):
+        """進捗を1行で表示"""
+        percent = done * 100 // total
+        bar = "#" * (percent // 5)
+        print(f"\r色分析中: [{bar:<20s}] {done}/{total} ({percent}%)", end="", flush=True)
+    
+    def scan_architecture_icons(self):
+        """Architecture-Iconsフォルダをスキャンしてアイコンを収集"""
+        print("Architecture-Iconsフォルダをスキャン中...")
+        
+        icon_files = self.collect_icon_files()
+        print(f"\n{len(icon_files)}個のアイコンを{self.workers}プロセスで分析します")
+        
+        # アイコンの色を分析してスートを決定
+        suits = self.analyze_icons([png_file for _, png_file in icon_files])
+        
+        for (category_name, png_file), suit in zip(icon_files, suits):
+            card_data = {
+                'service_name': self.extract_service_name(png_file.name),
+                'category': category_name,
+                'suit': suit,
+                'icon_path': str(png_file.relative_to(self.base_path.parent)),
+                'filename': png_file.name
+            }
             
-            for png_file in png_files:
-                service_name = self.extract_service_name(png_file.name)
-                
-                # アイコンの色を分析してスートを決定
-                suit = self.analyze_icon_color(png_file)
-                
-                card_data = {
-                    'service_name': service_name,
-                    'category': category_name,
-                    'suit': suit,
-                    'icon_path': str(png_file.relative_to(self.base_path.parent)),
-                    'filename': png_file.name
-                }
-                
-                self.cards.append(card_data)
+            self.cards.append(card_data)
     
     def assign_ranks(self):
         """カードにランクを割り当て"""
@@ -301,6 +551,82 @@ class ColorBasedCardGenerator:
                 rank_index = i % len(self.ranks)
                 card['rank'] = self.ranks[rank_index]
     
+    def update_csv_incrementally(self, csv_path: str = "cards.csv") -> Dict[str, object]:
+        """既存のCSVとアイコンを比較し、変更のあった行だけを追加・修正する
+        
+        生成する列（サービス名・カテゴリ・スート・ファイル名）のどれかが変わった行を変更とする。
+        既存行のランクは維持し、新規・スート変更のカードにはそのスート内で
+        最も枚数の少ないランクを割り当てる。戻り値は変更レポート（変更した列は changed_columns）。
+        """
+        if not os.path.exists(csv_path):
+            print(f"{csv_path} が見つからないため全体を生成します")
+            self.assign_ranks()
+            self.generate_csv(csv_path)
+            return {'added': [card['icon_path'] for card in self.cards],
+                    'changed': [], 'removed': [], 'unchanged': [], 'changed_columns': {}}
+        
+        print(f"\n差分を計算中: {csv_path}")
+        with open(csv_path, 'r', encoding='utf-8') as csvfile:
+            existing_rows = list(csv.DictReader(csvfile))
+        
+        scanned = {card['icon_path']: card for card in self.cards}
+        existing_paths = {row['icon_path'] for row in existing_rows}
+        report = {'added': [], 'changed': [], 'removed': [], 'unchanged': [], 'changed_columns': {}}
+        
+        # 既存行は生成した値で更新し、スートが変わらない行のランクはそのまま残して使用数を数える
+        rank_counts = {}
+        rows = []
+        for row in existing_rows:
+            card = scanned.get(row['icon_path'])
+            if card is None:
+                report['removed'].append(row['icon_path'])
+                continue
+            changed_columns = [column for column in self.GENERATED_COLUMNS if row[column] != card[column]]
+            if changed_columns:
+                report['changed'].append(row['icon_path'])
+                report['changed_columns'][row['icon_path']] = changed_columns
+                if 'suit' in changed_columns:
+                    row['rank'] = None
+                row.update((column, card[column]) for column in changed_columns)
+            else:
+                report['unchanged'].append(row['icon_path'])
+            if row['rank']:
+                counts = rank_counts.setdefault(row['suit'], Counter())
+                counts[row['rank']] += 1
+            rows.append(row)
+        
+        new_rows = [dict(card) for card in self.cards if card['icon_path'] not in existing_paths]
+        report['added'] = [row['icon_path'] for row in new_rows]
+        rows.extend(new_rows)
+        
+        # スート変更・新規の行に安定したランクを割り当て
+        for row in rows:
+            if row.get('rank'):
+                continue
+            counts = rank_counts.setdefault(row['suit'], Counter())
+            row['rank'] = min(self.ranks, key=lambda rank: (counts[rank], self.ranks.index(rank)))
+            counts[row['rank']] += 1
+        
+        self.cards = rows
+        if report['added'] or report['changed'] or report['removed']:
+            self.generate_csv(csv_path)
+        else:
+            print("変更はありません。CSVは書き換えません")
+        
+        self.print_change_report(report)
+        return report
+    
+    def print_change_report(self, report: Dict[str, object]):
+        """変更レポートを表示"""
+        print("\n=== 変更レポート ===")
+        labels = {'added': '追加', 'changed': '変更', 'removed': '削除'}
+        for key, label in labels.items():
+            print(f"{label}: {len(report[key])}枚")
+            for icon_path in report[key]:
+                columns = report['changed_columns'].get(icon_path) if key == 'changed' else None
+                print(f"  {icon_path}" + (f" ({', '.join(columns)})" if columns else ""))
+        print(f"変更なし: {len(report['unchanged'])}枚")
+    
     def generate_csv(self, output_file: str = "cards.csv"):
         """CSVファイルを生成"""
         print(f"\nCSVファイルを生成中: {output_file}")
@@ -313,6 +639,11 @@ class ColorBasedCardGenerator:
             for card in self.cards:
                 writer.writerow(card)
         
+        # 起動高速化用のバイナリカタログも出力
+        catalog_path = catalog_path_for(output_file)
+        write_catalog(self.cards, catalog_path, source_csv=output_file)
+        print(f"バイナリカタログを生成しました: {catalog_path}")
+        
         print(f"完了: {len(self.cards)}枚のカードを生成しました")
     
     def print_statistics(self):
@@ -361,23 +692,103 @@ class ColorBasedCardGenerator:
             for suit, count in sorted(suit_dist.items()):
                 print(f"    {suit}: {count}枚")
     
-    def run(self):
+    def compare_with_csv(self, csv_path: str = "cards.csv") -> List[Tuple[str, str, str]]:
+        """既存のCSVとスート判定を比較し、差分 (icon_path, 既存, 新規) を返す"""
+        with open(csv_path, 'r', encoding='utf-8') as csvfile:
+            existing = {row['icon_path']: row['suit'] for row in csv.DictReader(csvfile)}
+        
+        mismatches = []
+        for card in self.cards:
+            old_suit = existing.get(card['icon_path'])
+            if old_suit is not None and old_suit != card['suit']:
+                mismatches.append((card['icon_path'], old_suit, card['suit']))
+        
+        print(f"\n=== スート比較 ({self.mode} vs {csv_path}) ===")
+        for icon_path, old_suit, new_suit in mismatches:
+            print(f"  {icon_path}: {old_suit} -> {new_suit}")
+        print(f"不一致: {len(mismatches)}枚 / {len(self.cards)}枚")
+        return mismatches
+    
+    def run(self, check_only: bool = False, incremental: bool = False, report_path: str = None):
         """メイン処理を実行"""
         self.scan_architecture_icons()
-        self.assign_ranks()
-        self.generate_csv()
+        if check_only:
+            self.compare_with_csv()
+            return
+        if incremental:
+            report = self.update_csv_incrementally()
+            if report_path:
+                with open(report_path, 'w', encoding='utf-8') as f:
+                    json.dump(report, f, indent=2, ensure_ascii=False)
+        else:
+            self.assign_ranks()
+            self.generate_csv()
         self.print_statistics()
 
+# ワーカープロセスごとのジェネレーター
+_worker_generator: Optional[ColorBasedCardGenerator] = None
+
+def _init_worker(base_path: str, mode: str):
+    """ワーカープロセスの初期化"""
+    global _worker_generator
+    _worker_generator = ColorBasedCardGenerator(base_path, mode=mode, workers=1)
+
+def _analyze_worker(image_path: Path) -> Tuple[Optional[List[Tuple[int, int, int]]], str]:
+    """ワーカープロセスでアイコン1枚を分析"""
+    return _worker_generator.analyze_icon(image_path)
+
 def main():
     """メイン関数"""
+    parser = argparse.ArgumentParser(description="色分析ベースAWSカードジェネレーター")
+    parser.add_argument("--mode", choices=ColorBasedCardGenerator.MODES, default="kmeans",
+                        help="主要色の抽出方式（既定: kmeans）")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="色分析に使うプロセス数（既定: CPUコア数）")
+    parser.add_argument("--check", action="store_true",
+                        help="cards.csvを書き換えずに既存のスート判定と比較する")
+    parser.add_argument("--incremental", action="store_true",
+                        help="既存のcards.csvとの差分だけを追加・修正する（既存行のランクを維持）")
+    parser.add_argument("--report", default=None, metavar="JSON",
+                        help="--incremental の変更レポートをJSONで書き出す")
+    parser.add_argument("--cache", default=None,
+                        help="永続色分析キャッシュのパス（既定: .color_cache.sqlite）")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="永続キャッシュを使わずに全アイコンを分析する")
+    parser.add_argument("--cache-stats", action="store_true",
+                        help="キャッシュ統計を表示して終了する")
+    parser.add_argument("--invalidate", nargs="*", metavar="PNG", default=None,
+                        help="指定アイコン（省略時は全件）のキャッシュを無効化して終了する")
+    parser.add_argument("--prune", action="store_true",
+                        help="削除されたアイコンのキャッシュを消して終了する")
+    args = parser.parse_args()
+    if args.no_cache and (args.cache_stats or args.invalidate is not None or args.prune):
+        parser.error("--cache-stats, --invalidate, --prune は --no-cache と同時に指定できません")
+    
+    cache = None if args.no_cache else ColorAnalysisCache(args.cache)
+    if cache is not None and (args.cache_stats or args.invalidate is not None or args.prune):
+        if args.invalidate is not None:
+            deleted = cache.invalidate([Path(p) for p in args.invalidate] or None)
+            print(f"キャッシュを無効化しました: {deleted}件")
+        if args.prune:
+            print(f"削除されたアイコンのキャッシュを消しました: {cache.prune()}件")
+        if args.cache_stats:
+            cache.print_stats()
+        cache.close()
+        return
+    
     print("色分析ベースAWSカードジェネレーター")
     print("=" * 50)
     print("アイコンの実際の色を分析してスートを決定します...")
-    print("処理には時間がかかる場合があります。")
+    print(f"色抽出モード: {args.mode}")
     print()
     
-    generator = ColorBasedCardGenerator()
-    generator.run()
+    generator = ColorBasedCardGenerator(mode=args.mode, workers=args.workers, cache=cache)
+    generator.run(check_only=args.check, incremental=args.incremental, report_path=args.report)
+    if cache is not None:
+        cache.print_stats()
+        cache.close()
+    if args.check:
+        return
     
     print("\n色分析ベースのカード生成完了！")
     print("新しいcards.csvファイルが作成されました。")
@@ -3,19 +3,41 @@
 AWSポーカーゲーム用の音楽を生成するスクリプト
 """
 
+import argparse
 import numpy as np
 import os
 import wave
 import math
 from pathlib import Path
+from typing import Tuple
 
 class MusicGenerator:
     """音楽生成クラス"""
     
+    # 位相テーブル（1周期分の波形）の分解能
+    TABLE_SIZE = 4096
+    WAVE_TYPES = ['sine', 'square', 'triangle']
+    
+    # 音符イベント（開始フレーム、長さ、周波数、音量、波形ID）
+    EVENT_DTYPE = np.dtype([('start', np.int64), ('frames', np.int64), ('freq', np.float64),
+                            ('volume', np.float32), ('wave', np.int8)])
+    
     def __init__(self, sample_rate=44100):
         self.sample_rate = sample_rate
         self.duration = 0
         self.audio_data = []
+        self.wave_tables = self._build_wave_tables()
+    
+    def _build_wave_tables(self) -> np.ndarray:
+        """波形ごとの位相テーブルを事前計算（補間用に末尾へ先頭の値を追加）"""
+        phase = 2 * np.pi * np.arange(self.TABLE_SIZE + 1) / self.TABLE_SIZE
+        sine = np.sin(phase)
+        tables = {
+            'sine': sine,
+            'square': np.sign(sine),
+            'triangle': 2 * np.arcsin(sine) / np.pi,
+        }
+        return np.array([tables[name] for name in self.WAVE_TYPES], dtype=np.float32)
     
     def note_frequency(self, note, octave=4):
         """音符から周波数を計算"""
@@ -74,8 +96,8 @@ class MusicGenerator:
         
         return chord_data
     
-    def create_aws_poker_music(self):
-        """AWSポーカー用のループ音楽を作成"""
+    def bgm_score(self):
+        """BGMの楽譜（1拍の長さ、メロディー、ベース、和音）"""
         # テンポとビート
         bpm = 120
         beat_duration = 60 / bpm  # 1拍の長さ（秒）
@@ -138,68 +160,124 @@ class MusicGenerator:
             (['G', 'B', 'D'], [4, 4, 5], 4),
         ]
         
-        # 音楽データを生成
+        return beat_duration, melody_sequence, bass_sequence, chord_sequence
+    
+    def build_bgm_events(self, loops: int = 1) -> Tuple[np.ndarray, int]:
+        """BGMの全音符をイベント配列（開始フレーム・長さ・周波数・音量・波形）と曲全体のフレーム数に変換"""
+        beat_duration, melody_sequence, bass_sequence, chord_sequence = self.bgm_score()
         total_duration = sum(beats * beat_duration for _, _, beats in melody_sequence)
-        total_frames = int(total_duration * self.sample_rate)
+        song_frames = int(total_duration * self.sample_rate)
         
-        # 各パートを生成
-        melody_data = np.zeros(total_frames)
-        bass_data = np.zeros(total_frames)
-        chord_data = np.zeros(total_frames)
+        notes = []
         
-        # メロディー生成
-        current_time = 0
-        for note, octave, beats in melody_sequence:
-            duration = beats * beat_duration
-            freq = self.note_frequency(note, octave)
-            tone = self.generate_tone(freq, duration, volume=0.4, wave_type='sine')
-            
-            start_frame = int(current_time * self.sample_rate)
-            end_frame = start_frame + len(tone)
-            
-            if end_frame <= len(melody_data):
-                melody_data[start_frame:end_frame] += tone
-            
-            current_time += duration
+        def add_part(sequence):
+            current_time = 0
+            for chord_notes, octaves, beats, volume in sequence:
+                duration = beats * beat_duration
+                start_frame = int(current_time * self.sample_rate)
+                frames = int(duration * self.sample_rate)
+                # 曲の長さを超える音符は従来どおり捨てる
+                if start_frame + frames <= song_frames:
+                    for note, octave in zip(chord_notes, octaves):
+                        freq = self.note_frequency(note, octave)
+                        if freq > 0:
+                            notes.append((start_frame, frames, freq, volume / len(chord_notes), 'sine'))
+                current_time += duration
         
-        # ベース生成
-        current_time = 0
-        for note, octave, beats in bass_sequence:
-            duration = beats * beat_duration
-            freq = self.note_frequency(note, octave)
-            tone = self.generate_tone(freq, duration, volume=0.3, wave_type='sine')
-            
-            start_frame = int(current_time * self.sample_rate)
-            end_frame = start_frame + len(tone)
-            
-            if end_frame <= len(bass_data):
-                bass_data[start_frame:end_frame] += tone
-            
-            current_time += duration
+        add_part([([note], [octave], beats, 0.4) for note, octave, beats in melody_sequence])
+        add_part([([note], [octave], beats, 0.3) for note, octave, beats in bass_sequence])
+        add_part([(chord_notes, octaves, beats, 0.15) for chord_notes, octaves, beats in chord_sequence])
         
-        # 和音生成
-        current_time = 0
-        for notes, octaves, beats in chord_sequence:
-            duration = beats * beat_duration
-            chord = self.generate_chord(notes, octaves, duration, volume=0.15)
-            
-            start_frame = int(current_time * self.sample_rate)
-            end_frame = start_frame + len(chord)
-            
-            if end_frame <= len(chord_data):
-                chord_data[start_frame:end_frame] += chord
-            
-            current_time += duration
+        events = np.array(
+            [(start + loop * song_frames, frames, freq, volume, self.WAVE_TYPES.index(wave_type))
+             for loop in range(loops) for start, frames, freq, volume, wave_type in notes],
+            dtype=self.EVENT_DTYPE
+        )
+        events.sort(order='start')
+        return events, song_frames * loops
+    
+    def synthesize_notes(self, notes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """複数の音符を1回のベクトル演算で合成し、連結バッファと各音符の開始位置を返す"""
+        counts = notes['frames']
+        offsets = np.cumsum(counts) - counts
+        total = int(counts.sum())
+        
+        # 音符内のローカルフレーム番号
+        local = np.arange(total, dtype=np.int64) - np.repeat(offsets, counts)
         
-        # 全パートをミックス
-        mixed_audio = melody_data + bass_data + chord_data
+        # 位相テーブルを線形補間で参照（テーブル長は2の冪なのでビットマスクで周期化）
+        step = notes['freq'] * self.TABLE_SIZE / self.sample_rate
+        phase = local * np.repeat(step, counts)
+        table_index = phase.astype(np.int64)
+        frac = (phase - table_index).astype(np.float32)
+        table_index &= self.TABLE_SIZE - 1
+        table_index += np.repeat(notes['wave'].astype(np.int64) * (self.TABLE_SIZE + 1), counts)
+        
+        flat_tables = self.wave_tables.ravel()
+        buffer = flat_tables[table_index]
+        buffer += frac * (flat_tables[table_index + 1] - buffer)
+        buffer *= np.repeat(notes['volume'], counts)
+        
+        # エンベロープ（50msのフェードイン・フェードアウト）は両端のサンプルだけに掛ける
+        fade_frames = int(0.05 * self.sample_rate)
+        fading = counts > fade_frames * 2
+        if fading.any():
+            ramp = np.linspace(0, 1, fade_frames, dtype=np.float32)
+            heads = offsets[fading][:, None] + np.arange(fade_frames)
+            tails = (offsets + counts)[fading][:, None] - 1 - np.arange(fade_frames)
+            buffer[heads] *= ramp
+            buffer[tails] *= ramp
+        
+        return buffer, offsets
+    
+    def build_note_bank(self, events: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """同じ音符（長さ・周波数・音量・波形）を1度だけ合成したノートバンクを作成"""
+        keys = events[['frames', 'freq', 'volume', 'wave']]
+        unique_notes, event_to_note = np.unique(keys, return_inverse=True)
+        buffer, offsets = self.synthesize_notes(unique_notes)
+        return buffer, offsets[event_to_note.ravel()], events['frames']
+    
+    def render_events(self, events: np.ndarray, start: int, out: np.ndarray, bank=None):
+        """区間 [start, start+len(out)) に掛かる音符をノートバンクからoutへ加算（オーバーラップアド）"""
+        if bank is None:
+            bank = self.build_note_bank(events)
+        buffer, note_offsets, note_frames = bank
+        stop = start + len(out)
+        
+        # 開始順にソート済みなので区間に掛かりうる音符を二分探索で絞り込む
+        last = np.searchsorted(events['start'], stop)
+        for i in np.nonzero(events['start'][:last] + note_frames[:last] > start)[0]:
+            note_start = int(events['start'][i])
+            begin = max(start, note_start)
+            end = min(stop, note_start + int(note_frames[i]))
+            source = int(note_offsets[i]) + begin - note_start
+            out[begin - start:end - start] += buffer[source:source + end - begin]
+    
+    def iter_rendered_chunks(self, events: np.ndarray, total_frames: int, chunk_frames: int = 65536):
+        """音符イベントを固定長ブロックごとに合成して返す（バッファは使い回す）"""
+        bank = self.build_note_bank(events)
+        block = np.zeros(chunk_frames, dtype=np.float32)
+        for start in range(0, total_frames, chunk_frames):
+            out = block[:min(chunk_frames, total_frames - start)]
+            out.fill(0.0)
+            self.render_events(events, start, out, bank)
+            yield start, out
+    
+    def render(self, events: np.ndarray, total_frames: int) -> np.ndarray:
+        """音符イベントを事前確保した1本のfloat32バッファに合成して正規化"""
+        audio = np.zeros(total_frames, dtype=np.float32)
+        self.render_events(events, 0, audio)
         
         # 音量を正規化
-        max_amplitude = np.max(np.abs(mixed_audio))
+        max_amplitude = np.max(np.abs(audio)) if total_frames else 0.0
         if max_amplitude > 0:
-            mixed_audio = mixed_audio / max_amplitude * 0.8
-        
-        return mixed_audio
+            audio *= 0.8 / max_amplitude
+        return audio
+    
+    def create_aws_poker_music(self, loops: int = 1):
+        """AWSポーカー用のループ音楽を作成"""
+        events, total_frames = self.build_bgm_events(loops)
+        return self.render(events, total_frames)
     
     def create_sound_effects(self):
         """効果音を生成"""
@@ -253,19 +331,52 @@ class MusicGenerator:
             wav_file.setsampwidth(2)  # 16ビット
             wav_file.setframerate(self.sample_rate)
             wav_file.writeframes(audio_int16.tobytes())
+    
+    def save_wav_streaming(self, events: np.ndarray, total_frames: int, filename: str,
+                           chunk_frames: int = 65536):
+        """音符イベントをブロック単位で合成しながらWAVへ書き出す（メモリ使用量はブロック長で一定）"""
+        # 1パス目: 正規化のためのピーク値を求める
+        max_amplitude = 0.0
+        for _, block in self.iter_rendered_chunks(events, total_frames, chunk_frames):
+            max_amplitude = max(max_amplitude, float(np.max(np.abs(block))))
+        gain = 0.8 / max_amplitude if max_amplitude > 0 else 0.0
+        
+        # 2パス目: 正規化した16ビットPCMを順に書き込む
+        pcm = np.empty(chunk_frames, dtype=np.int16)
+        with wave.open(filename, 'w') as wav_file:
+            wav_file.setnchannels(1)  # モノラル
+            wav_file.setsampwidth(2)  # 16ビット
+            wav_file.setframerate(self.sample_rate)
+            for _, block in self.iter_rendered_chunks(events, total_frames, chunk_frames):
+                block *= gain * 32767
+                out = pcm[:len(block)]
+                np.copyto(out, block, casting='unsafe')
+                wav_file.writeframes(out.tobytes())
 
 def main():
     """メイン関数"""
+    parser = argparse.ArgumentParser(description="AWSポーカー用音楽ジェネレーター")
+    parser.add_argument("--sample-rate", type=int, default=44100, help="サンプリングレート（既定: 44100）")
+    parser.add_argument("--loops", type=int, default=1, help="BGMを繰り返す回数（既定: 1）")
+    parser.add_argument("--stream", action="store_true",
+                        help="BGMをブロック単位で合成しながら書き出す（長尺・高サンプルレート向け）")
+    parser.add_argument("--chunk-frames", type=int, default=65536, help="ストリーミング時のブロック長")
+    args = parser.parse_args()
+    
     print("AWSポーカー用音楽を生成中...")
     
-    generator = MusicGenerator()
+    generator = MusicGenerator(sample_rate=args.sample_rate)
     sounds_dir = Path(os.path.join(os.path.dirname(__file__), "sounds"))
     
     # BGM生成
     print("BGMを生成中...")
-    bgm_data = generator.create_aws_poker_music()
     bgm_path = sounds_dir / "aws_poker_bgm.wav"
-    generator.save_wav(bgm_data, str(bgm_path))
+    if args.stream:
+        events, total_frames = generator.build_bgm_events(args.loops)
+        generator.save_wav_streaming(events, total_frames, str(bgm_path), args.chunk_frames)
+    else:
+        bgm_data = generator.create_aws_poker_music(args.loops)
+        generator.save_wav(bgm_data, str(bgm_path))
     print(f"BGMを保存しました: {bgm_path}")
     
     # 効果音生成
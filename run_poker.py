@@ -3,6 +3,7 @@
 AWSポーカーゲームの起動スクリプト
 """
 
+import argparse
 import sys
 import os
 
@@ -11,8 +12,40 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from aws_poker.poker_game import PokerGame
 
+def parse_args():
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description="AWSポーカーゲーム")
+    parser.add_argument("--profile", action="store_true",
+                        help="起動と操作列によるゲームプレイを計測してプロファイルを出力")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="計測するフレーム数（既定: 600）")
+    parser.add_argument("--seconds", type=float, default=None,
+                        help="計測する秒数（--framesと併用時は先に達した方で終了）")
+    parser.add_argument("--profile-dir", default="profile",
+                        help="プロファイルの出力先ディレクトリ")
+    parser.add_argument("--renderer", choices=["software", "texture"], default="software",
+                        help="描画バックエンド（texture: SDL2 Rendererでカードをテクスチャ合成）")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="ウィンドウの拡大率（textureのみ、描画はレンダラー側で拡大）")
+    return parser.parse_args()
+
+def run_profile(args):
+    """プロファイル計測モード"""
+    from aws_poker.profiling import profile_game
+    
+    print("プロファイル計測中...")
+    json_path, report_path = profile_game(args.profile_dir, frames=args.frames, seconds=args.seconds,
+                                          renderer=args.renderer, scale=args.scale)
+    print(f"speedscope: {json_path}")
+    print(f"レポート: {report_path}")
+
 def main():
     """メイン関数"""
+    args = parse_args()
+    if args.profile:
+        run_profile(args)
+        return
+    
     print("AWS Poker - AWSアイコンポーカーゲーム")
     print("=" * 50)
     print("ゲームルール:")
@@ -30,7 +63,7 @@ def main():
     print("=" * 50)
     
     try:
-        game = PokerGame()
+        game = PokerGame(renderer=args.renderer, scale=args.scale)
         game.run()
     except Exception as e:
         print(f"ゲーム実行エラー: {e}")
@@ -0,0 +1,89 @@
+"""Tests for the binary card catalog."""
+
+import os
+import shutil
+
+import pytest
+
+from aws_poker.catalog import (
+    CardCatalog,
+    catalog_path_for,
+    load_catalog,
+    read_csv_rows,
+    write_catalog,
+)
+
+CARDS_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cards.csv")
+
+
+@pytest.fixture
+def csv_copy(tmp_path):
+    """Copy cards.csv into a temporary directory."""
+    path = tmp_path / "cards.csv"
+    shutil.copy(CARDS_CSV, path)
+    return str(path)
+
+
+def test_binary_round_trip(csv_copy):
+    """Test that the binary catalog reproduces every CSV row."""
+    rows = read_csv_rows(csv_copy)
+    write_catalog(rows, catalog_path_for(csv_copy), source_csv=csv_copy)
+
+    with load_catalog(csv_copy) as catalog:
+        assert catalog.source == "binary"
+        assert list(catalog.rows()) == rows
+        assert catalog.row(5) == rows[5]
+        assert [catalog.ranks[i] for i in catalog.rank_ids] == [row["rank"] for row in rows]
+
+    csv_catalog = CardCatalog.from_rows(rows)
+    assert csv_catalog.suit_ids == catalog.suit_ids
+    assert csv_catalog.category_ids == catalog.category_ids
+
+
+def test_freshness_check_hashes_only_when_mtime_changes(csv_copy, monkeypatch):
+    """Test that an unchanged CSV is not hashed and a touched but identical CSV is still fresh."""
+    import aws_poker.catalog as catalog_module
+
+    rows = read_csv_rows(csv_copy)
+    write_catalog(rows, catalog_path_for(csv_copy), source_csv=csv_copy)
+    hashed = []
+    digest = catalog_module.file_digest
+    monkeypatch.setattr(catalog_module, "file_digest", lambda path: hashed.append(path) or digest(path))
+
+    with load_catalog(csv_copy) as catalog:
+        assert catalog.source == "binary"
+        assert list(catalog.records())[5] == tuple(rows[5].values())
+    assert hashed == []
+
+    stat = os.stat(csv_copy)
+    os.utime(csv_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    with load_catalog(csv_copy) as catalog:
+        assert catalog.source == "binary"
+    assert hashed == [csv_copy]
+
+    # 内容が同じならバイナリは書き換えない
+    with open(catalog_path_for(csv_copy), 'rb') as f:
+        before = f.read()
+    with load_catalog(csv_copy) as catalog:
+        assert catalog.source == "binary"
+    with open(catalog_path_for(csv_copy), 'rb') as f:
+        assert f.read() == before
+
+
+def test_falls_back_to_csv(csv_copy):
+    """Test that the CSV is used and the binary (re)built when it is missing or stale."""
+    assert load_catalog(csv_copy).source == "csv"
+    with load_catalog(csv_copy) as catalog:
+        assert catalog.source == "binary"
+
+    rows = read_csv_rows(csv_copy)
+    write_catalog(rows, catalog_path_for(csv_copy), source_csv=csv_copy)
+    with open(csv_copy, "a", encoding="utf-8") as f:
+        f.write(",".join(["New Service", "Compute", "Orange", "A", "x.png", "x.png"]) + "\n")
+
+    catalog = load_catalog(csv_copy)
+    assert catalog.source == "csv"
+    assert len(catalog) == len(rows) + 1
+    with load_catalog(csv_copy) as catalog:
+        assert catalog.source == "binary"
+        assert len(catalog) == len(rows) + 1
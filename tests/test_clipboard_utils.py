@@ -0,0 +1,66 @@
+"""Tests for the clipboard utilities."""
+
+import sys
+
+import pygame
+import pytest
+
+from aws_poker import clipboard_utils
+from aws_poker.clipboard_utils import CLIPBOARD_EVENT, ClipboardManager, ClipboardService
+
+
+@pytest.fixture
+def fake_backend(monkeypatch):
+    """Replace the clipboard commands with portable Python one-liners."""
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    monkeypatch.setattr(ClipboardManager, "_backend", (
+        [sys.executable, "-c", "import sys; sys.stdin.read()"],
+        [sys.executable, "-c", "print('CLOUD-QUEUE-1234', end='')"],
+    ))
+    pygame.display.init()
+    service = ClipboardService()
+    yield service
+    service.shutdown()
+    pygame.display.quit()
+
+
+def wait_for_clipboard_event():
+    """Wait for the next clipboard completion event."""
+    for _ in range(200):
+        for event in pygame.event.get(CLIPBOARD_EVENT):
+            return event
+        pygame.time.wait(10)
+    raise AssertionError("clipboard event not received")
+
+
+def test_copy_runs_in_background(fake_backend):
+    """Test that copy completes on the worker and posts an event."""
+    fake_backend.copy_async("CLOUD-QUEUE-1234")
+
+    event = wait_for_clipboard_event()
+    assert event.action == "copy"
+    assert event.success is True
+    assert event.text == "CLOUD-QUEUE-1234"
+
+
+def test_paste_runs_in_background(fake_backend):
+    """Test that paste completes on the worker and posts the text."""
+    fake_backend.paste_async()
+
+    event = wait_for_clipboard_event()
+    assert event.action == "paste"
+    assert event.success is True
+    assert event.text == "CLOUD-QUEUE-1234"
+
+
+def test_backend_detected_once(monkeypatch):
+    """Test that the backend lookup is cached per process."""
+    calls = []
+    monkeypatch.setattr(ClipboardManager, "_backend", clipboard_utils._UNDETECTED)
+    monkeypatch.setattr(clipboard_utils.shutil, "which", lambda name: calls.append(name))
+
+    ClipboardManager.get_backend()
+    probes = len(calls)
+    ClipboardManager.get_backend()
+
+    assert len(calls) == probes
@@ -0,0 +1,187 @@
+"""Tests for the color-based card generator (color analysis, cache and incremental CSV updates)."""
+
+import csv
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+np = pytest.importorskip("numpy")
+
+from create_color_based_cards import ColorAnalysisCache, ColorBasedCardGenerator  # noqa: E402
+
+GREEN = (0, 160, 0)
+BLUE = (50, 80, 230)
+
+
+def write_icon(path, color):
+    """Write a 48px icon with a colored square on a transparent background."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image = Image.new('RGBA', (48, 48), (0, 0, 0, 0))
+    image.paste((*color, 255), (8, 8, 40, 40))
+    image.save(path)
+    return path
+
+
+def write_noisy_icon(path):
+    """Write an RGB icon with random colors plus white and black borders, including threshold values."""
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, size=(48, 48, 3), dtype=np.uint8)
+    pixels[:6] = 255
+    pixels[-6:] = 0
+    pixels[6, :4] = [(230, 231, 231), (231, 231, 231), (19, 19, 19), (20, 19, 19)]
+    Image.fromarray(pixels).save(path)
+    return path
+
+
+def test_vectorized_filter_matches_per_pixel_loop(tmp_path):
+    """Test that the mask-based background filter keeps exactly the pixels of the original loop."""
+    icon = write_noisy_icon(tmp_path / "noisy.png")
+    generator = ColorBasedCardGenerator(str(tmp_path), mode='histogram', workers=1)
+    pixels = generator._load_foreground_pixels(icon)
+
+    # 以前の実装（1ピクセルずつ判定するループ）
+    with Image.open(icon) as img:
+        expected = [pixel for pixel in np.array(img.convert('RGB').resize((96, 96))).reshape(-1, 3)
+                    if not (pixel[0] > 230 and pixel[1] > 230 and pixel[2] > 230)
+                    and not (pixel[0] < 20 and pixel[1] < 20 and pixel[2] < 20)]
+    assert 10 < len(expected) < 96 * 96
+    np.testing.assert_array_equal(pixels, np.array(expected))
+
+
+@pytest.mark.parametrize("mode", ColorBasedCardGenerator.MODES)
+def test_each_mode_returns_valid_colors_and_suit(tmp_path, mode):
+    """Test that every extraction mode returns up to five RGB colors and the expected suit."""
+    if mode != 'histogram':
+        pytest.importorskip("sklearn")
+    generator = ColorBasedCardGenerator(str(tmp_path), mode=mode, workers=1)
+    for path, color, suit in [(tmp_path / "green.png", GREEN, 'Green'), (tmp_path / "blue.png", BLUE, 'Blue')]:
+        colors, result = generator.analyze_icon(write_icon(path, color))
+        assert 1 <= len(colors) <= 5
+        assert all(len(c) == 3 and all(isinstance(v, int) and 0 <= v <= 255 for v in c) for c in colors)
+        assert result == suit
+
+    colors, result = generator.analyze_icon(write_noisy_icon(tmp_path / "noisy.png"))
+    assert 1 <= len(colors) <= 5
+    assert result in generator.color_to_suit
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Open a cache in a temporary directory."""
+    cache = ColorAnalysisCache(str(tmp_path / "cache.sqlite"))
+    yield cache
+    cache.close()
+
+
+def make_generator(tmp_path, cache):
+    """Create a single-process histogram generator for the temporary icon tree."""
+    return ColorBasedCardGenerator(str(tmp_path / "icons"), mode='histogram', workers=1, cache=cache)
+
+
+def test_cache_hit_and_miss_after_parameter_change(tmp_path, cache, monkeypatch):
+    """Test that unchanged icons are served from the cache until the parameters change."""
+    icons = [write_icon(tmp_path / "icons" / "a.png", GREEN), write_icon(tmp_path / "icons" / "b.png", BLUE)]
+    assert make_generator(tmp_path, cache).analyze_icons(icons) == ['Green', 'Blue']
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    assert make_generator(tmp_path, cache).analyze_icons(icons) == ['Green', 'Blue']
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    monkeypatch.setattr(ColorBasedCardGenerator, 'ANALYSIS_VERSION', ColorBasedCardGenerator.ANALYSIS_VERSION + 1)
+    make_generator(tmp_path, cache).analyze_icons(icons)
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert cache.stats()['entries'] == 4
+
+
+def test_failed_analysis_is_not_cached(tmp_path, cache):
+    """Test that an unreadable icon is treated as Gray for this run only."""
+    broken = tmp_path / "icons" / "broken.png"
+    broken.parent.mkdir(parents=True)
+    broken.write_bytes(b"not a png")
+    assert make_generator(tmp_path, cache).analyze_icons([broken]) == ['Gray']
+    assert cache.stats()['entries'] == 0
+
+
+def test_invalidate_and_prune(tmp_path, cache):
+    """Test invalidation by content, by the path of a deleted icon, and pruning deleted icons."""
+    # 内容ハッシュがキーなので、アイコンごとに少しずつ色を変える
+    icons = [write_icon(tmp_path / "icons" / f"{name}.png", (0, 160 - i * 10, 0))
+             for i, name in enumerate("abcd")]
+    make_generator(tmp_path, cache).analyze_icons(icons)
+    assert cache.stats()['entries'] == 4
+
+    assert cache.invalidate([icons[2]]) == 1
+    icons[0].unlink()
+    assert cache.invalidate([icons[0]]) == 1
+    icons[1].unlink()
+    assert cache.prune() == 1
+    assert cache.prune() == 0
+    assert cache.stats()['entries'] == 1
+    assert cache.invalidate() == 1
+
+
+def write_tree(tmp_path, icons):
+    """Write an icon tree: {(category, service): color} -> Arch_<category>/48/Arch_<service>_48.png."""
+    for (category, service), color in icons.items():
+        write_icon(tmp_path / "icons" / f"Arch_{category}" / "48" / f"Arch_{service}_48.png", color)
+
+
+def regenerate(tmp_path):
+    """Scan the icon tree, update cards.csv incrementally and return (report, {service: row})."""
+    generator = ColorBasedCardGenerator(str(tmp_path / "icons"), mode='histogram', workers=1)
+    generator.scan_architecture_icons()
+    csv_path = tmp_path / "cards.csv"
+    report = generator.update_csv_incrementally(str(csv_path))
+    with open(csv_path, encoding='utf-8') as f:
+        return report, {row['service_name']: row for row in csv.DictReader(f)}
+
+
+def test_incremental_update_keeps_ranks_stable(tmp_path):
+    """Test added, removed and suit-changed icons against the existing ranks."""
+    write_tree(tmp_path, {('Compute', 'A1'): GREEN, ('Compute', 'A2'): GREEN, ('Compute', 'A3'): GREEN,
+                          ('Storage', 'B1'): BLUE, ('Storage', 'B2'): BLUE})
+    report, rows = regenerate(tmp_path)
+    assert len(report['added']) == 5
+    ranks = {name: row['rank'] for name, row in rows.items()}
+    assert ranks == {'A1': 'A', 'A2': '2', 'A3': '3', 'B1': 'A', 'B2': '2'}
+
+    # 追加しても既存のランクは変わらず、新規カードはスート内で未使用のランクを得る
+    write_tree(tmp_path, {('Compute', 'A0'): GREEN})
+    report, rows = regenerate(tmp_path)
+    assert report['added'] == ['icons/Arch_Compute/48/Arch_A0_48.png']
+    assert len(report['unchanged']) == 5
+    assert {name: row['rank'] for name, row in rows.items() if name != 'A0'} == ranks
+    assert rows['A0']['rank'] == '4'
+
+    # 削除したカードのランクは空き、次に追加したカードが使う
+    (tmp_path / "icons" / "Arch_Compute" / "48" / "Arch_A2_48.png").unlink()
+    report, rows = regenerate(tmp_path)
+    assert report['removed'] == ['icons/Arch_Compute/48/Arch_A2_48.png']
+    assert 'A2' not in rows
+    write_tree(tmp_path, {('Compute', 'A5'): GREEN})
+    report, rows = regenerate(tmp_path)
+    assert rows['A5']['rank'] == '2'
+
+    # スートが変わったカードは新しいスートで最も使われていないランクになる
+    write_tree(tmp_path, {('Compute', 'A3'): BLUE})
+    report, rows = regenerate(tmp_path)
+    assert report['changed'] == ['icons/Arch_Compute/48/Arch_A3_48.png']
+    assert report['changed_columns'][report['changed'][0]] == ['suit']
+    assert (rows['A3']['suit'], rows['A3']['rank']) == ('Blue', '3')
+    assert rows['A1']['rank'] == 'A' and rows['B2']['rank'] == '2'
+
+
+def test_parallel_scan_matches_serial(tmp_path):
+    """Test that analysis in a two-process pool yields the same rows, in the same order, as the serial path."""
+    colors = [GREEN, BLUE, (220, 30, 30), (240, 150, 0), (150, 40, 160), (0, 120, 0), (60, 90, 210)]
+    write_tree(tmp_path, {(category, f"S{i}"): color
+                          for i, color in enumerate(colors) for category in ("Compute", "Storage")})
+
+    def scan(workers):
+        generator = ColorBasedCardGenerator(str(tmp_path / "icons"), mode='histogram', workers=workers)
+        generator.scan_architecture_icons()
+        return generator.cards
+
+    parallel = scan(2)
+    assert len(parallel) == 2 * len(colors)
+    assert parallel == scan(1)
@@ -0,0 +1,65 @@
+"""Tests for the vectorized BGM renderer in create_music.py."""
+
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from create_music import MusicGenerator  # noqa: E402
+
+SAMPLE_RATE = 8000
+
+
+def short_events(generator):
+    """A few overlapping notes, one repeated and one running past the end of the song."""
+    return np.array([
+        (0, 1000, 440.0, 0.5, 0),
+        (500, 1500, 220.0, 0.3, 1),
+        (1000, 1000, 440.0, 0.5, 0),  # 1つ目と同じ音符（ノートバンクで共有）
+        (2500, 800, 330.0, 0.4, 2),   # 曲の終わりで切れる
+    ], dtype=generator.EVENT_DTYPE)
+
+
+def test_render_length_and_peak():
+    """Test that the one-shot render has one sample per frame, normalized to 0.8."""
+    generator = MusicGenerator(sample_rate=SAMPLE_RATE)
+    audio = generator.render(short_events(generator), 3000)
+    assert audio.dtype == np.float32
+    assert len(audio) == 3000
+    assert np.max(np.abs(audio)) == pytest.approx(0.8)
+    assert np.all(audio[2000:2500] == 0)  # どの音符も鳴っていない区間
+
+
+def test_streamed_chunks_match_one_shot_render(tmp_path):
+    """Test that chunked rendering and the streamed WAV equal the one-shot render."""
+    generator = MusicGenerator(sample_rate=SAMPLE_RATE)
+    events = short_events(generator)
+    total_frames = 3000
+
+    one_shot = np.zeros(total_frames, dtype=np.float32)
+    generator.render_events(events, 0, one_shot)
+    chunks = [(start, block.copy()) for start, block in generator.iter_rendered_chunks(events, total_frames, 700)]
+    assert [start for start, _ in chunks] == [0, 700, 1400, 2100, 2800]
+    np.testing.assert_allclose(np.concatenate([block for _, block in chunks]), one_shot, atol=1e-6)
+
+    generator.save_wav(generator.render(events, total_frames), str(tmp_path / "one_shot.wav"))
+    generator.save_wav_streaming(events, total_frames, str(tmp_path / "streamed.wav"), chunk_frames=700)
+    samples = []
+    for name in ("one_shot.wav", "streamed.wav"):
+        with wave.open(str(tmp_path / name)) as wav_file:
+            assert (wav_file.getframerate(), wav_file.getnframes()) == (SAMPLE_RATE, total_frames)
+            samples.append(np.frombuffer(wav_file.readframes(total_frames), dtype=np.int16).astype(int))
+    assert np.max(np.abs(samples[1] - samples[0])) <= 1
+    assert np.max(np.abs(samples[1])) == pytest.approx(0.8 * 32767, abs=1)
+
+
+def test_bgm_events_repeat_per_loop():
+    """Test that each loop repeats the song's events after the previous one."""
+    generator = MusicGenerator(sample_rate=SAMPLE_RATE)
+    events, total_frames = generator.build_bgm_events(1)
+    looped, looped_frames = generator.build_bgm_events(2)
+    assert looped_frames == 2 * total_frames
+    assert len(looped) == 2 * len(events)
+    assert np.all(np.diff(looped['start']) >= 0)
+    assert looped['start'].max() < looped_frames
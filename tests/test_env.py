@@ -0,0 +1,54 @@
+"""Tests for the vectorized batch environment."""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from aws_poker.catalog import read_csv_rows  # noqa: E402
+from aws_poker.env import ALL_HELD, PokerBatchEnv  # noqa: E402
+from aws_poker.hand_evaluator import HandEvaluator  # noqa: E402
+
+CARDS_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cards.csv")
+
+
+def test_scorer_matches_hand_evaluator():
+    """Test that batch scores equal HandEvaluator scores on random hands."""
+    env = PokerBatchEnv(1, csv_path=CARDS_CSV, seed=0)
+    cards = [SimpleNamespace(**row) for row in read_csv_rows(CARDS_CSV)]
+    rng = np.random.default_rng(0)
+    hands = np.array([rng.choice(len(cards), 5, replace=False) for _ in range(3000)])
+    evaluator = HandEvaluator()
+    expected = [evaluator.evaluate_hand([cards[i] for i in hand])[1] for hand in hands]
+    assert env.scorer.score(hands).tolist() == expected
+
+
+def test_draws_keep_hands_distinct():
+    """Test that held cards stay in place and hands never repeat a card."""
+    env = PokerBatchEnv(256, csv_path=CARDS_CSV, seed=1)
+    obs, _ = env.reset()
+    before = obs["cards"]
+    obs, rewards, _, _, _ = env.step(np.full(256, 0b00101))
+    after = obs["cards"]
+    assert (after[:, [0, 2]] == before[:, [0, 2]]).all()
+    assert not rewards.any()
+    assert (obs["draws_remaining"] == 1).all()
+    ordered = np.sort(after, axis=1)
+    assert (ordered[:, 1:] != ordered[:, :-1]).all()
+
+
+def test_episode_ends_after_five_stands():
+    """Test that standing every round terminates with the summed score."""
+    env = PokerBatchEnv(64, csv_path=CARDS_CSV, seed=2)
+    env.reset()
+    total = np.zeros(64, dtype=np.int64)
+    for round_number in range(1, 6):
+        obs, rewards, terminated, truncated, info = env.step(np.full(64, ALL_HELD))
+        assert (rewards > 0).all()
+        total += rewards
+        assert terminated.all() == (round_number == 5)
+        assert not truncated.any()
+    assert (info["final_score"] == total).all()
+    assert (obs["round"] == 1).all()
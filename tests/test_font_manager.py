@@ -0,0 +1,62 @@
+"""Tests for the shared font manager and the font subset build step."""
+
+import pygame
+import pytest
+
+from aws_poker import font_manager
+from aws_poker.font_manager import FONT_FILE, collect_text, game_font, get_font
+
+
+def test_fonts_are_loaded_once_and_dropped_on_quit():
+    """Test that each (path, size) is loaded once and the cache is cleared by pygame.quit."""
+    pygame.init()
+    try:
+        font = game_font(24)
+        assert game_font(24) is font
+        assert game_font(16) is not font
+        assert get_font(None, 48) is get_font(None, 48)
+        assert font_manager.font_stats()['fonts'] == 3
+    finally:
+        pygame.quit()
+    assert font_manager.font_stats()['fonts'] == 0
+
+    # 再初期化後も同じように共有される（quitの登録は毎回やり直す）
+    pygame.init()
+    try:
+        assert game_font(24) is game_font(24)
+    finally:
+        pygame.quit()
+    assert font_manager.font_stats()['fonts'] == 0
+
+
+def test_missing_font_falls_back_to_default(monkeypatch, tmp_path):
+    """Test that a missing font file falls back to pygame's default font at a larger size."""
+    monkeypatch.setattr(font_manager, "FONT_FILE", str(tmp_path / "missing.ttf"))
+    monkeypatch.setattr(font_manager, "SUBSET_FILE", str(tmp_path / "missing-subset.ttf"))
+    pygame.init()
+    try:
+        assert game_font(16) is get_font(None, 24)
+    finally:
+        pygame.quit()
+
+
+def test_collect_text_covers_ui_and_card_names():
+    """Test that the subset text includes UI strings, card names and ASCII."""
+    text = collect_text()
+    for sample in ("ゲームコード", "役一覧", "カード分布", "Amazon WorkSpaces", "Royal Flush", "0123456789"):
+        assert set(sample) <= set(text)
+    assert len(text) < 1000
+
+
+def test_subset_font_renders_collected_text(tmp_path):
+    """Test that the subset font is smaller and still renders the UI text."""
+    pytest.importorskip("fontTools")
+    output = tmp_path / "subset.ttf"
+    text = collect_text()
+    assert font_manager.subset_font(FONT_FILE, str(output), text) > 0
+    assert output.stat().st_size < len(open(FONT_FILE, 'rb').read())
+    pygame.font.init()
+    try:
+        assert pygame.font.Font(str(output), 24).render("ゲームコード", True, (0, 0, 0)).get_width() > 0
+    finally:
+        pygame.font.quit()
@@ -0,0 +1,38 @@
+"""Tests for the frame-time profiler."""
+
+import csv
+
+import pygame
+
+from aws_poker.frame_profiler import FrameProfiler
+
+
+def test_ring_buffer_and_csv_export(tmp_path, monkeypatch):
+    """Test that old samples are overwritten and exported in order."""
+    profiler = FrameProfiler(capacity=4)
+    profiler.begin_frame()
+    assert profiler.count == 0  # disabled until toggled
+
+    profiler.toggle()
+    for _ in range(7):
+        profiler.begin_frame()
+        with profiler.phase('cards'):
+            pass
+    assert profiler.count == 6
+    assert len(profiler.samples()) == 4
+    assert profiler.summary()['fps'] > 0
+
+    path = tmp_path / "profile.csv"
+    assert profiler.export_csv(str(path)) == 4
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert rows[0][:3] == ['frame', 'frame_ms', 'events_ms']
+    assert [row[0] for row in rows[1:]] == ['2', '3', '4', '5']
+
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    try:
+        screen = pygame.display.set_mode((800, 600))
+        profiler.draw(screen, pygame.font.Font(None, 20))
+    finally:
+        pygame.quit()
@@ -0,0 +1,97 @@
+"""Tests for hand evaluation."""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from aws_poker.hand_evaluator import HandEvaluator
+from aws_poker.special_hands import SPECIAL_HAND_RULES, compile_special_rules
+
+CARDS_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cards.csv")
+
+
+def make_hand(*specs):
+    """Build a hand from (rank, suit, category) tuples."""
+    return [SimpleNamespace(rank=rank, suit=suit, category=category, filename="x.png")
+            for rank, suit, category in specs]
+
+
+def test_special_rules_keep_their_order():
+    """Test that the first matching rule in declaration order wins."""
+    evaluator = HandEvaluator()
+    # Matches both Serverless Combo and Cloud Trio; Serverless Combo is declared first
+    hand = make_hand(("2", "Blue", "Compute"), ("5", "Blue", "App-Integration"),
+                     ("7", "Blue", "Database"), ("9", "Blue", "Storage"), ("J", "Gray", "Compute"))
+    assert evaluator.evaluate_hand(hand)[:2] == ("Serverless Combo", 1300)
+
+    hand = make_hand(("2", "Blue", "Security-Identity-Compliance"), ("5", "Red", "Security-Identity-Compliance"),
+                     ("7", "Blue", "Management-Governance"), ("9", "Blue", "Storage"), ("J", "Gray", "Compute"))
+    assert evaluator.evaluate_hand(hand)[:2] == ("Security Suite", 1500)
+
+    hand = make_hand(("2", "Blue", "Storage"), ("5", "Red", "Storage"), ("7", "Green", "Storage"),
+                     ("9", "Yellow", "Storage"), ("J", "Gray", "Storage"))
+    assert evaluator.evaluate_hand(hand) == ("Multi-Cloud", 2200, {"suits": ["Blue", "Gray", "Green", "Red", "Yellow"]})
+
+    hand = make_hand(("2", "Blue", "Storage"), ("2", "Red", "Storage"), ("7", "Blue", "Storage"),
+                     ("9", "Blue", "Storage"), ("J", "Gray", "Storage"))
+    assert evaluator.evaluate_hand(hand)[0] == "One Pair"
+
+
+def test_batch_matching_agrees_with_single_hands():
+    """Test that the vectorized rule check matches the per-hand lookup."""
+    np = pytest.importorskip("numpy")
+    table = compile_special_rules()
+    rng = np.random.default_rng(0)
+    histograms = rng.integers(0, 3, size=(500, len(table.categories)))
+    distinct_suits = rng.integers(1, 6, size=500)
+
+    expected = [table.match(tuple(int(v) for v in row), int(n)) for row, n in zip(histograms, distinct_suits)]
+    assert table.match_batch(histograms, distinct_suits).tolist() == expected
+    assert set(expected) - {-1} <= set(range(len(SPECIAL_HAND_RULES)))
+
+
+def test_hand_keys_form_a_total_order():
+    """Test that integer keys order by category, score and then tie-breakers."""
+    pytest.importorskip("numpy")
+    from aws_poker.hand_evaluator import argsort_hand_keys
+
+    evaluator = HandEvaluator()
+    kings_over_twos = make_hand(("K", "Blue", "Storage"), ("K", "Red", "Storage"), ("2", "Blue", "Storage"),
+                                ("2", "Red", "Storage"), ("5", "Gray", "Storage"))
+    queens_over_jacks = make_hand(("Q", "Blue", "Storage"), ("Q", "Red", "Storage"), ("J", "Blue", "Storage"),
+                                  ("J", "Red", "Storage"), ("9", "Gray", "Storage"))
+    pair = make_hand(("K", "Blue", "Storage"), ("K", "Red", "Storage"), ("7", "Blue", "Storage"),
+                     ("9", "Blue", "Storage"), ("J", "Gray", "Storage"))
+    trio = make_hand(("2", "Blue", "Compute"), ("5", "Red", "Storage"), ("7", "Blue", "Database"),
+                     ("9", "Blue", "Storage"), ("J", "Gray", "Storage"))
+
+    keys = [evaluator.evaluate_key(hand) for hand in (pair, queens_over_jacks, trio, kings_over_twos)]
+    assert keys[3] > keys[1] > keys[0]
+    assert keys[2] > keys[3]
+    assert argsort_hand_keys(keys).tolist() == [2, 3, 1, 0]
+    assert evaluator.get_hand_strength("AWS Master", 0) > evaluator.get_hand_strength("Straight Flush", 7000)
+
+
+def test_incremental_state_matches_full_evaluation():
+    """Test that single-card replacements give the same result as re-evaluating."""
+    import random
+
+    from aws_poker.catalog import read_csv_rows
+    from aws_poker.hand_state import HandState
+
+    cards = [SimpleNamespace(**row) for row in read_csv_rows(CARDS_CSV)]
+    evaluator = HandEvaluator()
+    rng = random.Random(0)
+    hand = rng.sample(cards, 5)
+    state = HandState.from_cards(hand, evaluator)
+
+    for _ in range(5000):
+        slot = rng.randrange(5)
+        # Draw from the neighbour's suit now and then so flushes occur
+        same_suit = [card for card in cards if card.suit == hand[(slot + 1) % 5].suit]
+        hand[slot] = rng.choice(same_suit if rng.random() < 0.5 else cards)
+        state.replace(slot, hand[slot])
+
+        assert state.evaluate() == evaluator.evaluate_hand(hand)
+        assert state.key() == evaluator.evaluate_key(hand)
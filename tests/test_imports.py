@@ -0,0 +1,50 @@
+"""Tests for the headless import path of the package."""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time allowed for the evaluator (pygame alone costs far more)
+IMPORT_BUDGET_US = 150_000
+HEAVY_MODULES = ("pygame", "numpy", "boto3")
+
+
+def import_profile(statement):
+    """Run an import in a fresh interpreter and return (loaded heavy modules, importtime lines)."""
+    code = f"{statement}\nimport sys\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, cwd=ROOT, check=True)
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return loaded, result.stderr.splitlines()
+
+
+def cumulative_us(lines, module):
+    """Read the cumulative import time of a module from -X importtime output."""
+    for line in lines:
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise AssertionError(f"{module} not found in import profile")
+
+
+def test_hand_evaluator_import_is_headless():
+    """Test that the evaluator imports without pygame and within the time budget."""
+    loaded, lines = import_profile("from aws_poker.hand_evaluator import HandEvaluator")
+    assert loaded == []
+    assert cumulative_us(lines, "aws_poker.hand_evaluator") < IMPORT_BUDGET_US
+
+
+def test_card_data_modules_are_headless():
+    """Test that the card catalog and game code helpers do not need pygame."""
+    loaded, _ = import_profile("import aws_poker.catalog, aws_poker.game_code")
+    assert loaded == []
+
+
+def test_package_attributes_load_lazily():
+    """Test that public classes are still reachable from the package."""
+    import aws_poker
+
+    assert aws_poker.HandEvaluator.__module__ == "aws_poker.hand_evaluator"
+    assert "PokerGame" in dir(aws_poker)
@@ -0,0 +1,31 @@
+"""Tests for the sampling profiler behind run_poker.py --profile."""
+
+import time
+
+from aws_poker.profiling import SamplingProfiler, write_report
+
+
+def busy_loop(duration):
+    """Spin on the CPU for the given number of seconds."""
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        sum(range(100))
+
+
+def test_speedscope_output_and_report(tmp_path):
+    """Test that samples map to speedscope frames and appear in the report."""
+    with SamplingProfiler(interval=0.001) as profiler:
+        busy_loop(0.2)
+
+    assert profiler.samples
+    profile = profiler.to_speedscope("test")
+    frames = profile["shared"]["frames"]
+    sampled = profile["profiles"][0]
+    assert sampled["type"] == "sampled"
+    assert len(sampled["samples"]) == len(sampled["weights"])
+    assert all(0 <= i < len(frames) for stack in sampled["samples"] for i in stack)
+    assert any(frame["name"] == "busy_loop" for frame in frames)
+
+    report = tmp_path / "report.txt"
+    write_report(str(report), profiler, frames=0, wall_time=0.2, phase_summary={})
+    assert "busy_loop" in report.read_text(encoding="utf-8")
@@ -0,0 +1,99 @@
+"""Tests for the software and SDL2 texture render backends."""
+
+import pygame
+
+from aws_poker.poker_game import PokerGame
+from aws_poker.render_backend import SoftwareBackend, TextureBackend, create_backend, merge_rects, to_logical
+
+
+def test_texture_backend_composites_cards_under_ui(monkeypatch):
+    """Test that card textures are uploaded once and drawn between the background and the UI canvas."""
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    try:
+        backend = TextureBackend(200, 100, "test", accelerated=False)
+        card = pygame.Surface((20, 20))
+        card.fill((255, 0, 0))
+        for _ in range(3):
+            backend.clear((0, 128, 0))
+            backend.card_layer.blit(card, (10, 10))
+            backend.mark(pygame.draw.rect(backend.screen, (0, 0, 255), (100, 10, 20, 20)))
+            dim = pygame.Surface((200, 100), pygame.SRCALPHA)
+            dim.fill((0, 0, 0, 128))
+            backend.screen.blit(dim, (150, 0))
+            backend.draw_surface(card, (150, 10))  # 暗くするUIの下に描かれる
+            backend.compose()
+        # キャンバスは描いた範囲（青い矩形と、画面内に切り取った半透明の帯）だけが転送される
+        assert backend.drawn_rects() == [pygame.Rect(150, 0, 50, 100), pygame.Rect(100, 10, 20, 20)]
+        assert backend.stats() == {'textures': 1, 'uploads': 1, 'canvas_bytes': 3 * (50 * 100 + 20 * 20) * 4}
+
+        pixels = backend.renderer.to_surface()
+        assert pixels.get_at((15, 15))[:3] == (255, 0, 0)
+        assert pixels.get_at((50, 50))[:3] == (0, 128, 0)
+        assert pixels.get_at((105, 15))[:3] == (0, 0, 255)
+        assert abs(pixels.get_at((155, 15))[0] - 127) <= 2
+
+        # 次のフレームで描かなければ前の内容は消える
+        backend.clear((0, 128, 0))
+        backend.mark(pygame.draw.rect(backend.screen, (0, 0, 255), (10, 70, 5, 5)))
+        backend.compose()
+        assert backend.drawn_rects() == [pygame.Rect(10, 70, 5, 5)]
+        pixels = backend.renderer.to_surface()
+        assert pixels.get_at((105, 15))[:3] == (0, 128, 0)
+        assert pixels.get_at((155, 15))[:3] == (0, 128, 0)
+        assert pixels.get_at((12, 72))[:3] == (0, 0, 255)
+        assert backend.screen.get_bounding_rect() == pygame.Rect(10, 70, 5, 5)
+        backend.close()
+    finally:
+        pygame.quit()
+
+
+def test_merge_rects_unions_overlaps_and_clips():
+    """Test that overlapping dirty rects are merged, chained overlaps included, and clipped to the canvas."""
+    bounds = pygame.Rect(0, 0, 100, 100)
+    rects = [pygame.Rect(0, 0, 10, 10), pygame.Rect(5, 5, 10, 10), pygame.Rect(14, 14, 10, 10),
+             pygame.Rect(50, 50, 5, 5), pygame.Rect(90, 90, 50, 50), pygame.Rect(200, 0, 5, 5),
+             pygame.Rect(60, 0, 0, 10)]
+    assert sorted(merge_rects(rects, bounds)) == [pygame.Rect(0, 0, 24, 24), pygame.Rect(50, 50, 5, 5),
+                                                   pygame.Rect(90, 90, 10, 10)]
+    # 大きな矩形に含まれる矩形は吸収される
+    assert merge_rects([pygame.Rect(10, 10, 5, 5), bounds], bounds) == [bounds]
+
+
+def test_to_logical_undoes_scaling_and_letterbox():
+    """Test that window coordinates map back to logical coordinates."""
+    assert to_logical((200, 100), (400, 200), (200, 100)) == (100, 50)
+    # 縦長のウィンドウでは上下に余白ができる
+    assert to_logical((100, 150), (200, 200), (200, 100)) == (100, 100)
+    assert to_logical((0, 50), (200, 200), (200, 100)) == (0, 0)
+
+
+def test_poker_game_runs_with_texture_backend(monkeypatch):
+    """Test that the game draws frames with the texture backend."""
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+    game = PokerGame(renderer='texture', scale=0.5)
+    try:
+        assert isinstance(game.backend, TextureBackend)
+        game.deal_new_hand()
+        assert game.run_frame()
+        # カード・タイトル・ラベル・ボタンは初回だけ転送し、キャンバスには何も描かれない
+        uploads = game.backend.stats()['uploads']
+        for _ in range(3):
+            assert game.run_frame()
+        assert game.backend.stats() == {'textures': uploads, 'uploads': uploads, 'canvas_bytes': 0}
+
+        game.profiler.toggle()
+        assert game.run_frame()
+        assert 0 < game.backend.stats()['canvas_bytes'] < game.width * game.height * 4
+        game.backend.close()
+    finally:
+        game.clipboard_service.shutdown()
+        game.sound_manager.cleanup()
+        pygame.quit()
+
+    pygame.init()
+    try:
+        assert isinstance(create_backend('software', 10, 10, "test"), SoftwareBackend)
+    finally:
+        pygame.quit()
@@ -0,0 +1,149 @@
+"""Tests for the local HTTP scoring service."""
+
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from aws_poker.catalog import read_csv_rows
+from aws_poker.hand_evaluator import HandEvaluator
+from aws_poker.latency import LatencyHistogram
+from aws_poker.serve import (BINARY_TYPE, ScoringServer, build_parser, pack_ids, request, run_load,
+                             unpack_scores)
+
+CARDS_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cards.csv")
+
+
+def _with_server(scenario):
+    """Run a client scenario against a one-worker server on an ephemeral port."""
+    async def main():
+        server = ScoringServer(CARDS_CSV, workers=1)
+        try:
+            host, port = await server.start("127.0.0.1", 0)
+            return await scenario(host, port)
+        finally:
+            server.close()
+
+    return asyncio.run(main())
+
+
+def test_endpoints_share_one_keep_alive_connection():
+    """Test evaluate, batch (JSON and binary), verify-code and metrics."""
+    cards = [SimpleNamespace(**row) for row in read_csv_rows(CARDS_CSV)]
+    evaluator = HandEvaluator()
+    hands = [[0, 1, 2, 3, 4], [10, 50, 100, 150, 200], [5, 6, 7, 8, 300]]
+    expected = [evaluator.evaluate_hand([cards[i] for i in hand]) for hand in hands]
+
+    async def scenario(host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            status, body = await request(reader, writer, "POST", "/evaluate",
+                                         json.dumps({"cards": hands[0]}).encode())
+            assert status == 200
+            assert json.loads(body)["hand"] == expected[0][0]
+            assert json.loads(body)["score"] == expected[0][1]
+
+            status, body = await request(reader, writer, "POST", "/evaluate/batch",
+                                         json.dumps({"hands": hands}).encode())
+            assert json.loads(body)["scores"] == [score for _, score, _ in expected]
+
+            ids = pack_ids([card_id for hand in hands for card_id in hand])
+            assert ids[:2] == b"\x00\x00" and ids[10:12] == b"\x0a\x00"  # リトルエンディアン
+            status, body = await request(reader, writer, "POST", "/evaluate/batch", ids, BINARY_TYPE)
+            assert status == 200
+            assert list(unpack_scores(body)) == [score for _, score, _ in expected]
+
+            # 同じカードIDを2回含む手札は判定しない
+            status, _ = await request(reader, writer, "POST", "/evaluate", json.dumps({"cards": [1, 1, 2, 3, 4]}).encode())
+            assert status == 400
+            status, _ = await request(reader, writer, "POST", "/evaluate/batch",
+                                      pack_ids([0, 1, 2, 3, 4, 7, 8, 9, 7, 6]), BINARY_TYPE)
+            assert status == 400
+
+            status, body = await request(reader, writer, "POST", "/verify-code",
+                                         json.dumps({"code": "AWS-POKER-1234"}).encode())
+            assert json.loads(body)["valid"] is True
+
+            status, _ = await request(reader, writer, "POST", "/evaluate", json.dumps({"cards": [1, 2]}).encode())
+            assert status == 400
+            status, _ = await request(reader, writer, "GET", "/missing")
+            assert status == 404
+
+            status, body = await request(reader, writer, "GET", "/metrics")
+            metrics = json.loads(body)
+            assert metrics["/evaluate"]["count"] == 3
+            assert metrics["/evaluate/batch"]["count"] == 3
+        finally:
+            writer.close()
+
+    _with_server(scenario)
+
+
+def test_load_generator_reports_latency():
+    """Test that the bundled load generator runs against localhost."""
+    async def scenario(host, port):
+        return await run_load(host, port, requests=40, concurrency=4, endpoint="binary", batch=10)
+
+    result = _with_server(scenario)
+    assert result["count"] == 40
+    assert result["errors"] == 0
+    assert result["hands_per_second"] > 0
+
+
+def test_bench_port_does_not_override_server_port():
+    """Test that the bench subcommand only sets the port when given."""
+    parser = build_parser()
+    assert parser.parse_args(["--port", "9000", "bench"]).port == 9000
+    assert parser.parse_args(["bench", "--port", "9001"]).port == 9001
+    assert parser.parse_args(["bench"]).port is None  # 子プロセスでサーバーを起動する
+
+
+def test_latency_histogram_percentiles():
+    """Test bucket counts and percentile estimates."""
+    histogram = LatencyHistogram()
+    for ms in (0.05, 0.3, 0.3, 4, 80):
+        histogram.record(ms / 1000)
+    summary = histogram.to_dict()
+    assert summary["count"] == 5
+    assert summary["buckets"]["le_0.5"] == 2
+    assert summary["p50_ms"] == 0.5
+    assert summary["p99_ms"] == 80
+
+
+def test_sigterm_stops_server_and_workers():
+    """Test that terminating the server process also shuts down its pool workers."""
+    if not os.path.exists(f"/proc/{os.getpid()}"):
+        pytest.skip("requires /proc to list child processes")
+    process = subprocess.Popen([sys.executable, "-m", "aws_poker.serve", "--port", "0", "--workers", "2",
+                                "--csv", CARDS_CSV], stdout=subprocess.PIPE, text=True)
+    try:
+        host, port = re.search(r"http://([^:]+):(\d+)", process.stdout.readline()).groups()
+
+        async def evaluate():
+            reader, writer = await asyncio.open_connection(host, int(port))
+            status, _ = await request(reader, writer, "POST", "/evaluate/batch",
+                                      json.dumps({"hands": [[0, 1, 2, 3, 4]] * 8}).encode())
+            writer.close()
+            return status
+
+        assert asyncio.run(evaluate()) == 200
+        with open(f"/proc/{process.pid}/task/{process.pid}/children") as f:
+            workers = [int(pid) for pid in f.read().split()]
+        assert workers
+
+        process.terminate()
+        assert process.wait(timeout=10) == 0
+        deadline = time.time() + 10
+        while workers and time.time() < deadline:
+            workers = [pid for pid in workers if os.path.exists(f"/proc/{pid}")]
+            time.sleep(0.05)
+        assert workers == []
+    finally:
+        process.kill()
+        process.wait()
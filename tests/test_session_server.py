@@ -0,0 +1,111 @@
+"""Tests for the multi-session game server."""
+
+import asyncio
+import json
+import os
+
+from aws_poker.game_code import generate_game_code, validate_game_code
+from aws_poker.session_server import (MAX_ROUNDS, SessionManager, SessionServer, build_parser,
+                                     measure_session_memory)
+
+CARDS_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cards.csv")
+
+
+def test_full_game_through_manager():
+    """Test toggle, draw with auto-stand, next rounds and the final code."""
+    manager = SessionManager(CARDS_CSV, seed=0)
+    response = manager.handle({"id": 1, "action": "new"})
+    assert response["ok"] and response["id"] == 1
+    session = response["state"]["session"]
+    before = [card["id"] for card in response["state"]["cards"]]
+
+    manager.handle({"action": "toggle", "session": session, "index": 0})
+    response = manager.handle({"action": "draw", "session": session})
+    after = [card["id"] for card in response["state"]["cards"]]
+    assert after[1:] == before[1:]
+    assert response["state"]["draws_remaining"] == 1
+
+    manager.handle({"action": "toggle", "session": session, "index": 4})
+    response = manager.handle({"action": "draw", "session": session})
+    assert response["state"]["state"] == "hand_result"
+    assert response["result"]["score"] > 0
+    assert not manager.handle({"action": "toggle", "session": session, "index": 0})["ok"]
+
+    for _ in range(MAX_ROUNDS - 1):
+        manager.handle({"action": "next", "session": session})
+        cards = manager.handle({"action": "stand", "session": session})["state"]["cards"]
+        assert len({card["id"] for card in cards}) == 5
+    response = manager.handle({"action": "next", "session": session})
+    assert response["state"]["state"] == "final_result"
+
+    result = manager.handle({"action": "code", "session": session})["result"]
+    assert validate_game_code(result["code"])
+    assert result["total_score"] == sum(entry["score"] for entry in result["rounds"])
+    assert len(result["rounds"]) == MAX_ROUNDS
+
+
+def test_unhashable_action_is_rejected():
+    """Test that a non-string action gets an error response instead of raising."""
+    manager = SessionManager(CARDS_CSV, seed=0)
+    response = manager.handle({"id": 7, "action": ["x"]})
+    assert response == {"id": 7, "ok": False, "error": "不明なアクションです"}
+
+
+def test_idle_sessions_are_suspended_and_resumed():
+    """Test that idle sessions move to snapshots and come back on the next action."""
+    manager = SessionManager(CARDS_CSV, idle_timeout=10, seed=1)
+    old = manager.create()
+    fresh = manager.create()
+    manager.handle({"action": "toggle", "session": old.session_id, "index": 2})
+    before = manager.handle({"action": "draw", "session": old.session_id})["state"]
+    old.last_active -= 60
+    manager.get(fresh.session_id)
+    assert manager.evict_idle() == 1
+    assert list(manager.sessions) == [fresh.session_id]
+    assert len(manager.suspended[old.session_id]) < 100
+
+    after = manager.handle({"action": "state", "session": old.session_id})["state"]
+    assert after == before
+    assert not manager.suspended
+    assert manager.sessions[old.session_id].rng_state == old.rng_state
+
+
+def test_line_protocol_over_tcp():
+    """Test newline-delimited JSON requests on one connection."""
+    async def scenario():
+        server = SessionServer(SessionManager(CARDS_CSV, seed=2))
+        host, port = await server.start("127.0.0.1", 0)
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b'{"id": 7, "action": "new"}\nnot json\n{"action": "stats"}\n')
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(3)]
+            writer.close()
+            return responses
+        finally:
+            server.close()
+
+    created, invalid, stats = asyncio.run(scenario())
+    assert created["id"] == 7 and created["ok"]
+    assert not invalid["ok"]
+    assert stats["sessions"] == 1
+
+
+def test_sessions_are_compact():
+    """Test that a dealt session stays well under a few kilobytes."""
+    assert measure_session_memory(CARDS_CSV, sessions=200) < 2048
+
+
+def test_bench_port_does_not_override_server_port():
+    """Test that the bench subcommand only sets the port when given."""
+    parser = build_parser()
+    assert parser.parse_args(["--port", "9000", "bench"]).port == 9000
+    assert parser.parse_args(["bench", "--port", "9001"]).port == 9001
+    assert parser.parse_args(["bench"]).port is None  # 子プロセスでサーバーを起動する
+
+
+def test_game_code_number_is_zero_padded():
+    """Test that a code whose hash gives a number under 1000 still has four digits."""
+    code = generate_game_code([], timestamp="18")  # ハッシュの数字部分が939になる
+    assert code.endswith("-0939")
+    assert validate_game_code(code)
@@ -0,0 +1,55 @@
+"""Tests for publishing the card catalog through shared memory."""
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from aws_poker.catalog import load_catalog
+from aws_poker.shared_catalog import SharedTables, publish_catalog, shared_catalog
+
+CARDS_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cards.csv")
+
+
+def _sum_ids(handle):
+    """Attach in a worker and sum the shared id columns."""
+    with SharedTables.attach(handle) as tables:
+        catalog = shared_catalog(tables)
+        return len(catalog), sum(catalog.rank_ids), sum(tables["values"])
+
+
+def test_catalog_round_trip_and_workers():
+    """Test that workers see the published catalog and extra tables."""
+    with load_catalog(CARDS_CSV) as catalog:
+        values = array("q", range(1000))
+        with publish_catalog(catalog, {"values": values}) as tables:
+            view = shared_catalog(tables)
+            assert list(view.rank_ids) == list(catalog.rank_ids)
+            assert list(view.category_ids) == list(catalog.category_ids)
+            assert view.suits == list(catalog.suits)
+            assert not hasattr(view, "rows")  # 文字列の行は共有しない
+            assert tables["values"][999] == 999
+
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                results = list(executor.map(_sum_ids, [tables.handle] * 4))
+            assert results == [(len(catalog), sum(catalog.rank_ids), sum(values))] * 4
+            name = tables.handle[0]
+
+    with pytest.raises(FileNotFoundError):
+        SharedTables.attach((name, [], {}))
+
+
+def test_scorer_tables_are_shared_without_copy():
+    """Test that a scorer built from shared tables scores identically."""
+    np = pytest.importorskip("numpy")
+    from aws_poker.env import HandScorer
+
+    with load_catalog(CARDS_CSV) as catalog:
+        scorer = HandScorer(catalog)
+        with publish_catalog(catalog, scorer.tables()) as tables:
+            attached = HandScorer(shared_catalog(tables), tables=tables)
+            assert np.shares_memory(attached.standard_score, np.asarray(tables["standard_score"]))
+            hands = np.random.default_rng(0).integers(0, len(catalog), size=(500, 5))
+            assert (attached.score(hands) == scorer.score(hands)).all()
+            del attached
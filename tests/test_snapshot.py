@@ -0,0 +1,81 @@
+"""Tests for binary game snapshots."""
+
+import os
+import time
+
+import pytest
+
+from aws_poker.snapshot import GameSnapshot, SnapshotError
+
+
+def _playing_snapshot():
+    return GameSnapshot(309, [5, 17, 88, 200, 301], dealt=(1 << 5) | (1 << 17) | (1 << 300),
+                        selected=0b10010, round_number=3, draws_remaining=1, total_score=1650,
+                        round_scores=[("One Pair", 50), ("AWS Architect", 3000)],
+                        state="playing", rng_state=0x0123456789ABCDEF)
+
+
+def test_round_trip_with_dealt_mask():
+    """Test that a bitmask-deck snapshot restores exactly and stays small."""
+    snapshot = _playing_snapshot()
+    data = snapshot.to_bytes()
+    assert len(data) < 100
+    assert GameSnapshot.from_bytes(data) == snapshot
+
+
+def test_round_trip_with_permutation_and_code():
+    """Test an ordered deck, a finished game and its game code."""
+    deck = list(range(309))[::-1][:284]
+    snapshot = GameSnapshot(309, [1, 2, 3, 4, 0], deck=deck, round_number=6, draws_remaining=0,
+                            total_score=500, round_scores=[("High Card", 10)] * 5,
+                            state="final_result", game_code="CLOUD-LAMBDA-1234")
+    restored = GameSnapshot.from_bytes(snapshot.to_bytes())
+    assert restored == snapshot
+    assert restored.deck == deck
+
+
+def test_corrupt_data_is_rejected():
+    """Test truncated, padded and foreign data."""
+    data = _playing_snapshot().to_bytes()
+    for broken in (data[:-1], data + b"\0", b"XXXX" + data[4:], data[:10]):
+        with pytest.raises(SnapshotError):
+            GameSnapshot.from_bytes(broken)
+
+
+def test_serialization_takes_microseconds():
+    """Test that a save/restore round trip stays well under a millisecond."""
+    snapshot = _playing_snapshot()
+    started = time.perf_counter()
+    for _ in range(2000):
+        GameSnapshot.from_bytes(snapshot.to_bytes())
+    assert (time.perf_counter() - started) / 2000 < 1e-3
+
+
+def test_poker_game_suspend_and_resume():
+    """Test that a PokerGame mid-round resumes with the same hand, deck order and future draws."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from aws_poker.poker_game import PokerGame
+
+    game = PokerGame()
+    resumed = PokerGame()
+    try:
+        game.selected_cards[1] = True
+        game.draw_cards()
+        game.selected_cards[3] = True
+        resumed.load_snapshot(game.save_snapshot())
+
+        assert [card.card_id for card in resumed.hand] == [card.card_id for card in game.hand]
+        assert [card.card_id for card in resumed.deck.cards] == [card.card_id for card in game.deck.cards]
+        assert resumed.selected_cards == game.selected_cards
+        assert resumed.draws_remaining == 1
+        assert resumed.hand_state.evaluate() == game.hand_state.evaluate()
+
+        # デッキの乱数も保存されるので、再開後のドロー（シャッフル）も同じになる
+        game.draw_cards()
+        resumed.draw_cards()
+        assert [card.card_id for card in resumed.hand] == [card.card_id for card in game.hand]
+        assert [card.card_id for card in resumed.deck.cards] == [card.card_id for card in game.deck.cards]
+    finally:
+        resumed.sound_manager.cleanup()
+        game.sound_manager.cleanup()
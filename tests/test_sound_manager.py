@@ -0,0 +1,97 @@
+"""Tests for the sound manager."""
+
+import pygame
+import pytest
+
+from aws_poker import sound_manager
+from aws_poker.sound_manager import SoundManager
+
+
+@pytest.fixture
+def dummy_audio(monkeypatch):
+    """Use SDL's dummy audio driver and clean up the mixer afterwards."""
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+    managers = []
+    yield managers
+    for manager in managers:
+        manager.cleanup()
+
+
+def test_headless_does_not_init_mixer():
+    """Test that a disabled manager never touches the mixer."""
+    manager = SoundManager(enabled=False)
+    manager.play_sound("card_draw")
+
+    assert manager.enabled is False
+    assert manager.sounds == {}
+    assert pygame.mixer.get_init() is None
+
+
+def test_sounds_decoded_lazily_and_shared(dummy_audio):
+    """Test that effects decode on first use and are shared between managers."""
+    first = SoundManager()
+    second = SoundManager()
+    dummy_audio.extend([second, first])
+    if not first.enabled:
+        pytest.skip("audio device unavailable")
+
+    assert sound_manager._sound_cache == {}
+    first.play_sound("card_draw")
+    second.play_sound("card_draw")
+
+    assert len(sound_manager._sound_cache) == 1
+    assert first.sounds["card_draw"] is second.sounds["card_draw"]
+
+
+def test_rapid_draws_rotate_reserved_channels(dummy_audio):
+    """Test that repeated draws cycle through the reserved channels."""
+    manager = SoundManager()
+    dummy_audio.append(manager)
+    if not manager.enabled:
+        pytest.skip("audio device unavailable")
+
+    channels = manager.channels["card_draw"]
+    for _ in range(len(channels)):
+        manager.play_sound("card_draw")
+
+    assert all(channel.get_busy() for channel in channels)
+    assert manager.next_channel["card_draw"] == 0
+
+
+def test_cleanup_keeps_mixer_for_other_managers(dummy_audio):
+    """Test that the mixer and shared cache survive until the last manager cleans up."""
+    first = SoundManager()
+    second = SoundManager()
+    dummy_audio.extend([second, first])
+    if not first.enabled:
+        pytest.skip("audio device unavailable")
+
+    second.play_sound("card_draw")
+    first.cleanup()
+    first.cleanup()  # 2回目は何もしない
+    assert pygame.mixer.get_init() is not None
+    assert len(sound_manager._sound_cache) == 1
+    second.play_sound("card_draw")
+    assert second.channels["card_draw"][1].get_busy()
+
+    second.cleanup()
+    assert pygame.mixer.get_init() is None
+    assert sound_manager._sound_cache == {}
+
+
+def test_toggle_on_registers_with_initialized_mixer(dummy_audio):
+    """Test that enabling sound while another manager holds the mixer reserves channels and counts as a user."""
+    other = SoundManager()
+    dummy_audio.append(other)
+    if not other.enabled:
+        pytest.skip("audio device unavailable")
+    manager = SoundManager(enabled=False)
+    dummy_audio.insert(0, manager)
+
+    assert manager.toggle_sound() is True
+    assert manager.mixer_user and manager.channels
+    manager.play_sound("card_draw")
+    assert manager.channels["card_draw"][0].get_busy()
+
+    other.cleanup()
+    assert pygame.mixer.get_init() is not None
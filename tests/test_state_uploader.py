@@ -0,0 +1,134 @@
+"""Tests for the background game-state uploader."""
+
+import pytest
+
+import time
+
+from aws_poker.state_uploader import MemoryS3Client, StateUploader, is_retryable, read_records
+
+
+def _keys(client, bucket):
+    return sorted(client.objects.get(bucket, {}))
+
+
+def test_batches_are_compressed_with_unique_partitioned_keys():
+    """Test batching, key layout and the flush on close."""
+    client = MemoryS3Client()
+    with StateUploader(client, "bucket", max_batch=10, flush_interval=60) as uploader:
+        for i in range(25):
+            assert uploader.submit({"frame": i})
+    keys = _keys(client, "bucket")
+    assert len(keys) == 3
+    assert len(set(keys)) == 3
+    assert all(key.startswith("game_states/dt=") and "/hour=" in key and key.endswith(".jsonl.gz")
+               for key in keys)
+
+    frames = sorted(record["frame"] for key in keys for record in read_records(client, "bucket", key))
+    assert frames == list(range(25))
+    assert uploader.stats["uploaded_records"] == 25
+    assert uploader.stats["compressed_bytes"] < uploader.stats["raw_bytes"]
+
+
+def test_snapshot_is_taken_at_submit_time():
+    """Test that mutating the state after submit does not change the upload."""
+    client = MemoryS3Client()
+    uploader = StateUploader(client, "bucket")
+    state = {"score": 1}
+    uploader.submit(state)
+    state["score"] = 2
+    assert uploader.flush(timeout=5)
+    (key,) = _keys(client, "bucket")
+    (record,) = read_records(client, "bucket", key)
+    assert record["score"] == 1
+    assert "timestamp" in record
+    uploader.close()
+
+
+def test_retries_with_backoff_then_gives_up():
+    """Test retry counting, backoff delays and dropped batches after the limit."""
+    delays = []
+    client = MemoryS3Client(failures=2)
+    with StateUploader(client, "bucket", max_retries=3, backoff=0.1, sleep=delays.append) as uploader:
+        uploader.submit({"frame": 1})
+    assert uploader.stats["retries"] == 2
+    assert uploader.stats["uploaded_records"] == 1
+    assert delays[0] <= 0.1 and delays[1] <= 0.2
+
+    client = MemoryS3Client(failures=10)
+    with StateUploader(client, "bucket", max_retries=1, sleep=lambda delay: None) as uploader:
+        uploader.submit({"frame": 1})
+    assert uploader.stats["failed_records"] == 1
+    assert not client.objects
+
+
+class _ClientError(Exception):
+    """An exception shaped like botocore's ClientError."""
+
+    def __init__(self, code, status):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}}
+
+
+class _RejectingClient(MemoryS3Client):
+    def put_object(self, **kwargs):
+        self.calls += 1
+        raise _ClientError("AccessDenied", 403)
+
+
+def test_only_transient_errors_are_retried():
+    """Test that throttling, 5xx and connection errors are retried but permanent errors are not."""
+    assert is_retryable(ConnectionError())
+    assert is_retryable(_ClientError("SlowDown", 503))
+    assert is_retryable(_ClientError("Whatever", 500))
+    assert not is_retryable(_ClientError("NoSuchBucket", 404))
+    assert not is_retryable(_ClientError("AccessDenied", 403))
+    assert not is_retryable(ValueError())
+
+    client = _RejectingClient()
+    with StateUploader(client, "bucket", max_retries=5, sleep=lambda delay: None) as uploader:
+        uploader.submit({"frame": 1})
+    assert client.calls == 1
+    assert uploader.stats["retries"] == 0
+    assert uploader.stats["failed_records"] == 1
+
+
+def test_close_has_an_overall_deadline():
+    """Test that close stops retrying and leaves the rest unsent once its deadline passes."""
+    client = MemoryS3Client(latency=0.05, failures=1000)
+    uploader = StateUploader(client, "bucket", max_batch=1, max_retries=5, backoff=0.2,
+                             sleep=time.sleep).start()
+    for i in range(20):
+        uploader.submit({"frame": i})
+    started = time.perf_counter()
+    uploader.close(timeout=0.3)
+    assert time.perf_counter() - started < 1.0
+    stats = uploader.stats
+    for _ in range(100):  # 実行中のput_objectが終わるのを待つ
+        if stats["failed_records"] + stats["unsent_records"] == 20:
+            break
+        time.sleep(0.02)
+    assert stats["failed_records"] + stats["unsent_records"] == 20
+    assert stats["unsent_records"] > 0
+
+
+def test_full_queue_drops_without_blocking():
+    """Test that submit returns False instead of waiting when the queue is full."""
+    uploader = StateUploader(MemoryS3Client(), "bucket", max_queue=2)
+    uploader._thread = object()  # fill the queue without a worker draining it
+    assert uploader.submit({"a": 1}) and uploader.submit({"a": 2})
+    assert not uploader.submit({"a": 3})
+    assert uploader.stats["dropped"] == 1
+
+
+def test_uploads_to_moto_s3():
+    """Test the uploader against moto's local S3."""
+    moto = pytest.importorskip("moto")
+    import boto3
+
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="states")
+        with StateUploader(client, "states") as uploader:
+            uploader.submit({"frame": 1})
+        (entry,) = client.list_objects_v2(Bucket="states")["Contents"]
+        assert read_records(client, "states", entry["Key"])[0]["frame"] == 1
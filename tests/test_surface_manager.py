@@ -0,0 +1,69 @@
+"""Tests for the card surface manager."""
+
+import pygame
+
+from aws_poker.card import Card
+from aws_poker.surface_manager import SurfaceManager, surface_bytes
+
+
+def _card(rank: str) -> Card:
+    card = Card("missing/icon.png", "Arch_Amazon-S3_48.png", rank, "Blue")
+    card.service_name = f"Service {rank}"
+    return card
+
+
+def test_faces_are_converted_shared_and_evicted(monkeypatch):
+    """Test that faces are converted once, shared and evicted least-recently-drawn first."""
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    try:
+        screen = pygame.display.set_mode((800, 600))
+        font = pygame.font.Font(None, 24)
+        face_bytes = Card.CARD_WIDTH * Card.CARD_HEIGHT * screen.get_bytesize()
+
+        manager = SurfaceManager(budget_bytes=0)
+        monkeypatch.setattr(Card, "surfaces", manager)
+        cards = [_card(rank) for rank in ("A", "K", "Q")]
+        for card in cards:
+            card.load_image()
+        # 読めないアイコンは1枚の代替画像を共有する
+        assert cards[0].image is cards[2].image
+        manager.set_budget(surface_bytes(cards[0].image) + 2 * face_bytes)
+
+        first = cards[0].create_card_surface(font, font)
+        assert first.get_bytesize() == screen.get_bytesize()
+        assert cards[0].create_card_surface(font, font) is first
+        assert _card("A").create_card_surface(font, font) is first  # 同じ内容は共有
+
+        cards[1].draw(screen, 0, 0, font, font)
+        cards[0].draw(screen, 0, 0, font, font)  # Aが最近描画したものになる
+        cards[2].draw(screen, 0, 0, font, font)  # Kが破棄される
+        stats = manager.stats()
+        assert stats["faces"] == 2 and stats["evictions"] == 1
+        assert stats["total_bytes"] <= stats["budget_bytes"]
+        assert cards[0].create_card_surface(font, font) is first
+
+        cards[0].is_face_up = cards[1].is_face_up = False
+        assert cards[0].create_back_surface() is cards[1].create_back_surface()
+        assert manager.stats()["shared"] == 2  # 代替画像 + 裏面
+    finally:
+        pygame.quit()
+
+
+def test_surfaces_made_before_display_are_converted_later():
+    """Test that surfaces created without a display are converted on first use afterwards."""
+    pygame.display.quit()
+    manager = SurfaceManager()
+    raw = pygame.Surface((10, 10), depth=8)
+    assert manager.face("key", lambda: raw) is raw
+    assert manager.stats()["conversions"] == 0 and manager.total_bytes == 100
+
+    pygame.display.init()
+    try:
+        screen = pygame.display.set_mode((100, 100))
+        converted = manager.face("key", lambda: raw)
+        assert converted is not raw
+        assert manager.stats()["conversions"] == 1
+        assert manager.total_bytes == manager.face_bytes == 100 * screen.get_bytesize()
+    finally:
+        pygame.quit()
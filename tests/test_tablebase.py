@@ -0,0 +1,122 @@
+"""Tests for the hold-strategy tablebase."""
+
+import os
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from aws_poker.catalog import read_csv_rows
+from aws_poker.hand_evaluator import HandEvaluator
+from aws_poker.tablebase import ALL_HELD, HoldKeyEncoder, Tablebase, build_tablebase
+
+CARDS_CSV = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cards.csv")
+
+
+def test_build_save_and_lookup(tmp_path):
+    """Test a tiny build, the compressed round trip and hint lookups."""
+    tablebase = build_tablebase(CARDS_CSV, hands=4, rollouts=3, workers=1, chunk_hands=2)
+    path = str(tmp_path / "tablebase.bin")
+    tablebase.save(path)
+    loaded = Tablebase.load(path)
+    assert len(loaded) == len(tablebase) > 0
+    key = next(iter(tablebase.values))
+    assert abs(loaded.values[key] - tablebase.values[key]) < 1e-2
+
+    cards = [SimpleNamespace(**row) for row in read_csv_rows(CARDS_CSV)]
+    hand = random.Random(1).sample(cards, 5)
+    score = HandEvaluator().evaluate_hand(hand)[1]
+    for draws in (0, 1, 2):
+        mask, value = loaded.best_hold(hand, draws)
+        assert 0 <= mask <= ALL_HELD
+        assert value >= score
+    assert loaded.best_hold(hand, 0) == (ALL_HELD, score)
+    assert loaded.expected_score(hand, ALL_HELD, 2) == score
+
+
+def test_hold_keys_ignore_card_order():
+    """Test that keys depend only on the abstracted multiset of held cards."""
+    encoder = HoldKeyEncoder(["Blue", "Gray", "Green", "Orange", "Red"])
+    a = SimpleNamespace(rank="K", suit="Blue", category="Compute")
+    b = SimpleNamespace(rank="2", suit="Red", category="Media-Services")
+    c = SimpleNamespace(rank="2", suit="Red", category="Games")  # both map to "other"
+    key = encoder.key([encoder.card_code(a), encoder.card_code(b)], 1)
+    assert key == encoder.key([encoder.card_code(c), encoder.card_code(a)], 1)
+    assert key != encoder.key([encoder.card_code(a), encoder.card_code(b)], 2)
+
+
+def test_five_card_keys_are_distinct():
+    """Test that distinct 5-card hands never share a key (fields must not overlap)."""
+    cards = [SimpleNamespace(**row) for row in read_csv_rows(CARDS_CSV)]
+    encoder = HoldKeyEncoder({card.suit for card in cards})
+    codes = [encoder.card_code(card) for card in cards]
+    rng = random.Random(0)
+    hands = {}
+    for _ in range(20000):
+        hand = tuple(sorted(rng.sample(codes, 5)))
+        suits = {c[1] for c in hand}
+        abstract = (tuple(sorted(c[0] for c in hand)), tuple(sorted(c[2] for c in hand)),
+                    len(suits), min(suits) if len(suits) == 1 else None)
+        key = encoder.key(hand, 1)
+        assert hands.setdefault(key, abstract) == abstract
+
+    # A-6-7-8-9 と 5-6-7-8-9 の同じスート（通常のフラッシュと伝説のフラッシュ）
+    green = encoder.suit_ids["Green"]
+    ace_high = [(HandEvaluator.RANK_VALUES[r], green, 0) for r in ("A", "6", "7", "8", "9")]
+    five_high = [(HandEvaluator.RANK_VALUES[r], green, 0) for r in ("5", "6", "7", "8", "9")]
+    assert encoder.key(ace_high, 1) != encoder.key(five_high, 1)
+
+
+def test_load_rejects_table_built_from_other_csv(tmp_path):
+    """Test that a table whose source digest differs from cards.csv is rejected."""
+    path = str(tmp_path / "tablebase.bin")
+    Tablebase({1: 1.0}, ["Blue"], b'\1' * 20).save(path)
+    assert len(Tablebase.load(path)) == 1
+    with pytest.raises(ValueError):
+        Tablebase.load(path, CARDS_CSV)
+
+
+def test_every_hold_has_a_value_after_loading_with_deck(tmp_path):
+    """Test that holds missing from a sampled table are estimated on demand once the deck is known."""
+    tablebase = build_tablebase(CARDS_CSV, hands=4, rollouts=3, workers=1, chunk_hands=2)
+    path = str(tmp_path / "tablebase.bin")
+    tablebase.save(path)
+    loaded = Tablebase.load(path, CARDS_CSV)
+    assert loaded.estimator is not None
+
+    cards = [SimpleNamespace(**row) for row in read_csv_rows(CARDS_CSV)]
+    hand = random.Random(7).sample(cards, 5)
+    for draws in (1, 2):
+        assert all(loaded.expected_score(hand, mask, draws) is not None for mask in range(ALL_HELD + 1))
+    assert loaded.estimated > 0
+    # 推定した値は表に加わり、同じホールドは推定し直さない
+    estimated = loaded.estimated
+    assert loaded.best_hold(hand, 1) == loaded.best_hold(hand, 1)
+    assert loaded.estimated == estimated
+
+
+def test_best_hold_agrees_with_brute_force_estimate():
+    """Test that the hint's hold scores within noise of the best hold found by plain Monte Carlo."""
+    cards = [SimpleNamespace(**row) for row in read_csv_rows(CARDS_CSV)]
+    evaluator = HandEvaluator()
+    rollouts = 1500
+    for seed in range(3):
+        hand = random.Random(seed).sample(cards, 5)
+        tablebase = Tablebase({}, {card.suit for card in cards}, deck=cards, rollouts=rollouts)
+        mask, value = tablebase.best_hold(hand, 1)
+
+        # 表を使わず、残したカード以外のデッキから引いて全ホールドを評価する
+        rng = random.Random(100 + seed)
+        brute = {}
+        for candidate in range(ALL_HELD + 1):
+            held = [card for i, card in enumerate(hand) if candidate >> i & 1]
+            rest = [card for card in cards if all(card is not h for h in held)]
+            if len(held) == 5:
+                brute[candidate] = evaluator.evaluate_hand(hand)[1]
+                continue
+            brute[candidate] = sum(evaluator.evaluate_hand(held + rng.sample(rest, 5 - len(held)))[1]
+                                   for _ in range(rollouts)) / rollouts
+        best = max(brute.values())
+        # スコアの分散が大きいので、2つの推定の誤差分だけ許容する
+        assert brute[mask] >= best * 0.9
+        assert abs(value - brute[mask]) <= best * 0.15
@@ -0,0 +1,48 @@
+"""Tests for the in-window game code entry."""
+
+import pygame
+import pytest
+
+from aws_poker.game_code import score_from_code, validate_game_code
+from aws_poker.text_input import TextInputBox
+
+
+@pytest.fixture
+def input_box(monkeypatch):
+    """Create a text input box on the dummy video driver."""
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((200, 100))
+    box = TextInputBox(pygame.Rect(0, 0, 200, 100), pygame.font.Font(None, 24), "Code", max_length=8)
+    box.start()
+    yield box
+    box.stop()
+    pygame.quit()
+
+
+def key_event(key, mod=0):
+    """Build a KEYDOWN event."""
+    return pygame.event.Event(pygame.KEYDOWN, key=key, mod=mod, unicode="")
+
+
+def test_text_input_actions(input_box):
+    """Test typing, editing, pasting and submitting."""
+    assert input_box.handle_event(pygame.event.Event(pygame.TEXTINPUT, text="ABC")) is None
+    input_box.handle_event(key_event(pygame.K_BACKSPACE))
+    assert input_box.text == "AB"
+
+    assert input_box.handle_event(key_event(pygame.K_v, pygame.KMOD_CTRL)) == "paste"
+    input_box.insert("-1234\n5678")
+    assert input_box.text == "AB-12345"
+
+    input_box.draw(pygame.display.get_surface())
+    assert input_box.handle_event(key_event(pygame.K_RETURN)) == "submit"
+    assert input_box.handle_event(key_event(pygame.K_ESCAPE)) == "cancel"
+
+
+def test_game_code_rules():
+    """Test game code validation and score recovery."""
+    assert validate_game_code("CLOUD-LAMBDA-1234")
+    assert not validate_game_code("CLOUD-LAMBDA-12a4")
+    assert not validate_game_code("CLOUD-1234")
+    assert 1000 <= score_from_code("CLOUD-LAMBDA-1234") < 6000